@@ -0,0 +1,369 @@
+#!/usr/bin/env python3
+"""
+Çıkarıcı Performans Karşılaştırması - ENFAudioExtractor ve ENFExtractor
+
+Bilinen (gerçek) ENF eğrisiyle modüle edilmiş sentetik WAV kayıtları üretir
+(süre, örnekleme oranı, kanal sayısı ve SNR ızgarası) ve her çıkarıcı
+yapılandırmasını ayrı bir süreçte çalıştırarak şunları ölçer:
+- Verim: ses-saniyesi / CPU-saniyesi
+- Tepe RSS (MB)
+- Gerçek eğriye göre RMS frekans hatası (mHz)
+
+Sonuçlar JSON olarak kaydedilir; --baseline ile önceki bir çalıştırmayla
+karşılaştırılıp gerilemeler raporlanır.
+
+Kullanım:
+    python benchmarks/bench_extractors.py --preset quick
+    python benchmarks/bench_extractors.py --preset quick --baseline benchmarks/baselines/quick.json
+    python benchmarks/bench_extractors.py --preset full --work-dir /büyük/disk/bench
+"""
+
+import argparse
+import json
+import logging
+import multiprocessing
+import platform
+import shutil
+import sys
+import tempfile
+import time
+import wave
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+from utils.profiling import max_rss_mb
+
+
+# Ön tanımlı ızgaralar (süre s, örnekleme Hz, kanal, SNR dB)
+PRESETS = {
+    "quick": {"durations": [60], "sample_rates": [8000, 44100, 48000],
+              "channels": [1, 2], "snr_db": [10]},
+    "standard": {"durations": [60, 600, 3600], "sample_rates": [8000, 44100, 48000],
+                 "channels": [1, 2], "snr_db": [20, 0, -10]},
+    "full": {"durations": [60, 600, 3600, 6 * 3600, 24 * 3600], "sample_rates": [8000, 44100, 48000],
+             "channels": [1, 2], "snr_db": [20, 0, -10]},
+}
+
+# Çıkarıcı yapılandırmaları. in_memory=True olanlar tüm kaydı belleğe alır ve
+# --max-in-memory-samples üzerindeki kayıtlarda atlanır.
+VARIANTS = {
+    "audio_default": {
+        "extractor": "audio", "streaming": False, "in_memory": True,
+        "args": {}, "attrs": {}
+    },
+    "audio_streaming_zoom": {
+        "extractor": "audio", "streaming": True, "in_memory": False,
+        "args": {"decimate_to": 1000},
+        "attrs": {"window_size": 8192, "hop_length": 1000, "spectral_engine": "zoom",
+                  "zoom_band": (49.8, 50.2), "zoom_resolution": 0.001}
+    },
+    "enf_stft": {
+        "extractor": "enf", "in_memory": True,
+        "args": {}, "call": {}
+    },
+    "enf_decimated_zoom": {
+        "extractor": "enf", "in_memory": True,
+        "args": {"decimate_to": 1000},
+        "call": {"window_size": 8192, "hop_size": 1000, "engine": "zoom"}
+    },
+}
+
+# Karşılaştırmada gerileme sayılan göreli değişimler
+REGRESSION_TOLERANCE = {"throughput": 0.20, "rss_peak_mb": 0.20, "rms_error_mhz": 0.20}
+ERROR_FLOOR_MHZ = 0.5  # Bu kadarlık mutlak hata artışı gürültü sayılır
+
+# Gerçek ENF eğrisi: 50 Hz + birkaç yavaş sinüs bileşeni (toplam genlik ~±40 mHz)
+ENF_COMPONENTS = 4
+ENF_AMPLITUDE = 0.04
+SIGNAL_AMPLITUDE = 0.1
+CHUNK_SECONDS = 60
+
+
+def enf_components(seed):
+    """Tohumdan gerçek ENF eğrisinin bileşenlerini (genlik, periyot, faz) üret"""
+    rng = np.random.default_rng(seed)
+    amplitudes = rng.dirichlet(np.ones(ENF_COMPONENTS)) * ENF_AMPLITUDE
+    periods = rng.uniform(20.0, 900.0, ENF_COMPONENTS)
+    phases = rng.uniform(0, 2 * np.pi, ENF_COMPONENTS)
+    return amplitudes, periods, phases
+
+
+def true_enf(t, seed, nominal=50.0):
+    """Gerçek ENF frekansı f(t) (Hz)"""
+    amplitudes, periods, phases = enf_components(seed)
+    t = np.asarray(t, dtype=np.float64)[..., None]
+    return nominal + np.sum(amplitudes * np.sin(2 * np.pi * t / periods + phases), axis=-1)
+
+
+def true_phase(t, seed, nominal=50.0):
+    """f(t)'nin analitik integrali ile anlık faz (parça parça üretimde birikmiş hata yok)"""
+    amplitudes, periods, phases = enf_components(seed)
+    t = np.asarray(t, dtype=np.float64)[..., None]
+    integral = -np.sum(amplitudes * periods / (2 * np.pi) *
+                       (np.cos(2 * np.pi * t / periods + phases) - np.cos(phases)), axis=-1)
+    return 2 * np.pi * (nominal * t[..., 0] + integral)
+
+
+def synthesize_wav(file_path, duration, sample_rate, channels, snr_db, seed):
+    """
+    ENF ile modüle edilmiş 16-bit WAV kaydını parça parça (sabit bellek) yaz
+
+    SNR, ENF tonunun gücünün tüm bant beyaz gürültü gücüne oranıdır; stereo
+    kanallarda ENF ortak, gürültü bağımsızdır.
+    """
+    rng = np.random.default_rng(seed + 1)
+    noise_std = np.sqrt(SIGNAL_AMPLITUDE ** 2 / 2 / 10 ** (snr_db / 10))
+    total = int(duration * sample_rate)
+    chunk = CHUNK_SECONDS * sample_rate
+
+    tmp_path = Path(str(file_path) + ".tmp")
+    with wave.open(str(tmp_path), 'wb') as wav_file:
+        wav_file.setnchannels(channels)
+        wav_file.setsampwidth(2)
+        wav_file.setframerate(sample_rate)
+
+        for start in range(0, total, chunk):
+            n = min(chunk, total - start)
+            t = (start + np.arange(n)) / sample_rate
+            tone = SIGNAL_AMPLITUDE * np.sin(true_phase(t, seed))
+            samples = tone[:, None] + noise_std * rng.standard_normal((n, channels))
+            pcm = np.clip(samples * 32767, -32768, 32767).astype('<i2')
+            wav_file.writeframes(pcm.tobytes())
+
+    tmp_path.replace(file_path)
+
+
+def rms_error_mhz(estimate, times, seed):
+    """Kenar etkileri (her uçta süre %5'i, en fazla 10 s) hariç RMS hata (mHz)"""
+    estimate = np.asarray(estimate, dtype=np.float64)
+    times = np.asarray(times, dtype=np.float64)
+    if len(estimate) == 0:
+        return None
+
+    edge = min(10.0, 0.05 * times[-1])
+    mask = (times >= edge) & (times <= times[-1] - edge)
+    if not np.any(mask):
+        mask = np.ones_like(times, dtype=bool)
+    error = estimate[mask] - true_enf(times[mask], seed)
+    return float(np.sqrt(np.mean(error ** 2)) * 1000)
+
+
+def _run_case(case):
+    """
+    Tek (sinyal, yapılandırma) çiftini çalıştır (ayrı süreçte)
+
+    Tepe RSS sürecin kendi ölçümüdür; her durum yeni bir süreçte çalıştığı
+    için önceki durumlardan etkilenmez.
+    """
+    logging.disable(logging.WARNING)
+    variant = VARIANTS[case["variant"]]
+    output_dir = tempfile.mkdtemp(prefix="enf_bench_")
+
+    # Ağır modüller ölçüm dışında yüklensin (kısa kayıtlarda import süresi baskın olur)
+    import librosa
+    import scipy.interpolate
+    import scipy.signal
+    from enf_extract_audio import ENFAudioExtractor
+    from utils.enf_extractor import ENFExtractor
+
+    # librosa alt modülleri ilk çağrıda yüklenir: kısa bir ısınma çağrısı yap
+    librosa.load(case["file"], sr=None, duration=0.1)
+    librosa.stft(np.zeros(4096, dtype=np.float32), n_fft=1024)
+
+    wall_start = time.perf_counter()
+    cpu_start = time.process_time()
+
+    if variant["extractor"] == "audio":
+        extractor = ENFAudioExtractor(sample_rate=case["sample_rate"], **variant["args"])
+        extractor.save_plot = False
+        for name, value in variant["attrs"].items():
+            setattr(extractor, name, value)
+        results = extractor.extract_enf_from_audio(case["file"], output_dir, streaming=variant["streaming"])
+        if results is None or results.get("status") != "success":
+            raise RuntimeError((results or {}).get("error_message", "Sonuç alınamadı"))
+        estimate, times = results["enf_curve"], results["time_stamps"]
+    else:
+        extractor = ENFExtractor(**variant["args"])
+        estimate, times, _ = extractor.extract_from_audio(case["file"], **variant["call"])
+
+    wall_seconds = time.perf_counter() - wall_start
+    cpu_seconds = time.process_time() - cpu_start
+    shutil.rmtree(output_dir, ignore_errors=True)
+
+    return {
+        "wall_seconds": wall_seconds,
+        "cpu_seconds": cpu_seconds,
+        "throughput": case["duration"] / cpu_seconds if cpu_seconds > 0 else None,
+        "realtime_factor": case["duration"] / wall_seconds if wall_seconds > 0 else None,
+        "rss_peak_mb": max_rss_mb(),
+        "rms_error_mhz": rms_error_mhz(estimate, times, case["seed"]),
+    }
+
+
+def case_id(variant, duration, sample_rate, channels, snr_db):
+    """Karşılaştırma anahtarı"""
+    return f"{variant}/{int(duration)}s/{sample_rate}Hz/{channels}ch/{snr_db:g}dB"
+
+
+def run_benchmarks(grid, variants, work_dir, max_in_memory_samples, seed=0):
+    """Izgaradaki tüm durumları çalıştır ve sonuç listesini döndür"""
+    work_dir = Path(work_dir)
+    work_dir.mkdir(parents=True, exist_ok=True)
+    context = multiprocessing.get_context("spawn")
+    results = []
+
+    for duration in grid["durations"]:
+        for sample_rate in grid["sample_rates"]:
+            for channels in grid["channels"]:
+                for snr_db in grid["snr_db"]:
+                    file_path = work_dir / f"enf_{int(duration)}s_{sample_rate}Hz_{channels}ch_{snr_db:g}dB_s{seed}.wav"
+                    if not file_path.exists():
+                        print(f"🎵 Sinyal üretiliyor: {file_path.name}")
+                        synthesize_wav(file_path, duration, sample_rate, channels, snr_db, seed)
+
+                    for variant in variants:
+                        entry = {
+                            "id": case_id(variant, duration, sample_rate, channels, snr_db),
+                            "variant": variant,
+                            "duration": duration,
+                            "sample_rate": sample_rate,
+                            "channels": channels,
+                            "snr_db": snr_db,
+                        }
+                        case = dict(entry, file=str(file_path), seed=seed)
+
+                        if VARIANTS[variant]["in_memory"] and duration * sample_rate * channels > max_in_memory_samples:
+                            entry["status"] = "skipped"
+                        else:
+                            try:
+                                with ProcessPoolExecutor(max_workers=1, mp_context=context) as executor:
+                                    entry.update(executor.submit(_run_case, case).result())
+                                entry["status"] = "success"
+                            except Exception as e:
+                                entry.update(status="error", error_message=str(e))
+
+                        results.append(entry)
+                        print_result(entry)
+
+    return results
+
+
+def print_result(entry):
+    """Tek durumun sonucunu yazdır"""
+    if entry["status"] != "success":
+        print(f"   • {entry['id']:52s} {entry['status']} {entry.get('error_message', '')}")
+        return
+    error = entry["rms_error_mhz"]
+    print(f"   • {entry['id']:52s} {entry['throughput']:9.1f} ses-s/CPU-s  "
+          f"{entry['rss_peak_mb']:7.0f} MB  "
+          f"{'-' if error is None else f'{error:8.2f}'} mHz")
+
+
+def environment_info():
+    """Sonuçların yorumlanması için makine ve kütüphane bilgisi"""
+    info = {
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+        "processor": platform.processor(),
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+    }
+    for module in ("scipy", "librosa"):
+        try:
+            info[module] = __import__(module).__version__
+        except ImportError:
+            info[module] = None
+    return info
+
+
+def compare_with_baseline(results, baseline):
+    """Ortak durumlarda gerilemeleri bul (verim düşüşü, RSS ya da hata artışı)"""
+    baseline_results = {r["id"]: r for r in baseline.get("results", []) if r.get("status") == "success"}
+    regressions = []
+
+    for entry in results:
+        base = baseline_results.get(entry["id"])
+        if base is None or entry["status"] != "success":
+            continue
+
+        if base.get("throughput") and entry["throughput"] < base["throughput"] * (1 - REGRESSION_TOLERANCE["throughput"]):
+            regressions.append((entry["id"], "throughput", base["throughput"], entry["throughput"]))
+        if base.get("rss_peak_mb") and entry["rss_peak_mb"] > base["rss_peak_mb"] * (1 + REGRESSION_TOLERANCE["rss_peak_mb"]):
+            regressions.append((entry["id"], "rss_peak_mb", base["rss_peak_mb"], entry["rss_peak_mb"]))
+        if base.get("rms_error_mhz") is not None and entry["rms_error_mhz"] is not None:
+            limit = max(base["rms_error_mhz"] * (1 + REGRESSION_TOLERANCE["rms_error_mhz"]),
+                        base["rms_error_mhz"] + ERROR_FLOOR_MHZ)
+            if entry["rms_error_mhz"] > limit:
+                regressions.append((entry["id"], "rms_error_mhz", base["rms_error_mhz"], entry["rms_error_mhz"]))
+
+    return regressions
+
+
+def main():
+    """Ana fonksiyon"""
+    parser = argparse.ArgumentParser(description="ENF çıkarıcı performans karşılaştırması")
+    parser.add_argument("--preset", choices=sorted(PRESETS), default="quick", help="Ön tanımlı ızgara")
+    parser.add_argument("--durations", type=float, nargs="+", help="Süreler (s), preset'i geçersiz kılar")
+    parser.add_argument("--sample-rates", type=int, nargs="+", help="Örnekleme oranları (Hz)")
+    parser.add_argument("--channels", type=int, nargs="+", choices=[1, 2], help="Kanal sayıları")
+    parser.add_argument("--snr", type=float, nargs="+", help="SNR seviyeleri (dB)")
+    parser.add_argument("--variants", nargs="+", choices=sorted(VARIANTS), default=list(VARIANTS),
+                        help="Çalıştırılacak çıkarıcı yapılandırmaları")
+    parser.add_argument("--work-dir", default=str(Path(tempfile.gettempdir()) / "enf_bench"),
+                        help="Sentetik kayıtların dizini (yeniden kullanılır; 24 saat @ 48 kHz stereo ~16 GB)")
+    parser.add_argument("--max-in-memory-samples", type=float, default=1.5e8,
+                        help="Bellek içi yapılandırmalar için en fazla örnek×kanal (üstü atlanır)")
+    parser.add_argument("--seed", type=int, default=0, help="Gerçek ENF eğrisi ve gürültü tohumu")
+    parser.add_argument("--output", default=None, help="Sonuç JSON dosyası")
+    parser.add_argument("--baseline", default=None, help="Karşılaştırılacak önceki sonuç JSON dosyası")
+    parser.add_argument("--fail-on-regression", action="store_true", help="Gerileme varsa çıkış kodu 1")
+    args = parser.parse_args()
+
+    grid = dict(PRESETS[args.preset])
+    for key, value in (("durations", args.durations), ("sample_rates", args.sample_rates),
+                       ("channels", args.channels), ("snr_db", args.snr)):
+        if value:
+            grid[key] = value
+
+    print("🚀 ENF Çıkarıcı Performans Karşılaştırması")
+    print("=" * 60)
+
+    results = run_benchmarks(grid, args.variants, args.work_dir, args.max_in_memory_samples, args.seed)
+
+    report = {
+        "timestamp": datetime.now().isoformat(),
+        "preset": args.preset,
+        "grid": grid,
+        "seed": args.seed,
+        "environment": environment_info(),
+        "results": results,
+    }
+
+    output_file = Path(args.output) if args.output else (
+        Path(__file__).resolve().parent / "results" / f"bench_{datetime.now().strftime('%Y-%m-%d_%H-%M-%S')}.json")
+    output_file.parent.mkdir(parents=True, exist_ok=True)
+    with open(output_file, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2, ensure_ascii=False)
+    print(f"\n📋 Sonuçlar kaydedildi: {output_file}")
+
+    if args.baseline:
+        with open(args.baseline, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)
+        regressions = compare_with_baseline(results, baseline)
+
+        print(f"\n📊 Temel çizgiyle karşılaştırma ({args.baseline}):")
+        if not regressions:
+            print("   ✅ Gerileme yok")
+        for case, metric, before, after in regressions:
+            print(f"   ❌ {case}: {metric} {before:.2f} -> {after:.2f}")
+
+        if regressions and args.fail_on_regression:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,373 @@
+#!/usr/bin/env python3
+"""
+Toplu ENF Çıkarımı
+Amaç: DataCollector katalogundaki (veya glob ile seçilen) tüm ses kayıtlarını
+çok çekirdekli bir süreç havuzunda işlemek
+- Dosya başına zaman aşımı ve hata yalıtımı
+- Sonuçlar processed/enf_extracted altına, ham dizin yapısı korunarak yazılır
+- Verim özeti (dosya/s, ses-saati/s)
+"""
+
+import argparse
+import json
+import logging
+import os
+import signal
+import time
+import wave
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+from concurrent.futures.process import BrokenProcessPool
+from datetime import datetime
+from pathlib import Path
+
+
+AUDIO_EXTENSIONS = ('.wav',)
+
+
+def default_worker_count():
+    """Makineye göre süreç havuzu boyutu (CPU affinity dikkate alınır)"""
+    if hasattr(os, "sched_getaffinity"):
+        return max(1, len(os.sched_getaffinity(0)))
+    return max(1, os.cpu_count() or 1)
+
+
+def audio_duration_seconds(file_path):
+    """WAV başlığından ses süresini oku (veriyi okumadan)"""
+    try:
+        with wave.open(str(file_path), 'rb') as wav_file:
+            return wav_file.getnframes() / float(wav_file.getframerate())
+    except Exception:
+        return 0.0
+
+
+class _FileTimeout(BaseException):
+    """Dosya başına zaman aşımı (çıkarıcının `except Exception` bloklarına takılmaz)"""
+
+
+def _raise_timeout(signum, frame):
+    raise _FileTimeout()
+
+
+def _extract_worker(task):
+    """
+    Havuz işçisi: tek bir dosyadan ENF çıkar
+
+    Her istisna yakalanır ve durum sözlüğü olarak döner, böylece bir dosyadaki
+    hata diğerlerini etkilemez.
+    """
+    file_path = task["file_path"]
+    timeout = task.get("timeout")
+    start = time.perf_counter()
+    cpu_start = time.process_time()
+
+    # İşçilerde aşama bazlı INFO logları verimi düşürür
+    logging.getLogger().setLevel(task.get("log_level", logging.WARNING))
+
+    use_alarm = bool(timeout) and hasattr(signal, "SIGALRM")
+    if use_alarm:
+        signal.signal(signal.SIGALRM, _raise_timeout)
+        signal.setitimer(signal.ITIMER_REAL, timeout)
+
+    try:
+        from enf_extract_audio import ENFAudioExtractor
+
+        extractor = ENFAudioExtractor(**task.get("extractor_args", {}))
+        for name, value in task.get("extractor_attrs", {}).items():
+            setattr(extractor, name, value)
+
+        if task.get("cache_dir"):
+            from utils.enf_cache import ENFCache
+            extractor.cache = ENFCache(task["cache_dir"], task["cache_max_bytes"])
+
+        results = extractor.extract_enf_from_audio(
+            file_path, task["output_dir"], streaming=task.get("streaming", False),
+            file_hash=task.get("file_hash"))
+
+        if results is None or results.get("status") != "success":
+            status = "error"
+            error_message = (results or {}).get("error_message", "Sonuç alınamadı")
+        else:
+            status, error_message = "success", None
+
+    except _FileTimeout:
+        status, error_message = "timeout", f"Zaman aşımı ({timeout} s)"
+        results = None
+    except Exception as e:
+        status, error_message = "error", str(e)
+        results = None
+    finally:
+        if use_alarm:
+            signal.setitimer(signal.ITIMER_REAL, 0)
+
+    return {
+        "file": str(file_path),
+        "status": status,
+        "error_message": error_message,
+        "audio_seconds": task.get("audio_seconds", 0.0),
+        "wall_seconds": time.perf_counter() - start,
+        "cpu_seconds": time.process_time() - cpu_start,
+        "output_files": results.get("output_files") if status == "success" else None,
+        "performance": results.get("performance") if status == "success" else None
+    }
+
+
+class BatchExtractor:
+    """Katalog / glob üzerinden toplu ENF çıkarım sınıfı"""
+
+    def __init__(self, base_dir="data", workers=None, timeout=None, streaming=False,
+                 extractor_args=None, extractor_attrs=None, cache_dir=None,
+                 cache_max_bytes=2 * 1024 ** 3):
+        self.base_dir = Path(base_dir)
+        self.output_dir = self.base_dir / "processed" / "enf_extracted"
+        self.workers = workers or default_worker_count()
+        self.timeout = timeout
+        self.streaming = streaming
+        self.extractor_args = extractor_args or {}
+        self.extractor_attrs = extractor_attrs or {"save_plot": False}
+        self.cache_dir = cache_dir
+        self.cache_max_bytes = cache_max_bytes
+
+        # Katalogdaki SHA-256 değerleri (önbellek anahtarı için yeniden hash'lemeyi önler)
+        self.catalog_hashes = {}
+
+        logging.basicConfig(
+            level=logging.INFO,
+            format='%(asctime)s - %(levelname)s - %(message)s'
+        )
+        self.logger = logging.getLogger(__name__)
+
+    def files_from_catalog(self, catalog_file=None):
+        """Katalogdan (catalog.sqlite3 veya metadata_catalog.json) ses dosyalarını seç"""
+        if catalog_file is None:
+            catalog_file = self.base_dir / "catalog.sqlite3"
+            if not catalog_file.exists():
+                catalog_file = self.base_dir / "metadata_catalog.json"
+        catalog_file = Path(catalog_file)
+
+        if catalog_file.suffix in (".sqlite3", ".db"):
+            from utils.catalog_db import CatalogDB
+            with CatalogDB(catalog_file) as db:
+                return self._select_audio(db.items())
+
+        with open(catalog_file, 'r', encoding='utf-8') as f:
+            catalog = json.load(f)
+        return self._select_audio(catalog.items())
+
+    def _select_audio(self, catalog_items):
+        """Katalog girdilerinden ses dosyalarını seç"""
+        files = []
+        for relative_path, file_info in catalog_items:
+            # Katalog Windows'ta oluşturulmuş olabilir
+            relative_path = relative_path.replace("\\", "/")
+            file_type = file_info.get("collection_metadata", {}).get("file_type")
+            if file_type == "audio" or relative_path.lower().endswith(AUDIO_EXTENSIONS):
+                file_path = self.base_dir / relative_path
+                files.append(file_path)
+                if file_info.get("hash_sha256"):
+                    self.catalog_hashes[str(file_path)] = file_info["hash_sha256"]
+        return files
+
+    def files_from_glob(self, pattern):
+        """Glob deseniyle ses dosyalarını seç (ör. 'raw/audio/**/*.wav')"""
+        return sorted(p for p in self.base_dir.glob(pattern)
+                      if p.is_file() and p.suffix.lower() in AUDIO_EXTENSIONS)
+
+    def _make_task(self, file_path):
+        """Dosya için işçi görevi oluştur"""
+        try:
+            relative_parent = file_path.parent.relative_to(self.base_dir / "raw")
+        except ValueError:
+            relative_parent = Path()
+
+        return {
+            "file_path": str(file_path),
+            "output_dir": str(self.output_dir / relative_parent),
+            "timeout": self.timeout,
+            "streaming": self.streaming,
+            "audio_seconds": audio_duration_seconds(file_path),
+            "extractor_args": self.extractor_args,
+            "extractor_attrs": self.extractor_attrs,
+            "cache_dir": self.cache_dir,
+            "cache_max_bytes": self.cache_max_bytes,
+            "file_hash": self.catalog_hashes.get(str(file_path))
+        }
+
+    def run(self, files):
+        """Dosyaları süreç havuzunda işle ve verim özetini döndür"""
+        files = [Path(f) for f in files]
+        missing = [f for f in files if not f.exists()]
+        for f in missing:
+            self.logger.warning(f"Dosya bulunamadı, atlanıyor: {f}")
+
+        pending = [self._make_task(f) for f in files if f.exists()]
+        pending.reverse()  # pop() ile sırayı koru
+        self.logger.info(f"Toplu ENF çıkarımı: {len(pending)} dosya, {self.workers} işçi")
+
+        results = []
+        suspects = []
+        start = time.perf_counter()
+
+        while pending:
+            # Süreç çökerse (ör. segfault) havuz bozulur: uçuştaki dosyalar
+            # şüpheli sayılır ve sonra tek tek yeniden denenir, kalanlar yeni
+            # havuzda devam eder
+            with ProcessPoolExecutor(max_workers=self.workers) as executor:
+                in_flight = {}
+                try:
+                    while pending or in_flight:
+                        while pending and len(in_flight) < 2 * self.workers:
+                            task = pending.pop()
+                            in_flight[executor.submit(_extract_worker, task)] = task
+
+                        done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                        for future in done:
+                            result = future.result()
+                            del in_flight[future]
+                            results.append(result)
+                            self._log_result(result, len(results))
+
+                except BrokenProcessPool:
+                    self.logger.warning(f"İşçi süreci çöktü, {len(in_flight)} dosya tek tek yeniden denenecek")
+                    suspects.extend(in_flight.values())
+
+        for task in suspects:
+            results.append(self._run_isolated(task))
+            self._log_result(results[-1], len(results))
+
+        wall_seconds = time.perf_counter() - start
+        summary = self._summarize(results, wall_seconds)
+        summary["missing_files"] = [str(f) for f in missing]
+        self._save_summary(summary)
+        self._print_summary(summary)
+        return summary
+
+    def _run_isolated(self, task):
+        """Şüpheli dosyayı tek işçili ayrı bir havuzda çalıştır"""
+        with ProcessPoolExecutor(max_workers=1) as executor:
+            try:
+                return executor.submit(_extract_worker, task).result()
+            except BrokenProcessPool as e:
+                return {
+                    "file": task["file_path"],
+                    "status": "crashed",
+                    "error_message": str(e) or "İşçi süreci beklenmedik şekilde sonlandı",
+                    "audio_seconds": task["audio_seconds"],
+                    "wall_seconds": 0.0,
+                    "cpu_seconds": 0.0,
+                    "output_files": None,
+                    "performance": None
+                }
+
+    def _log_result(self, result, index):
+        """Tek dosya sonucunu logla"""
+        if result["status"] == "success":
+            self.logger.info(f"[{index}] ✅ {result['file']} ({result['wall_seconds']:.1f} s)")
+        else:
+            self.logger.error(f"[{index}] ❌ {result['file']}: {result['status']} - {result['error_message']}")
+
+    def _summarize(self, results, wall_seconds):
+        """Verim özetini hesapla"""
+        succeeded = [r for r in results if r["status"] == "success"]
+        audio_seconds = sum(r["audio_seconds"] for r in succeeded)
+        cpu_seconds = sum(r["cpu_seconds"] for r in results)
+
+        # Aşama bazlı toplam süreler ve en yüksek işçi RSS'i (havuz boyutlandırma için)
+        stage_totals = {}
+        rss_values = []
+        for r in succeeded:
+            performance = r.get("performance") or {}
+            for stage, timing in performance.get("stages", {}).items():
+                totals = stage_totals.setdefault(stage, {"wall_seconds": 0.0, "cpu_seconds": 0.0})
+                totals["wall_seconds"] += timing["wall_seconds"]
+                totals["cpu_seconds"] += timing["cpu_seconds"]
+            if performance.get("rss_peak_mb") is not None:
+                rss_values.append(performance["rss_peak_mb"])
+
+        return {
+            "timestamp": datetime.now().isoformat(),
+            "workers": self.workers,
+            "total_files": len(results),
+            "succeeded": len(succeeded),
+            "failed": len(results) - len(succeeded),
+            "wall_seconds": wall_seconds,
+            "cpu_seconds": cpu_seconds,
+            "audio_hours": audio_seconds / 3600.0,
+            "files_per_second": len(results) / wall_seconds if wall_seconds > 0 else 0.0,
+            "audio_hours_per_second": audio_seconds / 3600.0 / wall_seconds if wall_seconds > 0 else 0.0,
+            "stage_totals": stage_totals,
+            "worker_rss_peak_mb": max(rss_values) if rss_values else None,
+            "results": sorted(results, key=lambda r: r["file"])
+        }
+
+    def _save_summary(self, summary):
+        """Özeti enf_extracted altına JSON olarak kaydet"""
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        summary_file = self.output_dir / f"batch_summary_{datetime.now().strftime('%Y-%m-%d_%H-%M-%S')}.json"
+        with open(summary_file, 'w', encoding='utf-8') as f:
+            json.dump(summary, f, indent=2, ensure_ascii=False)
+        summary["summary_file"] = str(summary_file)
+
+    def _print_summary(self, summary):
+        """Verim özetini yazdır"""
+        print(f"\n📊 Toplu ENF Çıkarımı Özeti:")
+        print(f"   • İşçi sayısı: {summary['workers']}")
+        print(f"   • Dosya: {summary['succeeded']} başarılı / {summary['failed']} başarısız")
+        print(f"   • Süre: {summary['wall_seconds']:.1f} s (CPU: {summary['cpu_seconds']:.1f} s)")
+        print(f"   • Verim: {summary['files_per_second']:.2f} dosya/s, "
+              f"{summary['audio_hours_per_second']:.3f} ses-saati/s")
+        if summary.get("worker_rss_peak_mb"):
+            print(f"   • En yüksek işçi belleği (RSS): {summary['worker_rss_peak_mb']:.0f} MB")
+        for stage, totals in sorted(summary.get("stage_totals", {}).items(),
+                                    key=lambda item: -item[1]["wall_seconds"]):
+            print(f"     - {stage:12s} {totals['wall_seconds']:8.2f} s (CPU {totals['cpu_seconds']:8.2f} s)")
+        print(f"   • Özet dosyası: {summary.get('summary_file')}")
+
+
+def main():
+    """Ana fonksiyon"""
+    parser = argparse.ArgumentParser(description="Toplu ENF çıkarımı")
+    parser.add_argument("--base-dir", default="data", help="DataCollector veri dizini")
+    parser.add_argument("--catalog", default=None,
+                        help="Katalog yolu (catalog.sqlite3 veya metadata_catalog.json)")
+    parser.add_argument("--glob", default=None, help="Katalog yerine glob deseni (base-dir'e göre)")
+    parser.add_argument("--workers", type=int, default=None, help="İşçi sayısı (varsayılan: CPU sayısı)")
+    parser.add_argument("--timeout", type=float, default=None, help="Dosya başına zaman aşımı (s)")
+    parser.add_argument("--streaming", action="store_true", help="Sabit bellekli akış modu")
+    parser.add_argument("--decimate-to", type=float, default=None, help="Seyreltme hedefi (Hz)")
+    parser.add_argument("--engine", choices=["stft", "zoom"], default="stft", help="Spektral motor")
+    parser.add_argument("--plot", action="store_true", help="Dosya başına grafik de üret")
+    parser.add_argument("--result-format", choices=["json", "binary", "both"], default="json",
+                        help="Sonuç dosyası biçimi")
+    parser.add_argument("--cache-dir", default=None, help="Ön uç önbellek dizini")
+    parser.add_argument("--cache-size-gb", type=float, default=2.0, help="Önbellek boyut sınırı (GB)")
+    parser.add_argument("--profile-memory", action="store_true",
+                        help="Aşama başına tracemalloc bellek tepesini de ölç")
+    parser.add_argument("--profile", action="store_true", help="Dosya başına cProfile dökümü kaydet")
+    args = parser.parse_args()
+
+    print("🚀 Toplu ENF Çıkarımı")
+    print("=" * 60)
+
+    batch = BatchExtractor(
+        base_dir=args.base_dir,
+        workers=args.workers,
+        timeout=args.timeout,
+        streaming=args.streaming,
+        extractor_args={"decimate_to": args.decimate_to},
+        extractor_attrs={"save_plot": args.plot, "spectral_engine": args.engine,
+                         "result_format": args.result_format, "profile_memory": args.profile_memory,
+                         "save_profile": args.profile},
+        cache_dir=args.cache_dir,
+        cache_max_bytes=int(args.cache_size_gb * 1024 ** 3)
+    )
+
+    files = batch.files_from_glob(args.glob) if args.glob else batch.files_from_catalog(args.catalog)
+    if not files:
+        print("❌ İşlenecek ses dosyası bulunamadı")
+        return
+
+    batch.run(files)
+
+
+if __name__ == "__main__":
+    main()
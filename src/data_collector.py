@@ -12,11 +12,26 @@ from datetime import datetime
 from pathlib import Path
 import shutil
 import logging
+import sys
+
+from utils.catalog_db import CatalogDB
+from utils.custody_log import CustodyLog, verify_custody_log
+from utils.file_hasher import FileHasher
+from utils.integrity import IntegrityCache, MerkleTree
 
 class DataCollector:
     """Veri toplama ve arşivleme sınıfı"""
     
-    def __init__(self, base_dir="data"):
+    def __init__(self, base_dir="data", hash_workers=None, extra_digests=(), catalog_backend="sqlite"):
+        """
+        Args:
+            base_dir: Veri dizini
+            hash_workers: Paralel hash iş parçacığı sayısı (None: CPU sayısı + 4)
+            extra_digests: SHA-256 ile aynı okuma geçişinde hesaplanacak ek
+                özetler (ör. ('blake2b',)); katalogda hash_<ad> alanı olarak saklanır
+            catalog_backend: 'sqlite' (data/catalog.sqlite3, indeksli, dosya başına
+                güncelleme) veya 'memory' (eski bellek içi sözlük)
+        """
         self.base_dir = Path(base_dir)
         self.raw_dir = self.base_dir / "raw"
         self.processed_dir = self.base_dir / "processed"
@@ -30,11 +45,26 @@ class DataCollector:
         
         # Hash ve metadata dosyaları
         self.checksums_file = self.base_dir / "checksums.csv"
-        self.custody_log_file = self.base_dir / "chain_of_custody.json"
+        self.custody_log_file = self.base_dir / "chain_of_custody.jsonl"
+        self.legacy_custody_file = self.base_dir / "chain_of_custody.json"
         self.metadata_file = self.base_dir / "metadata_catalog.json"
+        self.integrity_cache_file = self.base_dir / "integrity_cache.json"
+        
+        # Veri katalogu (metadata_catalog.json ve checksums.csv bundan dışa aktarılır)
+        self.catalog_db_file = self.base_dir / "catalog.sqlite3"
+        if catalog_backend == "sqlite":
+            self.data_catalog = CatalogDB(self.catalog_db_file)
+        elif catalog_backend == "memory":
+            self.data_catalog = {}
+        else:
+            raise ValueError(f"Bilinmeyen katalog arka ucu: {catalog_backend}")
+        
+        # Yalnızca eklemeli, hash zincirli custody logu
+        self.custody_log = CustodyLog(self.custody_log_file)
         
-        # Veri katalogu
-        self.data_catalog = {}
+        # Hash motoru (büyük tampon, tek geçişte tüm özetler, paralel dosyalar)
+        self.extra_digests = tuple(extra_digests)
+        self.hasher = FileHasher(("sha256",) + self.extra_digests, workers=hash_workers)
         
     def _create_directories(self):
         """Gerekli dizinleri oluştur"""
@@ -76,44 +106,90 @@ class DataCollector:
     
     def calculate_file_hash(self, file_path):
         """Dosya için SHA-256 hash hesapla"""
-        try:
-            hash_sha256 = hashlib.sha256()
-            with open(file_path, "rb") as f:
-                for chunk in iter(lambda: f.read(4096), b""):
-                    hash_sha256.update(chunk)
-            return hash_sha256.hexdigest()
-        except Exception as e:
-            self.logger.error(f"Hash hesaplama hatası {file_path}: {e}")
+        result = self.hasher.hash_file(file_path)
+        if result.error:
+            self.logger.error(f"Hash hesaplama hatası {file_path}: {result.error}")
             return None
+        return result.digests["sha256"]
+    
+    def _build_file_info(self, file_path, metadata, digests, store=True):
+        """Katalog kaydını oluştur ve (store ise) data_catalog'a ekle"""
+        stat = file_path.stat()
+        file_info = {
+            "filename": file_path.name,
+            "file_path": str(file_path),
+            "file_size_bytes": stat.st_size,
+            "file_size_mb": round(stat.st_size / (1024 * 1024), 2),
+            "created_time": datetime.fromtimestamp(stat.st_ctime).isoformat(),
+            "modified_time": datetime.fromtimestamp(stat.st_mtime).isoformat(),
+            "hash_sha256": digests["sha256"] if digests else None,
+            "collection_metadata": metadata
+        }
+        for name in self.extra_digests:
+            file_info[f"hash_{name}"] = digests[name] if digests else None
+        
+        # Katalog'a ekle
+        relative_path = file_path.relative_to(self.base_dir).as_posix()
+        if store:
+            self.data_catalog[relative_path] = file_info
+            self.logger.info(f"Metadata kaydedildi: {file_path.name}")
+        return relative_path, file_info
     
     def record_file_metadata(self, file_path, metadata):
         """Dosya metadata'sını kaydet"""
         file_path = Path(file_path)
         
         if file_path.exists():
-            # Temel dosya bilgileri
-            stat = file_path.stat()
-            file_info = {
-                "filename": file_path.name,
-                "file_path": str(file_path),
-                "file_size_bytes": stat.st_size,
-                "file_size_mb": round(stat.st_size / (1024 * 1024), 2),
-                "created_time": datetime.fromtimestamp(stat.st_ctime).isoformat(),
-                "modified_time": datetime.fromtimestamp(stat.st_mtime).isoformat(),
-                "hash_sha256": self.calculate_file_hash(file_path),
-                "collection_metadata": metadata
-            }
-            
-            # Katalog'a ekle
-            relative_path = str(file_path.relative_to(self.base_dir))
-            self.data_catalog[relative_path] = file_info
-            
-            self.logger.info(f"Metadata kaydedildi: {file_path.name}")
+            result = self.hasher.hash_file(file_path)
+            if result.error:
+                self.logger.error(f"Hash hesaplama hatası {file_path}: {result.error}")
+            relative_path, file_info = self._build_file_info(file_path, metadata, result.digests)
+            self.custody_log.append(*self._custody_record_event(relative_path, file_info))
             return file_info
         else:
             self.logger.warning(f"Dosya bulunamadı: {file_path}")
             return None
     
+    def record_files_metadata(self, files):
+        """
+        Birden çok dosyanın metadata'sını kaydet (hash'ler paralel hesaplanır)
+        
+        Args:
+            files: (file_path, metadata) çiftleri
+            
+        Returns:
+            list: Kaydedilen dosya bilgileri (bulunamayan dosyalar atlanır)
+        """
+        existing = []
+        for file_path, metadata in files:
+            file_path = Path(file_path)
+            if file_path.exists():
+                existing.append((file_path, metadata))
+            else:
+                self.logger.warning(f"Dosya bulunamadı: {file_path}")
+        
+        recorded = []
+        results = self.hasher.hash_files(file_path for file_path, _ in existing)
+        for (file_path, metadata), result in zip(existing, results):
+            if result.error:
+                self.logger.error(f"Hash hesaplama hatası {file_path}: {result.error}")
+            recorded.append(self._build_file_info(file_path, metadata, result.digests, store=False))
+        
+        # Tüm kayıtlar tek işlemde yazılır (SQLite'ta tek COMMIT)
+        self.data_catalog.update(recorded)
+        self.custody_log.append_many(self._custody_record_event(relative_path, file_info)
+                                     for relative_path, file_info in recorded)
+        self.logger.info(f"Metadata kaydedildi: {len(recorded)} dosya")
+        return [file_info for _, file_info in recorded]
+    
+    def _custody_record_event(self, relative_path, file_info):
+        """Kataloğa kayıt için custody olayı"""
+        return "file_recorded", {
+            "file": relative_path,
+            "sha256": file_info["hash_sha256"],
+            "size_bytes": file_info["file_size_bytes"],
+        }
+    
     def create_sample_data_files(self):
         """Test için örnek veri dosyaları oluştur"""
         self.logger.info("Örnek veri dosyaları oluşturuluyor...")
@@ -142,6 +218,7 @@ class DataCollector:
         
         all_files = audio_files + video_files + image_files
         
+        records = []
         for file_path, file_type in all_files:
             full_path = self.raw_dir / file_path
             
@@ -170,11 +247,15 @@ class DataCollector:
                 "weather": "Clear, 22°C, 65% humidity",
                 "notes": "Simulated data for testing purposes"
             }
-            
-            self.record_file_metadata(full_path, metadata)
+            records.append((full_path, metadata))
+        
+        # Hash'ler tüm dosyalar oluşturulduktan sonra paralel hesaplanır
+        self.record_files_metadata(records)
     
     def _create_dummy_audio_file(self, file_path):
         """Simüle edilmiş ses dosyası oluştur"""
+        import numpy as np
+        
         # WAV header (44.1 kHz, 16-bit, mono)
         sample_rate = 44100
         duration = 10 * 60  # 10 dakika
@@ -273,6 +354,7 @@ class DataCollector:
         with open(self.checksums_file, 'w', newline='', encoding='utf-8') as csvfile:
             fieldnames = ['file_path', 'filename', 'file_size_bytes', 'file_size_mb', 
                          'hash_sha256', 'created_time', 'modified_time', 'file_type']
+            fieldnames += [f'hash_{name}' for name in self.extra_digests]
             writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
             
             writer.writeheader()
@@ -286,129 +368,252 @@ class DataCollector:
                     'hash_sha256': file_info['hash_sha256'],
                     'created_time': file_info['created_time'],
                     'modified_time': file_info['modified_time'],
-                    'file_type': file_info['collection_metadata']['file_type']
+                    'file_type': file_info['collection_metadata']['file_type'],
+                    **{f'hash_{name}': file_info.get(f'hash_{name}') for name in self.extra_digests}
                 })
         
         print(f"✅ Checksums CSV oluşturuldu: {self.checksums_file}")
     
     def generate_custody_log(self):
-        """Chain-of-custody log dosyası oluştur"""
-        self.logger.info("Chain-of-custody log oluşturuluyor...")
+        """
+        Chain-of-custody logunu başlat
         
-        custody_log = {
-            "project_info": {
-                "project_name": "ENF Metadata Gömme Projesi",
-                "project_version": "1.0",
-                "collection_date": "2024-01-15",
-                "collector": "gzmctntsss",
-                "location": "Istanbul, Turkey"
-            },
-            "collection_protocol": {
-                "audio_recording": {
-                    "format": "WAV, 44.1 kHz, 16-bit",
-                    "duration": "10 minutes per environment",
-                    "environments": ["sessiz", "ofis", "dis_mekan"],
-                    "devices": ["iPhone", "Samsung"]
-                },
-                "video_recording": {
-                    "format": "MP4, H.264, 1920x1080",
-                    "duration": "5 minutes per scenario",
-                    "scenarios": ["led_statik", "led_dinamik", "karsilastirma"],
-                    "fps": [30, 60, 30]
-                },
-                "image_capture": {
-                    "format": "JPG, RAW",
-                    "frequency": "1 photo/second for 1 minute",
-                    "lighting": "LED (50 Hz)"
-                }
-            },
-            "data_integrity": {
-                "hash_algorithm": "SHA-256",
-                "checksums_file": str(self.checksums_file),
-                "total_files": len(self.data_catalog),
-                "verification_status": "pending"
-            },
-            "collection_log": [
-                {
-                    "timestamp": "2024-01-15T09:00:00Z",
-                    "action": "Collection started",
-                    "location": "Sessiz oda",
-                    "device": "iPhone",
-                    "notes": "LED aydınlatma, gürültü seviyesi <30 dB"
-                },
-                {
-                    "timestamp": "2024-01-15T11:30:00Z",
-                    "action": "Collection completed",
-                    "location": "Tüm ortamlar",
-                    "device": "iPhone + Samsung",
-                    "notes": "3 farklı ortamda ses kayıtları tamamlandı"
-                },
-                {
-                    "timestamp": "2024-01-15T17:00:00Z",
-                    "action": "Data archiving",
-                    "location": "Data center",
-                    "device": "Computer",
-                    "notes": "Tüm dosyalar hash'lendi ve kataloglandı"
-                }
-            ]
-        }
+        Proje / protokol olayları yalnızca log boşken (ilk çalıştırmada)
+        eklenir. Eski sürümlerin yazdığı chain_of_custody.json varsa bu ilk
+        çalıştırmada içe aktarılır; sonraki çalıştırmalar zinciri değiştirmez.
+        """
+        self.logger.info("Chain-of-custody log başlatılıyor...")
         
-        with open(self.custody_log_file, 'w', encoding='utf-8') as f:
-            json.dump(custody_log, f, indent=2, ensure_ascii=False)
+        if os.path.exists(self.legacy_custody_file):
+            events = self._legacy_custody_events()
+        else:
+            events = [
+                ("collection_protocol", {
+                    "project_info": {
+                        "project_name": "ENF Metadata Gömme Projesi",
+                        "project_version": "1.0",
+                        "collector": "gzmctntsss",
+                        "location": "Istanbul, Turkey"
+                    },
+                    "collection_protocol": {
+                        "audio_recording": {
+                            "format": "WAV, 44.1 kHz, 16-bit",
+                            "duration": "10 minutes per environment",
+                            "environments": ["sessiz", "ofis", "dis_mekan"],
+                            "devices": ["iPhone", "Samsung"]
+                        },
+                        "video_recording": {
+                            "format": "MP4, H.264, 1920x1080",
+                            "duration": "5 minutes per scenario",
+                            "scenarios": ["led_statik", "led_dinamik", "karsilastirma"],
+                            "fps": [30, 60, 30]
+                        },
+                        "image_capture": {
+                            "format": "JPG, RAW",
+                            "frequency": "1 photo/second for 1 minute",
+                            "lighting": "LED (50 Hz)"
+                        }
+                    }
+                }),
+                ("data_integrity", {
+                    "hash_algorithm": "SHA-256",
+                    "checksums_file": str(self.checksums_file)
+                })
+            ]
         
-        print(f"✅ Chain-of-custody log oluşturuldu: {self.custody_log_file}")
+        if self.custody_log.append_if_empty(events):
+            self.custody_log.flush()
+            print(f"✅ Chain-of-custody log başlatıldı: {self.custody_log_file} ({len(events)} olay)")
+        else:
+            self.logger.info("Chain-of-custody log zaten başlatılmış, başlangıç olayları eklenmedi")
+    
+    def _legacy_custody_events(self):
+        """Eski chain_of_custody.json belgesini custody olaylarına çevir"""
+        with open(self.legacy_custody_file, 'rb') as f:
+            raw = f.read()
+        legacy = json.loads(raw)
+        
+        # Kaynak belgenin hash'i içe aktarılan olayları orijinal dosyaya bağlar
+        events = [("legacy_log_imported", {
+            "file": str(self.legacy_custody_file),
+            "sha256": hashlib.sha256(raw).hexdigest(),
+            "entries": len(legacy.get("collection_log", []))
+        })]
+        if "project_info" in legacy or "collection_protocol" in legacy:
+            events.append(("collection_protocol", {
+                "project_info": legacy.get("project_info"),
+                "collection_protocol": legacy.get("collection_protocol")
+            }))
+        if "data_integrity" in legacy:
+            events.append(("data_integrity", legacy["data_integrity"]))
+        for entry in legacy.get("collection_log", []):
+            details = {key: value for key, value in entry.items() if key != "action"}
+            events.append((entry.get("action", "legacy_entry"), details))
+        return events
+    
+    def verify_custody_log(self):
+        """Custody log zincirini baştan sona doğrula"""
+        self.custody_log.flush()
+        result = verify_custody_log(self.custody_log_file)
+        if result["valid"]:
+            print(f"✅ Custody log zinciri geçerli: {result['entries']} olay, baş {result['head_hash'][:16]}…")
+        else:
+            print(f"❌ Custody log zinciri bozuk (satır {result['line']}): {result['error']}")
+        return result
     
     def generate_metadata_catalog(self):
         """Metadata katalog dosyası oluştur"""
         self.logger.info("Metadata katalog dosyası oluşturuluyor...")
         
-        with open(self.metadata_file, 'w', encoding='utf-8') as f:
-            json.dump(self.data_catalog, f, indent=2, ensure_ascii=False)
+        if isinstance(self.data_catalog, CatalogDB):
+            # Veritabanından akış halinde dışa aktarma görünümü
+            self.data_catalog.export_json(self.metadata_file)
+        else:
+            with open(self.metadata_file, 'w', encoding='utf-8') as f:
+                json.dump(self.data_catalog, f, indent=2, ensure_ascii=False)
         
         print(f"✅ Metadata katalog oluşturuldu: {self.metadata_file}")
     
-    def verify_data_integrity(self):
-        """Veri bütünlüğünü doğrula"""
+    def load_metadata_catalog(self):
+        """Mevcut metadata_catalog.json'u data_catalog'a yükle"""
+        self.logger.info(f"Metadata katalog yükleniyor: {self.metadata_file}")
+        
+        with open(self.metadata_file, 'r', encoding='utf-8') as f:
+            catalog = json.load(f)
+        
+        # Katalog Windows'ta oluşturulmuş olabilir, yolları normalize et
+        catalog = {
+            relative_path.replace("\\", "/"): file_info
+            for relative_path, file_info in catalog.items()
+        }
+        if isinstance(self.data_catalog, CatalogDB):
+            self.data_catalog.replace_all(catalog)
+        else:
+            self.data_catalog = catalog
+        return self.data_catalog
+    
+    def verify_data_integrity(self, incremental=False, full=False, sample_fraction=0.0):
+        """
+        Veri bütünlüğünü doğrula
+        
+        Her çalıştırmada dosyaların stat imzaları ve okunan hash'leri
+        integrity_cache.json'a, katalog Merkle kökü sonuçlara yazılır.
+        
+        Args:
+            incremental: Boyut / mtime_ns / inode'u değişmemiş ve önbellekteki
+                hash'i katalogla aynı olan dosyaları yeniden okumadan atla
+            full: Artımlı modda da tüm dosyaları yeniden hash'le
+            sample_fraction: Artımlı modda atlanacak dosyaların en uzun süredir
+                okunmamış bu kadarını yine de yeniden hash'le (ör. 0.05)
+        """
         self.logger.info("Veri bütünlüğü doğrulanıyor...")
         
+        cache = IntegrityCache(self.integrity_cache_file)
+        previous_hashes = {path: entry["sha256"] for path, entry in cache.entries.items()}
         verification_results = {
             "total_files": len(self.data_catalog),
             "verified_files": 0,
             "failed_files": 0,
+            "cached_files": 0,
+            "rehashed_files": 0,
             "verification_details": []
         }
         
+        # Stat imzası önbellekle eşleşen dosyalar okunmadan atlanır
+        clean = []
+        to_hash = []
+        current_hashes = {}
         for relative_path, file_info in self.data_catalog.items():
             file_path = self.base_dir / relative_path
-            
-            if file_path.exists():
-                # Hash'i yeniden hesapla
-                current_hash = self.calculate_file_hash(file_path)
-                stored_hash = file_info['hash_sha256']
-                
-                if current_hash == stored_hash:
-                    verification_results["verified_files"] += 1
-                    verification_results["verification_details"].append({
-                        "file": relative_path,
-                        "status": "verified",
-                        "hash_match": True
-                    })
-                else:
-                    verification_results["failed_files"] += 1
-                    verification_results["verification_details"].append({
-                        "file": relative_path,
-                        "status": "failed",
-                        "hash_match": False,
-                        "stored_hash": stored_hash,
-                        "current_hash": current_hash
-                    })
-            else:
+            try:
+                stat = file_path.stat()
+            except FileNotFoundError:
+                current_hashes[relative_path] = None
+                cache.forget(relative_path)
                 verification_results["failed_files"] += 1
                 verification_results["verification_details"].append({
                     "file": relative_path,
                     "status": "missing",
                     "hash_match": False
                 })
+                continue
+            
+            if incremental and not full and cache.is_clean(relative_path, stat, file_info['hash_sha256']):
+                clean.append(relative_path)
+            else:
+                to_hash.append((relative_path, file_path, stat, file_info))
+        
+        # Örneklem: en uzun süredir okunmamış dosyalar yeniden hash'lenir
+        sampled = set(cache.oldest(clean, sample_fraction))
+        for relative_path in clean:
+            if relative_path in sampled:
+                file_path = self.base_dir / relative_path
+                to_hash.append((relative_path, file_path, file_path.stat(), self.data_catalog[relative_path]))
+            else:
+                current_hashes[relative_path] = cache.entries[relative_path]["sha256"]
+                verification_results["verified_files"] += 1
+                verification_results["cached_files"] += 1
+        
+        # Kalan dosyalar paralel hash'lenir; sonuçlar sırayla gelir
+        results = self.hasher.hash_files(file_path for _, file_path, _, _ in to_hash)
+        for (relative_path, file_path, stat, file_info), result in zip(to_hash, results):
+            if result.error:
+                self.logger.error(f"Hash hesaplama hatası {file_path}: {result.error}")
+            digests = result.digests or {}
+            verification_results["rehashed_files"] += 1
+            
+            current_hash = digests.get("sha256")
+            stored_hash = file_info['hash_sha256']
+            current_hashes[relative_path] = current_hash
+            if current_hash:
+                cache.update(relative_path, stat, current_hash)
+            else:
+                cache.forget(relative_path)
+            
+            # Katalogda saklanan ek özetler de aynı okuma geçişinden gelir
+            extra_match = all(digests.get(name) == file_info[f"hash_{name}"]
+                              for name in self.extra_digests if file_info.get(f"hash_{name}"))
+            
+            if current_hash == stored_hash and extra_match:
+                verification_results["verified_files"] += 1
+                verification_results["verification_details"].append({
+                    "file": relative_path,
+                    "status": "verified",
+                    "hash_match": True
+                })
+            else:
+                verification_results["failed_files"] += 1
+                verification_results["verification_details"].append({
+                    "file": relative_path,
+                    "status": "failed",
+                    "hash_match": False,
+                    "stored_hash": stored_hash,
+                    "current_hash": current_hash
+                })
+        
+        # Merkle kökü tüm veri setini tek hash ile temsil eder; önceki
+        # çalıştırmadan bu yana değişen dosyalar ağaç karşılaştırmasıyla bulunur
+        tree = MerkleTree.from_hashes(current_hashes)
+        verification_results["merkle_root"] = tree.root
+        verification_results["previous_merkle_root"] = cache.merkle_root
+        if cache.merkle_root and cache.merkle_root != tree.root:
+            previous = MerkleTree.from_hashes({
+                relative_path: previous_hashes.get(relative_path) for relative_path in current_hashes
+            })
+            verification_results["changed_since_last_run"] = [
+                tree.paths[index] for index in tree.diff(previous)
+            ]
+        
+        cache.save(self.data_catalog, tree.root)
+        
+        self.custody_log.append("integrity_verified", {
+            "total_files": verification_results["total_files"],
+            "verified_files": verification_results["verified_files"],
+            "failed_files": verification_results["failed_files"],
+            "rehashed_files": verification_results["rehashed_files"],
+            "merkle_root": tree.root
+        })
+        self.custody_log.flush()
         
         # Sonuçları kaydet
         verification_file = self.base_dir / "verification_results.json"
@@ -420,6 +625,9 @@ class DataCollector:
         print(f"   Toplam dosya: {verification_results['total_files']}")
         print(f"   Doğrulanan: {verification_results['verified_files']}")
         print(f"   Başarısız: {verification_results['failed_files']}")
+        print(f"   Önbellekten: {verification_results['cached_files']}, "
+              f"yeniden hash'lenen: {verification_results['rehashed_files']}")
+        print(f"   Merkle kökü: {verification_results['merkle_root']}")
         
         return verification_results
     
@@ -428,15 +636,15 @@ class DataCollector:
         self.logger.info("Veri toplama işlemi başlatılıyor...")
         
         try:
-            # 1. Örnek veri dosyaları oluştur
+            # 1. Chain-of-custody log başlat (dosya kayıtlarından önce, log boşken)
+            self.generate_custody_log()
+            
+            # 2. Örnek veri dosyaları oluştur
             self.create_sample_data_files()
             
-            # 2. Checksums CSV oluştur
+            # 3. Checksums CSV oluştur
             self.generate_checksums_csv()
             
-            # 3. Chain-of-custody log oluştur
-            self.generate_custody_log()
-            
             # 4. Metadata katalog oluştur
             self.generate_metadata_catalog()
             
@@ -460,11 +668,46 @@ class DataCollector:
 
 def main():
     """Ana fonksiyon"""
+    import argparse
+    
+    parser = argparse.ArgumentParser(description="ENF veri toplama ve arşivleme")
+    parser.add_argument("--base-dir", default="data", help="Veri dizini")
+    parser.add_argument("--verify", action="store_true",
+                        help="Yalnızca mevcut katalogdaki dosyaların hash'lerini doğrula")
+    parser.add_argument("--incremental", action="store_true",
+                        help="Doğrulamada stat önbelleğiyle değişmemiş dosyaları atla")
+    parser.add_argument("--full", action="store_true",
+                        help="Artımlı modda da tüm dosyaları yeniden hash'le")
+    parser.add_argument("--sample", type=float, default=0.0,
+                        help="Artımlı modda en eski doğrulanan dosyaların bu oranını yeniden hash'le")
+    parser.add_argument("--verify-custody", action="store_true",
+                        help="Yalnızca chain-of-custody log zincirini doğrula")
+    parser.add_argument("--catalog-backend", choices=["sqlite", "memory"], default="sqlite",
+                        help="Katalog arka ucu (sqlite: data/catalog.sqlite3)")
+    parser.add_argument("--hash-workers", type=int, default=None,
+                        help="Paralel hash iş parçacığı sayısı (varsayılan: CPU sayısı + 4)")
+    parser.add_argument("--extra-digest", action="append", default=[],
+                        help="SHA-256 ile aynı geçişte hesaplanacak ek özet (ör. blake2b)")
+    args = parser.parse_args()
+    
     print("🚀 ENF Veri Toplama ve Arşivleme - Gün 4")
     print("=" * 60)
     
     # Data Collector oluştur
-    collector = DataCollector()
+    collector = DataCollector(args.base_dir, hash_workers=args.hash_workers,
+                              extra_digests=args.extra_digest, catalog_backend=args.catalog_backend)
+    
+    if args.verify_custody:
+        # Hata ve satır numarası verify_custody_log tarafından yazdırılır
+        sys.exit(0 if collector.verify_custody_log()["valid"] else 1)
+    
+    if args.verify:
+        # SQLite katalog doğruluk kaynağıdır; yoksa (eski kurulum) JSON'dan içe aktarılır
+        if not len(collector.data_catalog):
+            collector.load_metadata_catalog()
+        verification_results = collector.verify_data_integrity(
+            incremental=args.incremental, full=args.full, sample_fraction=args.sample)
+        sys.exit(0 if verification_results["failed_files"] == 0 else 1)
     
     # Veri toplama işlemini çalıştır
     results = collector.run_data_collection()
@@ -485,9 +728,8 @@ def main():
         print(f"\n❌ Veri toplama hatası: {results['error_message']}")
 
 if __name__ == "__main__":
-    # NumPy import hatası için try-except
+    # NumPy import hatası için try-except (NumPy yalnızca örnek ses üretilirken yüklenir)
     try:
-        import numpy as np
         main()
     except ImportError:
         print("❌ NumPy kütüphanesi bulunamadı")
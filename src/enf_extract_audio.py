@@ -8,20 +8,21 @@ Amaç: Çalışan bir temel boru hattı
 """
 
 import numpy as np
-import matplotlib.pyplot as plt
-from scipy import signal
-from scipy.signal import butter, filtfilt
-import librosa
 import wave
 import json
 from pathlib import Path
 from datetime import datetime
 import logging
 
+from utils.spectral import (decimation_factor, decimate, StreamingDecimator, track_peaks,
+                            make_zoom_transform, zoom_peak_track, zoom_spectrogram)
+from utils.enf_format import save_enf_binary, BINARY_SUFFIX
+from utils.profiling import StageProfiler
+
 class ENFAudioExtractor:
     """Ses dosyalarından ENF çıkaran sınıf"""
     
-    def __init__(self, sample_rate=44100, target_freq=50.0):
+    def __init__(self, sample_rate=44100, target_freq=50.0, decimate_to=None):
         self.sample_rate = sample_rate
         self.target_freq = target_freq  # Hedef ENF frekansı (50 Hz)
         self.freq_tolerance = 5.0  # ±5 Hz tolerans (45-55 Hz)
@@ -30,10 +31,43 @@ class ENFAudioExtractor:
         self.low_cutoff = self.target_freq - self.freq_tolerance  # 45 Hz
         self.high_cutoff = self.target_freq + self.freq_tolerance  # 55 Hz
         
+        # Seyreltme (decimation) parametreleri: None ise devre dışı, ör. 1000 Hz
+        # Filtre ve STFT seyreltilmiş örnekleme oranında (analysis_rate) çalışır
+        self.decimate_to = decimate_to
+        self.decimation_factor = decimation_factor(
+            self.sample_rate, self.decimate_to, min_rate=2 * self.high_cutoff)
+        self.analysis_rate = self.sample_rate / self.decimation_factor
+        
         # STFT parametreleri
         self.window_size = 1024
         self.hop_length = 512
         
+        # Spektral motor: 'stft' (librosa, tam bant) veya 'zoom' (chirp-z, yalnızca
+        # zoom_band içinde zoom_resolution adımlarla; None ise filtre bandı)
+        self.spectral_engine = 'stft'
+        self.zoom_band = None
+        self.zoom_resolution = 0.01
+        
+        # Tepe takibi alt-bin interpolasyonu: None, 'parabolic' veya 'gaussian'
+        self.peak_interpolation = None
+        
+        # Akış (streaming) modu blok boyutu (frame sayısı, ~23 s @ 44.1 kHz)
+        self.stream_block_size = 2 ** 20
+        
+        # Düzgünleştirme ve çıktı ayarları (önbellek anahtarına girmez)
+        self.smoothing_window = 5
+        self.save_plot = True
+        self.result_format = 'json'  # 'json', 'binary' (.enfb) veya 'both'
+        
+        # İsteğe bağlı ön uç önbelleği (utils.enf_cache.ENFCache)
+        self.cache = None
+        
+        # Aşama ölçümü: süre ve CPU her zaman, tracemalloc bellek tepesi
+        # profile_memory ile (ek yükü vardır); save_profile ile cProfile dökümü
+        self.profile_memory = False
+        self.save_profile = False
+        self.profiler = StageProfiler()
+        
         # Logging ayarla
         self._setup_logging()
         
@@ -66,19 +100,7 @@ class ENFAudioExtractor:
                 
                 # Ses verisini oku
                 audio_data = wav_file.readframes(n_frames)
-                
-                # 16-bit PCM'den numpy array'e dönüştür
-                if sample_width == 2:  # 16-bit
-                    audio_data = np.frombuffer(audio_data, dtype=np.int16)
-                else:
-                    raise ValueError(f"Desteklenmeyen sample width: {sample_width}")
-                
-                # Stereo ise mono'ya dönüştür
-                if n_channels == 2:
-                    audio_data = audio_data.reshape(-1, 2).mean(axis=1)
-                
-                # Float32'ye normalize et
-                audio_data = audio_data.astype(np.float32) / 32767.0
+                audio_data = self._pcm_to_float(audio_data, n_channels, sample_width)
                 
                 self.logger.info(f"Ses dosyası yüklendi: {n_frames} frame, {sample_rate} Hz")
                 return audio_data, sample_rate
@@ -87,36 +109,93 @@ class ENFAudioExtractor:
             self.logger.error(f"Ses dosyası yükleme hatası: {e}")
             return None, None
     
-    def design_bandpass_filter(self):
-        """50 Hz çevresinde bant geçiren filtre tasarla"""
+    def _pcm_to_float(self, raw_bytes, n_channels, sample_width):
+        """Ham PCM byte'larını mono float32 diziye dönüştür"""
+        # 16-bit PCM'den numpy array'e dönüştür
+        if sample_width == 2:  # 16-bit
+            audio_data = np.frombuffer(raw_bytes, dtype=np.int16)
+        else:
+            raise ValueError(f"Desteklenmeyen sample width: {sample_width}")
+        
+        # Stereo ise mono'ya dönüştür
+        if n_channels == 2:
+            audio_data = audio_data.reshape(-1, 2).mean(axis=1)
+        
+        # Float32'ye normalize et
+        return audio_data.astype(np.float32) / 32767.0
+    
+    def iter_audio_blocks(self, file_path, block_size=None):
+        """WAV dosyasını sabit boyutlu bloklar halinde oku (sabit bellek)"""
+        block_size = block_size or self.stream_block_size
+        
+        with wave.open(str(file_path), 'rb') as wav_file:
+            n_channels = wav_file.getnchannels()
+            sample_width = wav_file.getsampwidth()
+            
+            while True:
+                raw_bytes = wav_file.readframes(block_size)
+                if not raw_bytes:
+                    break
+                yield self._pcm_to_float(raw_bytes, n_channels, sample_width)
+    
+    def decimate_audio(self, audio_data):
+        """Filtre ve STFT öncesi alias önleyici çok fazlı seyreltme uygula"""
+        if self.decimation_factor <= 1:
+            return audio_data
+        
         try:
-            # Butterworth bant geçiren filtre
-            nyquist = self.sample_rate / 2
-            low_norm = self.low_cutoff / nyquist
-            high_norm = self.high_cutoff / nyquist
+            self.logger.info(f"Seyreltme uygulanıyor: {self.sample_rate} Hz -> {self.analysis_rate:.1f} Hz "
+                             f"(q={self.decimation_factor})")
+            return decimate(audio_data, self.decimation_factor)
             
-            # Filtre sırası (4. sıra)
-            filter_order = 4
+        except Exception as e:
+            self.logger.error(f"Seyreltme hatası: {e}")
+            return None
+    
+    def design_bandpass_sos(self):
+        """50 Hz çevresinde bant geçiren filtreyi ikinci dereceden bölümler (SOS) olarak tasarla"""
+        try:
+            from scipy.signal import butter
             
-            # Filtre katsayılarını hesapla
-            b, a = butter(filter_order, [low_norm, high_norm], btype='band')
+            nyquist = self.analysis_rate / 2
+            sos = butter(4, [self.low_cutoff / nyquist, self.high_cutoff / nyquist],
+                         btype='band', output='sos')
             
-            self.logger.info(f"Bant geçiren filtre tasarlandı: {self.low_cutoff}-{self.high_cutoff} Hz")
-            return b, a
+            self.logger.info(f"SOS bant geçiren filtre tasarlandı: {self.low_cutoff}-{self.high_cutoff} Hz")
+            return sos
             
         except Exception as e:
             self.logger.error(f"Filtre tasarım hatası: {e}")
-            return None, None
+            return None
+    
+    def filter_group_delay(self, sos):
+        """
+        Filtrenin hedef frekanstaki grup gecikmesi (saniye)
+        
+        Filtre nedensel (tek geçiş) uygulandığı için çerçeve zamanları bu kadar
+        geri kaydırılır; bellek içi ve akış yolları aynı düzeltmeyi kullanır.
+        """
+        from scipy.signal import sosfreqz
+        
+        delta = 0.01
+        w = 2 * np.pi * np.array([self.target_freq - delta, self.target_freq + delta]) / self.analysis_rate
+        _, response = sosfreqz(sos, worN=w)
+        phase = np.unwrap(np.angle(response))
+        return float(-(phase[1] - phase[0]) / (w[1] - w[0])) / self.analysis_rate
     
-    def apply_bandpass_filter(self, audio_data, b, a):
-        """Ses verisine bant geçiren filtre uygula"""
+    def apply_bandpass_sos(self, audio_data, sos):
+        """Ses verisine SOS bant geçiren filtreyi nedensel tek geçişle (sosfilt) uygula"""
         try:
-            self.logger.info("Bant geçiren filtre uygulanıyor...")
+            self.logger.info("Bant geçiren filtre (SOS) uygulanıyor...")
             
-            # Filtreyi uygula (forward-backward filtfilt ile faz gecikmesi olmadan)
-            filtered_audio = filtfilt(b, a, audio_data)
+            from scipy.signal import sosfilt
+            
+            # Dar bant / yüksek örnekleme oranında b, a katsayıları sayısal olarak
+            # kararsız, SOS formu kararlı. Akış modu aynı filtreyi bloklar halinde
+            # uyguladığı için iki yol aynı genlik ve faz yanıtını görür; grup
+            # gecikmesi çerçeve zamanlarında düzeltilir (filter_group_delay)
+            filtered_audio = sosfilt(sos, audio_data)
             
-            # NaN ve infinite değerleri kontrol et ve temizle
             if np.any(np.isnan(filtered_audio)) or np.any(np.isinf(filtered_audio)):
                 self.logger.warning("Filtrelenmiş ses verisinde NaN/infinite değerler bulundu, temizleniyor...")
                 filtered_audio = np.nan_to_num(filtered_audio, nan=0.0, posinf=1.0, neginf=-1.0)
@@ -133,6 +212,8 @@ class ENFAudioExtractor:
         try:
             self.logger.info("STFT özellikleri çıkarılıyor...")
             
+            import librosa
+            
             # STFT hesapla
             stft_matrix = librosa.stft(
                 filtered_audio, 
@@ -145,10 +226,10 @@ class ENFAudioExtractor:
             power_spectrum = np.abs(stft_matrix) ** 2
             
             # Frekans ekseni
-            freqs = librosa.fft_frequencies(sr=self.sample_rate, n_fft=self.window_size)
+            freqs = librosa.fft_frequencies(sr=self.analysis_rate, n_fft=self.window_size)
             
             # Zaman ekseni
-            times = librosa.times_like(power_spectrum, sr=self.sample_rate, hop_length=self.hop_length)
+            times = librosa.times_like(power_spectrum, sr=self.analysis_rate, hop_length=self.hop_length)
             
             self.logger.info(f"STFT hesaplandı: {power_spectrum.shape}")
             return power_spectrum, freqs, times
@@ -157,6 +238,49 @@ class ENFAudioExtractor:
             self.logger.error(f"STFT hesaplama hatası: {e}")
             return None, None, None
     
+    def extract_zoom_features(self, filtered_audio):
+        """Zoom FFT (chirp-z) ile yalnızca ENF bandında zaman-frekans özelliklerini çıkar"""
+        try:
+            band = self.zoom_band or (self.low_cutoff, self.high_cutoff)
+            self.logger.info(f"Zoom FFT özellikleri çıkarılıyor: {band[0]}-{band[1]} Hz, "
+                             f"{self.zoom_resolution} Hz adım")
+            
+            power_spectrum, freqs, times = zoom_spectrogram(
+                filtered_audio, self.analysis_rate, self.window_size, self.hop_length,
+                band, self.zoom_resolution)
+            
+            self.logger.info(f"Zoom FFT hesaplandı: {power_spectrum.shape}")
+            return power_spectrum, freqs, times
+            
+        except Exception as e:
+            self.logger.error(f"Zoom FFT hesaplama hatası: {e}")
+            return None, None, None
+    
+    def track_zoom_peaks(self, filtered_audio):
+        """
+        Zoom FFT ile tepe izini güç matrisi oluşturmadan çıkar
+        
+        Bellek kullanımı kayıt uzunluğuyla değil çerçeve grubu boyutuyla
+        sınırlıdır; sonuç extract_zoom_features + track_frequency_peaks ile aynıdır.
+        """
+        try:
+            band = self.zoom_band or (self.low_cutoff, self.high_cutoff)
+            self.logger.info(f"Zoom FFT tepe takibi: {band[0]}-{band[1]} Hz, "
+                             f"{self.zoom_resolution} Hz adım")
+            
+            peak_frequencies, confidence_scores, times = zoom_peak_track(
+                filtered_audio, self.analysis_rate, self.window_size, self.hop_length,
+                band, self.zoom_resolution, self.target_freq,
+                interpolation=self.peak_interpolation, zero_power_default=False,
+                track_range=(self.low_cutoff, self.high_cutoff))
+            
+            self.logger.info(f"Frekans takibi tamamlandı: {len(peak_frequencies)} zaman dilimi")
+            return peak_frequencies, confidence_scores, times
+            
+        except Exception as e:
+            self.logger.error(f"Zoom FFT tepe takibi hatası: {e}")
+            return None, None, None
+    
     def track_frequency_peaks(self, power_spectrum, freqs, times):
         """Zaman-frekans matrisinde tepe noktalarını takip et"""
         try:
@@ -176,46 +300,164 @@ class ENFAudioExtractor:
                 target_freqs = freqs
                 target_power = power_spectrum
             
-            # Her zaman dilimi için en güçlü frekansı bul
-            peak_frequencies = []
-            confidence_scores = []
-            
-            for t in range(target_power.shape[1]):
-                # Bu zaman dilimindeki güç spektrumu
-                time_slice = target_power[:, t]
-                
-                # Boş slice kontrolü
-                if len(time_slice) == 0:
-                    peak_frequencies.append(self.target_freq)  # Varsayılan değer
-                    confidence_scores.append(0.0)
-                    continue
-                
-                # En güçlü frekansın indeksini bul
-                peak_idx = np.argmax(time_slice)
-                peak_freq = target_freqs[peak_idx]
-                peak_power = time_slice[peak_idx]
-                
-                # Güven skoru hesapla (normalize edilmiş güç)
-                total_power = np.sum(time_slice)
-                confidence = peak_power / total_power if total_power > 0 else 0
-                
-                peak_frequencies.append(peak_freq)
-                confidence_scores.append(confidence)
+            peak_frequencies, confidence_scores = self._track_peaks(target_power, target_freqs)
             
             self.logger.info(f"Frekans takibi tamamlandı: {len(peak_frequencies)} zaman dilimi")
-            return np.array(peak_frequencies), np.array(confidence_scores), times
+            return peak_frequencies, confidence_scores, times
             
         except Exception as e:
             self.logger.error(f"Frekans takibi hatası: {e}")
             return None, None, None
     
+    def _select_target_band(self, power_spectrum, freqs):
+        """Hedef frekans aralığındaki satırları seç (yoksa tüm spektrum)"""
+        target_mask = (freqs >= self.low_cutoff) & (freqs <= self.high_cutoff)
+        if not np.any(target_mask):
+            return power_spectrum, freqs
+        return power_spectrum[target_mask, :], freqs[target_mask]
+    
+    def _track_peaks(self, target_power, target_freqs):
+        """Her zaman dilimi için en güçlü frekansı ve güven skorunu bul (vektörel)"""
+        return track_peaks(target_power, target_freqs, self.target_freq,
+                           interpolation=self.peak_interpolation,
+                           zero_power_default=False)
+    
+    def iter_enf_frames(self, audio_file_path, block_size=None):
+        """
+        ENF çerçevelerini akış halinde üret (sabit bellek)
+        
+        Dosya bloklar halinde okunur, SOS filtre durumu (zi) bloklar arasında
+        taşınır ve STFT çerçeveleri librosa.stft(center=True) ile aynı
+        hizalamada hesaplanır. Her blok için (peak_freqs, confidence, times) döner.
+        """
+        from scipy.signal import get_window, sosfilt
+        
+        sos = self.design_bandpass_sos()
+        if sos is None:
+            return
+        delay = self.filter_group_delay(sos)
+        
+        n_fft = self.window_size
+        hop = self.hop_length
+        window = get_window('hann', n_fft, fftbins=True).astype(np.float32)
+        
+        if self.spectral_engine == 'zoom':
+            band = self.zoom_band or (self.low_cutoff, self.high_cutoff)
+            transform, freqs = make_zoom_transform(n_fft, band, self.zoom_resolution, self.analysis_rate)
+        else:
+            transform = lambda frames, axis: np.fft.rfft(frames, axis=axis)
+            freqs = np.fft.rfftfreq(n_fft, d=1.0 / self.analysis_rate)
+        
+        zi = np.zeros((sos.shape[0], 2))
+        # center=True ile aynı hizalama için başa n_fft // 2 sıfır ekle
+        buffer = np.zeros(n_fft // 2)
+        frame_index = 0
+        
+        def process(buffer, frame_index):
+            n_frames = (len(buffer) - n_fft) // hop + 1
+            if n_frames <= 0:
+                return buffer, frame_index, None
+            
+            with self.profiler.stage(self.spectral_engine):
+                frames = np.lib.stride_tricks.sliding_window_view(buffer, n_fft)[::hop][:n_frames]
+                power = (np.abs(transform(frames * window, axis=-1)) ** 2).T
+            with self.profiler.stage("tracking"):
+                target_power, target_freqs = self._select_target_band(power, freqs)
+                peak_freqs, confidence = self._track_peaks(target_power, target_freqs)
+            times = (frame_index + np.arange(n_frames)) * hop / self.analysis_rate - delay
+            
+            return buffer[n_frames * hop:], frame_index + n_frames, (peak_freqs, confidence, times)
+        
+        decimator = StreamingDecimator(self.decimation_factor)
+        
+        # Filtre çıktısı bellek içi yoldaki gibi float64 tutulur (float32 yuvarlaması
+        # ince zoom ızgarasında komşu bin seçimini değiştirebilir)
+        def filter_block(block, zi):
+            if len(block) == 0:
+                return block.astype(np.float64), zi
+            filtered, zi = sosfilt(sos, block, zi=zi)
+            return np.nan_to_num(filtered, nan=0.0, posinf=1.0, neginf=-1.0), zi
+        
+        blocks = self.iter_audio_blocks(audio_file_path, block_size)
+        while True:
+            with self.profiler.stage("load"):
+                block = next(blocks, None)
+            if block is None:
+                break
+            with self.profiler.stage("decimate"):
+                block = decimator.process(block)
+            with self.profiler.stage("filter"):
+                filtered, zi = filter_block(block, zi)
+            buffer = np.concatenate([buffer, filtered])
+            buffer, frame_index, result = process(buffer, frame_index)
+            if result is not None:
+                yield result
+        
+        # Seyreltici kuyruğunu boşalt, sona n_fft // 2 sıfır ekleyerek kalan çerçeveleri tamamla
+        with self.profiler.stage("decimate"):
+            tail = decimator.flush()
+        with self.profiler.stage("filter"):
+            filtered, zi = filter_block(tail, zi)
+        buffer = np.concatenate([buffer, filtered, np.zeros(n_fft // 2)])
+        buffer, frame_index, result = process(buffer, frame_index)
+        if result is not None:
+            yield result
+    
+    def track_frequency_peaks_streaming(self, audio_file_path, block_size=None, target_sr=1.0):
+        """
+        Akış modunda tepe izini blok blok 1 Hz'e indirerek topla (sabit bellek)
+        
+        Çerçeve hızındaki diziler biriktirilmez: her blok, önceki bloğun son
+        çerçevesiyle birlikte 1 Hz ızgarasına doğrusal enterpole edilir
+        (resample_to_1hz ile aynı ızgara ve sonuç). Bellek, çerçeve sayısıyla
+        değil kaydın saniye sayısıyla büyür.
+        
+        Returns:
+            (1 Hz frekanslar, 1 Hz güven skorları, 1 Hz zaman ekseni)
+        """
+        try:
+            self.logger.info(f"Akış modunda frekans takibi (blok: {block_size or self.stream_block_size} frame)...")
+            
+            freq_chunks, confidence_chunks = [], []
+            previous = None
+            next_index = 0
+            n_frames = 0
+            for peak_freqs, confidence, times in self.iter_enf_frames(audio_file_path, block_size):
+                n_frames += len(times)
+                if previous is not None:
+                    times = np.concatenate([previous[0], times])
+                    peak_freqs = np.concatenate([previous[1], peak_freqs])
+                    confidence = np.concatenate([previous[2], confidence])
+                
+                # Son çerçeveden önceki ızgara noktaları (son nokta sonraki blokla birlikte)
+                stop = int(np.ceil(times[-1] * target_sr))
+                if stop > next_index:
+                    grid = np.arange(next_index, stop) / target_sr
+                    freq_chunks.append(np.interp(grid, times, peak_freqs))
+                    confidence_chunks.append(np.interp(grid, times, confidence))
+                    next_index = stop
+                previous = (times[-1:], peak_freqs[-1:], confidence[-1:])
+            
+            if previous is None:
+                self.logger.error("Akış modunda hiç çerçeve üretilemedi")
+                return None, None, None
+            
+            self.logger.info(f"Frekans takibi tamamlandı: {n_frames} zaman dilimi -> {next_index} nokta (1 Hz)")
+            return (np.concatenate(freq_chunks) if freq_chunks else np.zeros(0),
+                    np.concatenate(confidence_chunks) if confidence_chunks else np.zeros(0),
+                    np.arange(next_index) / target_sr)
+            
+        except Exception as e:
+            self.logger.error(f"Akış modu frekans takibi hatası: {e}")
+            return None, None, None
+    
     def resample_to_1hz(self, frequencies, times, target_sr=1.0):
         """ENF eğrisini 1 Hz'e yeniden örnekle"""
         try:
             self.logger.info("1 Hz'e yeniden örnekleme yapılıyor...")
             
             # Orijinal örnekleme frekansı (STFT hop length'ten hesapla)
-            original_sr = self.sample_rate / self.hop_length
+            original_sr = self.analysis_rate / self.hop_length
             
             # Hedef zaman ekseni (1 Hz)
             target_duration = times[-1]
@@ -283,6 +525,8 @@ class ENFAudioExtractor:
         try:
             self.logger.info("ENF sonuçları görselleştiriliyor...")
             
+            import matplotlib.pyplot as plt
+            
             # Boyut uyumluluğunu kontrol et
             if len(original_freqs) != len(times):
                 self.logger.warning(f"Boyut uyumsuzluğu: original_freqs({len(original_freqs)}) != times({len(times)})")
@@ -335,24 +579,30 @@ class ENFAudioExtractor:
         except Exception as e:
             self.logger.error(f"Görselleştirme hatası: {e}")
     
-    def save_enf_results(self, enf_curve, time_stamps, confidence_scores, stats, output_path):
-        """ENF sonuçlarını JSON formatında kaydet"""
+    def save_enf_results(self, enf_curve, time_stamps, confidence_scores, stats, output_path,
+                         performance=None):
+        """
+        ENF sonuçlarını kaydet
+        
+        self.result_format: 'json' (varsayılan), 'binary' (.enfb, bellek eşlemli
+        okunabilir float32 sütunlar + JSON başlık) veya 'both'.
+        performance verilirse (StageProfiler.summary) extraction_info'ya eklenir.
+        Yazılan dosyaları {"results": ..., "results_binary": ...} olarak döndürür.
+        """
         try:
             self.logger.info("ENF sonuçları kaydediliyor...")
             
-            results = {
+            header = {
                 "extraction_info": {
                     "timestamp": datetime.now().isoformat(),
                     "target_frequency": self.target_freq,
                     "frequency_tolerance": self.freq_tolerance,
                     "sample_rate": self.sample_rate,
+                    "analysis_rate": self.analysis_rate,
+                    "decimation_factor": self.decimation_factor,
                     "window_size": self.window_size,
-                    "hop_length": self.hop_length
-                },
-                "enf_data": {
-                    "frequencies": enf_curve.tolist(),
-                    "time_stamps": time_stamps.tolist(),
-                    "confidence_scores": confidence_scores.tolist() if confidence_scores is not None else None
+                    "hop_length": self.hop_length,
+                    "spectral_engine": self.spectral_engine
                 },
                 "statistics": stats,
                 "processing_notes": {
@@ -361,68 +611,238 @@ class ENFAudioExtractor:
                     "resampling": "1 Hz target frequency"
                 }
             }
-            
-            with open(output_path, 'w', encoding='utf-8') as f:
-                json.dump(results, f, indent=2, ensure_ascii=False)
-            
-            self.logger.info(f"ENF sonuçları kaydedildi: {output_path}")
+            if performance is not None:
+                header["extraction_info"]["performance"] = performance
+            
+            output_path = Path(output_path)
+            saved = {"results": None, "results_binary": None}
+            
+            if self.result_format in ('json', 'both'):
+                results = {
+                    "extraction_info": header["extraction_info"],
+                    "enf_data": {
+                        "frequencies": enf_curve.tolist(),
+                        "time_stamps": time_stamps.tolist(),
+                        "confidence_scores": confidence_scores.tolist() if confidence_scores is not None else None
+                    },
+                    "statistics": header["statistics"],
+                    "processing_notes": header["processing_notes"]
+                }
+                
+                with open(output_path, 'w', encoding='utf-8') as f:
+                    json.dump(results, f, indent=2, ensure_ascii=False)
+                saved["results"] = str(output_path)
+            
+            if self.result_format in ('binary', 'both'):
+                binary_path = save_enf_binary(output_path.with_suffix(BINARY_SUFFIX), header, {
+                    "frequencies": np.asarray(enf_curve, dtype=np.float32),
+                    "time_stamps": np.asarray(time_stamps, dtype=np.float64),
+                    "confidence_scores": (np.asarray(confidence_scores, dtype=np.float32)
+                                          if confidence_scores is not None else None)
+                })
+                saved["results_binary"] = str(binary_path)
+                saved["results"] = saved["results"] or str(binary_path)
+            
+            self.logger.info(f"ENF sonuçları kaydedildi: {saved['results']}")
+            return saved
             
         except Exception as e:
             self.logger.error(f"Sonuç kaydetme hatası: {e}")
+            return None
+    
+    def frontend_params(self, streaming=False):
+        """Ön uç (yükleme, filtre, spektrum, takip) sonucunu belirleyen parametreler"""
+        return {
+            "sample_rate": self.sample_rate,
+            "target_freq": self.target_freq,
+            "freq_tolerance": self.freq_tolerance,
+            "decimation_factor": self.decimation_factor,
+            "window_size": self.window_size,
+            "hop_length": self.hop_length,
+            "spectral_engine": self.spectral_engine,
+            "zoom_band": list(self.zoom_band) if self.zoom_band else None,
+            "zoom_resolution": self.zoom_resolution if self.spectral_engine == 'zoom' else None,
+            "peak_interpolation": self.peak_interpolation,
+            "filter": "sosfilt_delay_compensated",
+            "streaming": bool(streaming)
+        }
     
-    def extract_enf_from_audio(self, audio_file_path, output_dir="output"):
-        """Ses dosyasından ENF çıkar"""
+    def compute_peak_track(self, audio_file_path, streaming=False, block_size=None):
+        """
+        Ön uç aşamalarını (1-5) çalıştır ve ham tepe izini döndür
+        
+        Akış modunda iz sabit bellek için doğrudan 1 Hz'e indirilmiş döner
+        (resampled=True); bellek içi yolda çerçeve hızındadır.
+        
+        Returns:
+            dict: peak_freqs, confidence, peak_times ve (bellek içi yolda)
+            band_power / band_freqs; hata durumunda None
+        """
         try:
-            self.logger.info(f"ENF çıkarımı başlatılıyor: {audio_file_path}")
+            track = {}
             
-            # Çıktı dizinini oluştur
-            output_path = Path(output_dir)
-            output_path.mkdir(parents=True, exist_ok=True)
+            if streaming:
+                # 1-6. Blok blok oku, filtrele, STFT, tepe takibi ve 1 Hz'e indirme
+                peak_freqs, confidence_scores, peak_times = self.track_frequency_peaks_streaming(
+                    audio_file_path, block_size)
+                track["resampled"] = np.bool_(True)
+            else:
+                # 1. Ses dosyasını yükle
+                with self.profiler.stage("load"):
+                    audio_data, sample_rate = self.load_audio_file(audio_file_path)
+                if audio_data is None:
+                    return None
+                
+                # 1b. İsteğe bağlı seyreltme (ör. 44.1 kHz -> ~1 kHz)
+                with self.profiler.stage("decimate"):
+                    audio_data = self.decimate_audio(audio_data)
+                if audio_data is None:
+                    return None
+                
+                # 2-3. Bant geçiren filtreyi tasarla ve uygula
+                with self.profiler.stage("filter"):
+                    sos = self.design_bandpass_sos()
+                    filtered_audio = self.apply_bandpass_sos(audio_data, sos) if sos is not None else None
+                if filtered_audio is None:
+                    return None
+                delay = self.filter_group_delay(sos)
+                
+                if self.spectral_engine == 'zoom' and self.cache is None:
+                    # 4-5. Önbellek yoksa güç matrisi tutulmadan grup grup zoom FFT tepe takibi
+                    with self.profiler.stage(self.spectral_engine):
+                        peak_freqs, confidence_scores, times = self.track_zoom_peaks(filtered_audio)
+                    peak_times = times - delay if times is not None else None
+                else:
+                    # 4. Zaman-frekans özelliklerini çıkar (STFT veya zoom FFT)
+                    with self.profiler.stage(self.spectral_engine):
+                        if self.spectral_engine == 'zoom':
+                            power_spectrum, freqs, times = self.extract_zoom_features(filtered_audio)
+                        else:
+                            power_spectrum, freqs, times = self.extract_stft_features(filtered_audio)
+                    if power_spectrum is None:
+                        return None
+                    
+                    # 5. Frekans tepe noktalarını takip et
+                    with self.profiler.stage("tracking"):
+                        peak_freqs, confidence_scores, peak_times = self.track_frequency_peaks(
+                            power_spectrum, freqs, times - delay)
+                    
+                    # Önbellek için yalnızca hedef banttaki satırları sakla
+                    band_mask = (freqs >= self.low_cutoff) & (freqs <= self.high_cutoff)
+                    if self.cache is not None and np.any(band_mask):
+                        track["band_power"] = power_spectrum[band_mask, :].astype(np.float32)
+                        track["band_freqs"] = freqs[band_mask]
             
-            # 1. Ses dosyasını yükle
-            audio_data, sample_rate = self.load_audio_file(audio_file_path)
-            if audio_data is None:
+            if peak_freqs is None:
                 return None
             
-            # 2. Bant geçiren filtre tasarla
-            b, a = self.design_bandpass_filter()
-            if b is None:
-                return None
+            track.update(peak_freqs=peak_freqs, confidence=confidence_scores, peak_times=peak_times)
+            return track
             
-            # 3. Filtreyi uygula
-            filtered_audio = self.apply_bandpass_filter(audio_data, b, a)
-            if filtered_audio is None:
-                return None
+        except Exception as e:
+            self.logger.error(f"Ön uç hatası: {e}")
+            return None
+    
+    def load_or_compute_peak_track(self, audio_file_path, streaming=False, block_size=None, file_hash=None):
+        """Tepe izini önbellekten al, yoksa hesapla ve önbelleğe yaz"""
+        if self.cache is None:
+            return self.compute_peak_track(audio_file_path, streaming, block_size)
+        
+        with self.profiler.stage("cache_lookup"):
+            file_hash = file_hash or self.cache.file_hash(audio_file_path)
+            key = self.cache.make_key(file_hash, self.frontend_params(streaming))
+            track = self.cache.load(key)
+        if track is not None:
+            self.logger.info(f"Ön uç önbellekten yüklendi: {key[:12]}")
+            return track
+        
+        track = self.compute_peak_track(audio_file_path, streaming, block_size)
+        if track is not None:
+            with self.profiler.stage("cache_store"):
+                self.cache.store(key, **track)
+            self.logger.info(f"Ön uç önbelleğe yazıldı: {key[:12]}")
+        return track
+    
+    def extract_enf_from_audio(self, audio_file_path, output_dir="output",
+                               streaming=False, block_size=None, file_hash=None):
+        """
+        Ses dosyasından ENF çıkar
+        
+        streaming=True ise dosya bellekte tutulmadan bloklar halinde işlenir
+        (çok saatlik kayıtlar için sabit bellek kullanımı). self.cache
+        ayarlıysa ön uç (1-5) sonuçları dosya hash'ine göre önbellekten gelir;
+        file_hash verilirse (ör. katalogdan) dosya yeniden hash'lenmez.
+        
+        Aşama süreleri, CPU süreleri ve bellek tepeleri sonuçta "performance"
+        altında döner ve kaydedilen extraction_info'ya (kayıt anına kadarki
+        aşamalar) yazılır.
+        """
+        self.profiler = StageProfiler(trace_memory=self.profile_memory)
+        self.profiler.start()
+        
+        profile = None
+        if self.save_profile:
+            import cProfile
+            profile = cProfile.Profile()
+            profile.enable()
+        
+        try:
+            self.logger.info(f"ENF çıkarımı başlatılıyor: {audio_file_path}")
             
-            # 4. STFT özelliklerini çıkar
-            power_spectrum, freqs, times = self.extract_stft_features(filtered_audio)
-            if power_spectrum is None:
-                return None
+            # Çıktı dizinini oluştur
+            output_path = Path(output_dir)
+            output_path.mkdir(parents=True, exist_ok=True)
+            base_name = Path(audio_file_path).stem
             
-            # 5. Frekans tepe noktalarını takip et
-            peak_freqs, confidence_scores, peak_times = self.track_frequency_peaks(power_spectrum, freqs, times)
-            if peak_freqs is None:
+            # 1-5. Yükle, filtrele, spektrum, tepe takibi (veya önbellek)
+            track = self.load_or_compute_peak_track(audio_file_path, streaming, block_size, file_hash)
+            if track is None:
                 return None
-            
-            # 6. 1 Hz'e yeniden örnekle
-            resampled_freqs, resampled_times = self.resample_to_1hz(peak_freqs, peak_times)
+            peak_freqs = track["peak_freqs"]
+            confidence_scores = track["confidence"]
+            peak_times = track["peak_times"]
+            
+            # 6. 1 Hz'e yeniden örnekle (akış modunda ön uç zaten 1 Hz döndürür)
+            with self.profiler.stage("resample"):
+                if track.get("resampled"):
+                    resampled_freqs, resampled_times = peak_freqs, peak_times
+                else:
+                    resampled_freqs, resampled_times = self.resample_to_1hz(peak_freqs, peak_times)
+                    # Güven skorları da eğrinin 1 Hz ızgarasına (akış moduyla aynı enterpolasyon)
+                    if resampled_freqs is not None and confidence_scores is not None:
+                        confidence_scores = np.interp(resampled_times, peak_times, confidence_scores)
             if resampled_freqs is None:
                 return None
             
             # 7. Düzgünleştir
-            smoothed_freqs = self.smooth_enf_curve(resampled_freqs)
+            with self.profiler.stage("smoothing"):
+                smoothed_freqs = self.smooth_enf_curve(resampled_freqs, self.smoothing_window)
             
             # 8. İstatistikleri hesapla
-            stats = self.calculate_enf_statistics(smoothed_freqs)
+            with self.profiler.stage("statistics"):
+                stats = self.calculate_enf_statistics(smoothed_freqs)
             
             # 9. Sonuçları kaydet
-            base_name = Path(audio_file_path).stem
             results_file = output_path / f"{base_name}_enf_results.json"
-            self.save_enf_results(smoothed_freqs, resampled_times, confidence_scores, stats, results_file)
-            
-            # 10. Grafik oluştur
-            plot_file = output_path / f"{base_name}_enf_plot.png"
-            self.plot_enf_results(peak_freqs, smoothed_freqs, resampled_times, plot_file)
+            with self.profiler.stage("save"):
+                saved_files = self.save_enf_results(smoothed_freqs, resampled_times, confidence_scores,
+                                                    stats, results_file,
+                                                    performance=self.profiler.summary()) or {}
+            
+            # 10. Grafik oluştur (toplu işlemde kapatılabilir)
+            plot_file = None
+            if self.save_plot:
+                plot_file = output_path / f"{base_name}_enf_plot.png"
+                with self.profiler.stage("plot"):
+                    self.plot_enf_results(peak_freqs, smoothed_freqs, resampled_times, plot_file)
+            
+            # cProfile dökümü
+            profile_file = None
+            if profile is not None:
+                profile.disable()
+                profile_file = output_path / f"{base_name}_profile.prof"
+                profile.dump_stats(str(profile_file))
+                self.logger.info(f"cProfile kaydedildi: {profile_file}")
             
             # Sonuçları sakla
             self.enf_curve = smoothed_freqs
@@ -436,9 +856,12 @@ class ENFAudioExtractor:
                 "enf_curve": smoothed_freqs,
                 "time_stamps": resampled_times,
                 "statistics": stats,
+                "performance": self.profiler.summary(),
                 "output_files": {
-                    "results": str(results_file),
-                    "plot": str(plot_file)
+                    "results": saved_files.get("results"),
+                    "results_binary": saved_files.get("results_binary"),
+                    "plot": str(plot_file) if plot_file else None,
+                    "profile": str(profile_file) if profile_file else None
                 }
             }
             
@@ -448,6 +871,11 @@ class ENFAudioExtractor:
                 "status": "error",
                 "error_message": str(e)
             }
+        
+        finally:
+            if profile is not None:
+                profile.disable()
+            self.profiler.stop()
 
 def main():
     """Ana fonksiyon"""
@@ -480,6 +908,10 @@ def main():
         print(f"   • Frekans aralığı: {stats['frequency_range']:.3f} Hz")
         print(f"   • Hedef sapma: {stats['target_deviation']:.3f} Hz")
         print(f"   • Kararlılık skoru: {stats['stability_score']:.3f}")
+
+        print(f"\n⏱️  Aşama süreleri:")
+        for stage, timing in results['performance']['stages'].items():
+            print(f"   • {stage:12s} {timing['wall_seconds']:7.3f} s (CPU {timing['cpu_seconds']:7.3f} s)")
         
         print(f"\n📋 Çıktı dosyaları:")
         print(f"   • ENF Sonuçları: {results['output_files']['results']}")
@@ -0,0 +1,510 @@
+#!/usr/bin/env python3
+"""
+Ham Kayıt Alım Servisi (watch-folder)
+Amaç: data/raw/** altına düşen yeni kayıtları, tüm veri toplamayı yeniden
+çalıştırmadan saniyeler içinde kataloglamak
+- Yeni dosyalar artımlı izleyiciyle bulunur (inotify veya dizin mtime yoklaması)
+- Boyutu / mtime'ı stable_seconds boyunca değişmeyen dosya hash'lenir,
+  kataloğa yazılır ve custody loguna eklenir
+- Ses kayıtları için ENF çıkarımı ve metadata gömme (processed/ altına kopya)
+  düşük öncelikli süreç havuzunda kuyruğa alınır
+- Her aşamada uçuştaki iş sınırlıdır; kuyruklar dolunca yeni dosya alımı durur
+"""
+
+import argparse
+import json
+import logging
+import os
+import signal
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, FIRST_COMPLETED, wait
+from concurrent.futures.process import BrokenProcessPool
+from pathlib import Path
+
+from batch_extract import AUDIO_EXTENSIONS, _extract_worker, audio_duration_seconds, default_worker_count
+from data_collector import DataCollector
+from utils.file_hasher import hash_file
+from utils.folder_watch import create_watcher
+
+DEVICES = ("iphone", "samsung")
+AUDIO_TYPES = ('.wav', '.mp3', '.flac', '.m4a')
+VIDEO_TYPES = ('.mp4', '.avi', '.mov', '.mkv')
+IMAGE_TYPES = ('.jpg', '.jpeg', '.png', '.tiff')
+
+
+def _lower_priority():
+    """Süreç havuzu başlatıcısı: ENF işçileri alım döngüsünün önüne geçmesin"""
+    if hasattr(os, "nice"):
+        os.nice(10)
+
+
+def _ingest_worker(task):
+    """
+    Havuz işçisi: ENF çıkar, sonucu ham dosyanın processed/metadata_embedded
+    altındaki kopyasına göm (ham kanıt dosyası değiştirilmez)
+    """
+    if task.get("audio_seconds") is None:
+        task = dict(task, audio_seconds=audio_duration_seconds(task["file_path"]))
+    result = _extract_worker(task)
+    result["embedded_file"] = None
+    result["embedded_sha256"] = None
+    if result["status"] != "success" or not task.get("embed_file"):
+        return result
+
+    try:
+        from utils.metadata_embedder import MetadataEmbedder
+
+        with open(result["output_files"]["results"], 'r', encoding='utf-8') as f:
+            saved = json.load(f)
+        enf_json_data = {
+            "enf_data": dict(saved["enf_data"], source_type="audio", extraction_method="STFT",
+                             source_sha256=task.get("file_hash")),
+            "statistics": saved.get("statistics")
+        }
+
+        os.makedirs(os.path.dirname(task["embed_file"]), exist_ok=True)
+        if not MetadataEmbedder().embed_to_audio(task["file_path"], enf_json_data, task["embed_file"]):
+            raise RuntimeError("Metadata gömme başarısız")
+        result["embedded_file"] = task["embed_file"]
+        result["embedded_sha256"] = hash_file(task["embed_file"])["sha256"]
+    except Exception as e:
+        result["status"], result["error_message"] = "embed_error", str(e)
+    return result
+
+
+class IngestDaemon:
+    """data/raw altını izleyip yeni kayıtları kataloglayan servis"""
+
+    def __init__(self, base_dir="data", poll_interval=1.0, stable_seconds=2.0,
+                 hash_workers=None, extract_workers=None, extract=True, embed=True,
+                 extract_timeout=None, max_tracked=10000, max_extract_backlog=256,
+                 use_inotify=None, collector=None):
+        """
+        Args:
+            base_dir: DataCollector veri dizini
+            poll_interval: İzleme turu aralığı (s); inotify'da olay gelince erken uyanılır
+            stable_seconds: Dosyanın "yazımı bitti" sayılması için boyut / mtime'ın
+                değişmeden kalması gereken süre (s)
+            hash_workers: Aynı anda hash'lenen dosya sayısı (None: CPU sayısı + 4)
+            extract_workers: ENF süreç havuzu boyutu (None: CPU sayısı)
+            extract: Ses kayıtları için ENF çıkarımını kuyruğa al
+            embed: Çıkarılan ENF'yi processed/metadata_embedded altındaki kopyaya göm
+            extract_timeout: Dosya başına ENF zaman aşımı (s)
+            max_tracked: Kararlılığı beklenen dosya sınırı; dolunca izleme duraklar
+            max_extract_backlog: Bekleyen ENF işi sınırı; dolunca yeni dosya alınmaz
+            use_inotify: True / False / None (varsa inotify)
+            collector: Hazır DataCollector (verilmezse oluşturulur)
+        """
+        self.collector = collector or DataCollector(base_dir, hash_workers=hash_workers)
+        self.base_dir = self.collector.base_dir
+        self._base_abs = Path(os.path.abspath(self.base_dir))
+        self.raw_dir = self.collector.raw_dir
+        self.extract_dir = self.collector.processed_dir / "enf_extracted"
+        self.embed_dir = self.collector.processed_dir / "metadata_embedded"
+        self.catalog = self.collector.data_catalog
+        self.custody_log = self.collector.custody_log
+
+        self.poll_interval = poll_interval
+        self.stable_seconds = stable_seconds
+        self.hash_workers = self.collector.hasher.workers
+        self.extract_workers = extract_workers or default_worker_count()
+        self.extract = extract
+        self.embed = embed
+        self.extract_timeout = extract_timeout
+        self.max_tracked = max_tracked
+        self.max_extract_backlog = max_extract_backlog
+
+        self.watcher = create_watcher(self.raw_dir, use_inotify=use_inotify)
+        self.logger = logging.getLogger(__name__)
+
+        self._pending = deque()      # izleyicinin bulduğu, henüz takibe alınmamış yollar
+        self._tracked = {}           # yol -> (boyut, mtime_ns, kararlılık başlangıcı, ilk görülme)
+        self._ready = deque()        # (yol, imza, ilk görülme)
+        self._hashing = {}           # future -> (yol, imza, ilk görülme)
+        self._extract_queue = deque()
+        self._extracting = {}        # future -> görev
+        self._hash_pool = None
+        self._extract_pool = None
+        self._stopping = False
+
+        self.stats = {
+            "discovered": 0,
+            "cataloged": 0,
+            "skipped": 0,
+            "requeued": 0,
+            "hash_errors": 0,
+            "extracted": 0,
+            "extract_failed": 0,
+            "max_latency_seconds": 0.0,
+            "total_latency_seconds": 0.0
+        }
+
+    # --- Yaşam döngüsü ---
+
+    def stop(self, *_):
+        """Alımı durdur; uçuştaki işler bitince run() döner"""
+        self._stopping = True
+
+    def close(self):
+        if self._hash_pool is not None:
+            self._hash_pool.shutdown(wait=True)
+            self._hash_pool = None
+        if self._extract_pool is not None:
+            self._extract_pool.shutdown(wait=True, cancel_futures=True)
+            self._extract_pool = None
+        self.watcher.close()
+        self.custody_log.flush()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def idle(self):
+        """Kararlılık bekleyen, kuyrukta veya uçuşta iş yok"""
+        return not (self._pending or self._tracked or self._ready or self._hashing
+                    or self._extract_queue or self._extracting)
+
+    def run(self, max_seconds=None, until_idle=False):
+        """
+        Servis döngüsü
+
+        Args:
+            max_seconds: Bu kadar saniye sonra dur (None: stop() / sinyale kadar)
+            until_idle: İlk taramadan sonra tüm işler bitince dur (tek seferlik alım)
+
+        Returns:
+            Dict: İstatistikler
+        """
+        self.logger.info(f"Alım servisi başladı: {self.raw_dir} ({type(self.watcher).__name__})")
+
+        deadline = time.monotonic() + max_seconds if max_seconds is not None else None
+        while True:
+            self.run_once()
+            if self._stopping and not (self._hashing or self._extracting):
+                break
+            if until_idle and self.idle():
+                break
+            if deadline is not None and time.monotonic() >= deadline:
+                break
+            self._sleep()
+
+        self.custody_log.flush()
+        return self.stats
+
+    def _sleep(self):
+        """Bir sonraki tura kadar bekle (kararlılık ve uçuştaki işler de uyandırır)"""
+        timeout = self.poll_interval
+        if self._tracked:
+            timeout = min(timeout, max(self.stable_seconds / 4, 0.01))
+        if self._hashing or self._extracting:
+            wait(list(self._hashing) + list(self._extracting), timeout=timeout,
+                 return_when=FIRST_COMPLETED)
+        else:
+            self.watcher.wait(timeout)
+
+    def run_once(self):
+        """Tek tur: izle, kararlılığı kontrol et, hash'le, katalogla, ENF kuyruğunu besle"""
+        if self._hash_pool is None:
+            self._hash_pool = ThreadPoolExecutor(max_workers=self.hash_workers, thread_name_prefix="ingest-hash")
+        if self.extract and self._extract_pool is None:
+            self._extract_pool = ProcessPoolExecutor(max_workers=self.extract_workers,
+                                                     initializer=_lower_priority)
+        if not self._stopping:
+            # İlk tarama tüm ağacı döndürür: yollar beklemede tutulur, sınır altında takibe alınır
+            if not self._pending and not self._saturated():
+                self._pending.extend(self.watcher.poll())
+            while self._pending and not self._saturated():
+                self._track(self._pending.popleft())
+        self._check_stability()
+        self._collect_hashes()
+        self._submit_hashes()
+        self._collect_extractions()
+        self._submit_extractions()
+
+    def _saturated(self):
+        """
+        Geri basınç: takip veya ENF kuyruğu doluysa yeni dosya alma
+
+        Yeniden başlatmada yarım kalan ENF işleri de takipten geçerek kuyruğa
+        girdiğinden aynı sınıra tabidir.
+        """
+        return (len(self._tracked) + len(self._ready) >= self.max_tracked
+                or len(self._extract_queue) >= self.max_extract_backlog)
+
+    # --- Kararlılık ---
+
+    def _track(self, path, first_seen=None):
+        if path in self._tracked:
+            return
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return
+        now = time.monotonic()
+        self._tracked[path] = (stat.st_size, stat.st_mtime_ns, now, first_seen or now)
+        if first_seen is None:
+            self.stats["discovered"] += 1
+
+    def _local_path(self, path):
+        """İzleyicinin mutlak yolunu (base_dir'e göre yol, katalog anahtarı) çiftine çevir"""
+        relative_path = Path(path).relative_to(self._base_abs)
+        return self.base_dir / relative_path, relative_path.as_posix()
+
+    def _check_stability(self):
+        """stable_seconds boyunca değişmeyen dosyaları hash kuyruğuna taşı"""
+        now = time.monotonic()
+        for path, (size, mtime_ns, since, first_seen) in list(self._tracked.items()):
+            try:
+                stat = os.stat(path)
+            except OSError:
+                del self._tracked[path]  # yükleme iptal edildi / taşındı
+                continue
+            if (stat.st_size, stat.st_mtime_ns) != (size, mtime_ns):
+                self._tracked[path] = (stat.st_size, stat.st_mtime_ns, now, first_seen)
+            elif now - since >= self.stable_seconds:
+                del self._tracked[path]
+                if self._already_cataloged(path, stat):
+                    self.stats["skipped"] += 1
+                else:
+                    self._ready.append((path, (size, mtime_ns), first_seen))
+
+    def _already_cataloged(self, path, stat):
+        """
+        Aynı boyut ve değişiklik zamanıyla zaten kataloglanmış mı?
+
+        Yeniden başlatmada ilk tarama mevcut dosyaları da döndürür; bunlar
+        yeniden hash'lenmez, yalnızca ENF işi yarım kalmışsa kuyruğa alınır.
+        """
+        file_path, relative_path = self._local_path(path)
+        if relative_path not in self.catalog:
+            return False
+        file_info = self.catalog[relative_path]
+        if (file_info.get("file_size_bytes") != stat.st_size
+                or file_info.get("ingest", {}).get("mtime_ns", stat.st_mtime_ns) != stat.st_mtime_ns):
+            self.logger.warning(f"Kataloglanmış dosya değişmiş, yeniden alınıyor: {relative_path}")
+            return False
+        if "enf_processing" not in file_info:
+            self._queue_extraction(file_path, relative_path, file_info)
+        return True
+
+    # --- Hash ve katalog ---
+
+    def _submit_hashes(self):
+        while self._ready and len(self._hashing) < 2 * self.hash_workers:
+            path, signature, first_seen = self._ready.popleft()
+            future = self._hash_pool.submit(self.collector.hasher.hash_file, path)
+            self._hashing[future] = (path, signature, first_seen)
+
+    def _collect_hashes(self):
+        """Biten hash'leri tek katalog işlemi ve tek custody yazmasıyla kaydet"""
+        done = [future for future in self._hashing if future.done()]
+        if not done:
+            return
+
+        records = []
+        for future in done:
+            path, signature, first_seen = self._hashing.pop(future)
+            result = future.result()
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            if (stat.st_size, stat.st_mtime_ns) != signature:
+                # Hash sırasında dosya değişti: yeniden kararlılık beklenir
+                self.stats["requeued"] += 1
+                self._track(path, first_seen)
+                continue
+            if result.error:
+                self.stats["hash_errors"] += 1
+                self.logger.error(f"Hash hesaplama hatası {path}: {result.error}")
+                continue
+
+            file_path, _ = self._local_path(path)
+            relative_path, file_info = self.collector._build_file_info(
+                file_path, self._path_metadata(file_path), result.digests, store=False)
+            file_info["ingest"] = {
+                "mtime_ns": stat.st_mtime_ns,
+                "latency_seconds": round(time.monotonic() - first_seen, 3)
+            }
+            records.append((file_path, relative_path, file_info))
+
+        if not records:
+            return
+        self.catalog.update((relative_path, file_info) for _, relative_path, file_info in records)
+        self.custody_log.append_many(
+            self.collector._custody_record_event(relative_path, file_info)
+            for _, relative_path, file_info in records)
+
+        for file_path, relative_path, file_info in records:
+            latency = file_info["ingest"]["latency_seconds"]
+            self.stats["cataloged"] += 1
+            self.stats["total_latency_seconds"] += latency
+            self.stats["max_latency_seconds"] = max(self.stats["max_latency_seconds"], latency)
+            self.logger.info(f"📥 Kataloglandı: {relative_path} ({latency:.1f} s)")
+            self._queue_extraction(file_path, relative_path, file_info)
+
+    def _path_metadata(self, file_path):
+        """Dizin yapısı ve dosya adından (ör. 2024-01-15_09-00-00_ofis_iphone_wav_10min.wav) metadata"""
+        path_text = file_path.as_posix()
+        name = file_path.name.lower()
+        suffix = file_path.suffix.lower()
+        if suffix in AUDIO_TYPES:
+            file_type = "audio"
+        elif suffix in VIDEO_TYPES:
+            file_type = "video"
+        elif suffix in IMAGE_TYPES:
+            file_type = "image"
+        else:
+            file_type = "bilinmeyen"
+
+        date = name[:10]
+        if not (len(date) == 10 and date[4] == date[7] == "-" and date.replace("-", "").isdigit()):
+            date = time.strftime("%Y-%m-%d", time.localtime(file_path.stat().st_mtime))
+
+        return {
+            "file_type": file_type,
+            "source_device": next((device for device in DEVICES if device in name), "bilinmeyen"),
+            "environment": self.collector._extract_environment(path_text),
+            "duration": self.collector._extract_duration(path_text),
+            "format": suffix.lstrip(".").upper() or "bilinmeyen",
+            "collection_date": date,
+            "collection_time": self.collector._extract_time(file_path.name),
+            "notes": "Alım servisi tarafından otomatik kataloglandı"
+        }
+
+    # --- ENF çıkarımı ve gömme ---
+
+    def _queue_extraction(self, file_path, relative_path, file_info):
+        if not self.extract or file_path.suffix.lower() not in AUDIO_EXTENSIONS:
+            return
+        relative_raw = Path(relative_path).relative_to("raw")
+        self._extract_queue.append({
+            "file_path": str(file_path),
+            "relative_path": relative_path,
+            "output_dir": str(self.extract_dir / relative_raw.parent),
+            "embed_file": str(self.embed_dir / relative_raw) if self.embed else None,
+            "timeout": self.extract_timeout,
+            "audio_seconds": None,  # WAV başlığı işçide okunur (alım döngüsünde dosya açılmaz)
+            "extractor_attrs": {"save_plot": False},
+            "file_hash": file_info.get("hash_sha256")
+        })
+
+    def _submit_extractions(self):
+        while self._extract_queue and len(self._extracting) < self.extract_workers:
+            task = self._extract_queue.popleft()
+            try:
+                future = self._extract_pool.submit(_ingest_worker, task)
+            except BrokenProcessPool:
+                self._extract_queue.appendleft(task)
+                self._restart_extract_pool()
+                return
+            self._extracting[future] = task
+
+    def _restart_extract_pool(self):
+        self.logger.warning("ENF süreç havuzu çöktü, yeniden başlatılıyor")
+        self._extract_pool.shutdown(wait=False, cancel_futures=True)
+        self._extract_pool = ProcessPoolExecutor(max_workers=self.extract_workers,
+                                                 initializer=_lower_priority)
+
+    def _collect_extractions(self):
+        """Biten ENF işlerini kataloğa ve custody loguna işle"""
+        done = [future for future in self._extracting if future.done()]
+        if not done:
+            return
+
+        events = []
+        broken = False
+        for future in done:
+            task = self._extracting.pop(future)
+            try:
+                result = future.result()
+            except BrokenProcessPool as e:
+                broken = True
+                result = {"status": "crashed", "error_message": str(e) or "İşçi süreci sonlandı",
+                          "output_files": None, "embedded_file": None, "embedded_sha256": None}
+
+            relative_path = task["relative_path"]
+            if result["status"] == "success":
+                self.stats["extracted"] += 1
+                self.logger.info(f"🎵 ENF çıkarıldı: {relative_path}")
+                events.append(("enf_extracted", {"file": relative_path,
+                                                 "results": result["output_files"]["results"]}))
+                if result["embedded_file"]:
+                    events.append(("metadata_embedded", {"file": relative_path,
+                                                         "output": result["embedded_file"],
+                                                         "sha256": result["embedded_sha256"]}))
+            else:
+                self.stats["extract_failed"] += 1
+                self.logger.error(f"❌ ENF işlenemedi {relative_path}: "
+                                  f"{result['status']} - {result['error_message']}")
+                events.append(("enf_extraction_failed", {"file": relative_path,
+                                                         "status": result["status"],
+                                                         "error": result["error_message"]}))
+
+            if relative_path in self.catalog:
+                file_info = self.catalog[relative_path]
+                file_info["enf_processing"] = {
+                    "status": result["status"],
+                    "results": (result["output_files"] or {}).get("results"),
+                    "embedded_file": result["embedded_file"]
+                }
+                self.catalog[relative_path] = file_info
+
+        self.custody_log.append_many(events)
+        if broken:
+            self._restart_extract_pool()
+
+
+def main():
+    """Ana fonksiyon"""
+    parser = argparse.ArgumentParser(description="data/raw izleyen kayıt alım servisi")
+    parser.add_argument("--base-dir", default="data", help="DataCollector veri dizini")
+    parser.add_argument("--poll-interval", type=float, default=1.0, help="İzleme turu aralığı (s)")
+    parser.add_argument("--stable-seconds", type=float, default=2.0,
+                        help="Dosya boyutunun değişmeden kalması gereken süre (s)")
+    parser.add_argument("--hash-workers", type=int, default=None, help="Paralel hash sayısı")
+    parser.add_argument("--extract-workers", type=int, default=None, help="ENF süreç havuzu boyutu")
+    parser.add_argument("--timeout", type=float, default=None, help="Dosya başına ENF zaman aşımı (s)")
+    parser.add_argument("--no-extract", action="store_true", help="Yalnızca katalogla, ENF çıkarma")
+    parser.add_argument("--no-embed", action="store_true", help="ENF'yi kopyaya gömme")
+    parser.add_argument("--max-backlog", type=int, default=256,
+                        help="Bekleyen ENF işi sınırı (dolunca yeni dosya alınmaz)")
+    parser.add_argument("--polling", action="store_true", help="inotify yerine mtime yoklaması kullan")
+    parser.add_argument("--once", action="store_true", help="Mevcut dosyaları al, işler bitince çık")
+    args = parser.parse_args()
+
+    print("🚀 Ham Kayıt Alım Servisi")
+    print("=" * 60)
+
+    daemon = IngestDaemon(
+        base_dir=args.base_dir,
+        poll_interval=args.poll_interval,
+        stable_seconds=args.stable_seconds,
+        hash_workers=args.hash_workers,
+        extract_workers=args.extract_workers,
+        extract=not args.no_extract,
+        embed=not args.no_embed,
+        extract_timeout=args.timeout,
+        max_extract_backlog=args.max_backlog,
+        use_inotify=False if args.polling else None
+    )
+    signal.signal(signal.SIGINT, daemon.stop)
+    signal.signal(signal.SIGTERM, daemon.stop)
+
+    print(f"👀 İzlenen dizin: {daemon.raw_dir} ({type(daemon.watcher).__name__})")
+    with daemon:
+        stats = daemon.run(until_idle=args.once)
+
+    print(f"\n📊 Alım Özeti:")
+    print(f"   • Kataloglanan: {stats['cataloged']} (atlanan: {stats['skipped']})")
+    print(f"   • ENF: {stats['extracted']} başarılı / {stats['extract_failed']} başarısız")
+    if stats["cataloged"]:
+        print(f"   • Kataloğa giriş süresi: ort. {stats['total_latency_seconds'] / stats['cataloged']:.1f} s, "
+              f"en fazla {stats['max_latency_seconds']:.1f} s")
+
+
+if __name__ == "__main__":
+    main()
@@ -6,7 +6,6 @@ ENF Metadata Gömme Projesi - Ana Modül
 import sys
 import os
 import numpy as np
-import matplotlib.pyplot as plt
 from datetime import datetime
 
 def hello_world():
@@ -40,6 +39,8 @@ def test_basic_imports():
 
 def create_sample_data():
     """Test için örnek veri oluşturma"""
+    import matplotlib.pyplot as plt
+    
     # Örnek ENF sinyali (50 Hz temel frekans)
     fs = 1000  # Örnekleme frekansı
     t = np.linspace(0, 10, fs * 10)  # 10 saniye
@@ -0,0 +1,61 @@
+"""
+Atomik Dosya Yazma - Geçici dosya + os.replace ile yarım kalmış çıktıyı önleme
+"""
+
+import os
+import shutil
+import tempfile
+from contextlib import contextmanager
+from typing import BinaryIO, Iterator, Optional
+
+COPY_BUFFER_SIZE = 1024 * 1024
+
+
+@contextmanager
+def atomic_write(path: str, mode_source: Optional[str] = None) -> Iterator[BinaryIO]:
+    """
+    Hedefle aynı dizinde geçici dosyaya yaz, başarıyla bitince yerine taşı
+
+    Yazma sırasında hata olursa geçici dosya silinir ve hedef dosya hiç
+    değişmez; başarıda veri fsync edilir ve os.replace ile atomik olarak
+    hedefin yerine geçer.
+
+    Args:
+        path: Hedef dosya yolu
+        mode_source: İzinleri kopyalanacak dosya (varsayılan: var ise hedefin kendisi)
+    """
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, temp_path = tempfile.mkstemp(prefix=".", suffix=".tmp", dir=directory)
+    try:
+        with os.fdopen(fd, "wb") as f:
+            yield f
+            f.flush()
+            os.fsync(f.fileno())
+
+        mode_source = mode_source or path
+        if os.path.exists(mode_source):
+            shutil.copymode(mode_source, temp_path)
+        os.replace(temp_path, path)
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.unlink(temp_path)
+        raise
+
+
+def copy_range(src: BinaryIO, dst: BinaryIO, offset: int, length: Optional[int] = None) -> int:
+    """
+    Kaynak dosyanın offset'ten itibaren length baytını (None: sonuna kadar) kopyala
+
+    Returns:
+        int: Kopyalanan bayt sayısı
+    """
+    src.seek(offset)
+    copied = 0
+    while length is None or copied < length:
+        size = COPY_BUFFER_SIZE if length is None else min(COPY_BUFFER_SIZE, length - copied)
+        chunk = src.read(size)
+        if not chunk:
+            break
+        dst.write(chunk)
+        copied += len(chunk)
+    return copied
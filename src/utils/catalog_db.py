@@ -0,0 +1,234 @@
+"""
+SQLite Veri Katalogu - WAL modunda, indeksli, dosya başına O(1) güncelleme
+
+metadata_catalog.json tek parça sözlüğün yerine geçer. CatalogDB bir
+MutableMapping olduğu için DataCollector'daki `data_catalog[yol] = bilgi`
+kullanımı aynen çalışır; her atama tek satırlık bir UPSERT'tür. JSON ve CSV
+çıktıları veritabanından akış halinde üretilen dışa aktarma görünümleridir
+(items() yol sırasıyla, sabit bellekle gezer).
+
+Birden çok süreç aynı kataloğa yazabilir (WAL: okuyucular yazıcıyı
+beklemez, yazıcılar busy_timeout kadar sırayla bekler).
+"""
+
+import json
+import sqlite3
+import threading
+from collections.abc import MutableMapping
+from contextlib import contextmanager
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+SCHEMA_VERSION = 1
+
+# collection_metadata içinden ayrı sütun olarak indekslenen alanlar
+INDEXED_METADATA = ("file_type", "environment", "source_device", "collection_date")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS files (
+    relative_path   TEXT PRIMARY KEY,
+    filename        TEXT,
+    file_size_bytes INTEGER,
+    hash_sha256     TEXT,
+    file_type       TEXT,
+    environment     TEXT,
+    source_device   TEXT,
+    collection_date TEXT,
+    info            TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_files_hash ON files (hash_sha256);
+CREATE INDEX IF NOT EXISTS idx_files_type ON files (file_type);
+CREATE INDEX IF NOT EXISTS idx_files_device ON files (source_device);
+CREATE INDEX IF NOT EXISTS idx_files_date ON files (collection_date);
+CREATE INDEX IF NOT EXISTS idx_files_env_device_date ON files (environment, source_device, collection_date);
+"""
+
+UPSERT = """
+INSERT INTO files (relative_path, filename, file_size_bytes, hash_sha256, file_type,
+                   environment, source_device, collection_date, info)
+VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+ON CONFLICT (relative_path) DO UPDATE SET
+    filename = excluded.filename,
+    file_size_bytes = excluded.file_size_bytes,
+    hash_sha256 = excluded.hash_sha256,
+    file_type = excluded.file_type,
+    environment = excluded.environment,
+    source_device = excluded.source_device,
+    collection_date = excluded.collection_date,
+    info = excluded.info
+"""
+
+
+def _row(relative_path: str, file_info: Dict[str, Any]) -> Tuple:
+    metadata = file_info.get("collection_metadata") or {}
+    return (relative_path, file_info.get("filename"), file_info.get("file_size_bytes"),
+            file_info.get("hash_sha256"), *(metadata.get(field) for field in INDEXED_METADATA),
+            json.dumps(file_info, ensure_ascii=False))
+
+
+class CatalogDB(MutableMapping):
+    """Göreli yol -> dosya bilgisi eşlemesi (SQLite, WAL)"""
+
+    def __init__(self, db_file, timeout: float = 30.0):
+        """
+        Args:
+            db_file: Veritabanı dosyası (ör. data/catalog.sqlite3)
+            timeout: Başka bir yazıcının kilidi bırakması için bekleme süresi (s)
+        """
+        self.db_file = str(db_file)
+        self._lock = threading.RLock()
+        self._depth = 0
+        self._conn = sqlite3.connect(self.db_file, timeout=timeout, isolation_level=None,
+                                     check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        # WAL'da NORMAL: her işlemde fsync yok, yalnızca checkpoint'te (çökmede son işlem kaybolabilir)
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        with self.transaction():
+            for statement in SCHEMA.strip().split(";"):
+                if statement.strip():
+                    self._conn.execute(statement)
+            self._conn.execute(f"PRAGMA user_version={SCHEMA_VERSION}")
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    @contextmanager
+    def transaction(self):
+        """
+        Birden çok yazmayı tek işlemde topla (iç içe kullanılabilir)
+
+        Toplu kayıtlarda satır başına işlem maliyetini kaldırır; hata olursa
+        işlem geri alınır.
+        """
+        with self._lock:
+            if self._depth == 0:
+                self._conn.execute("BEGIN IMMEDIATE")
+            self._depth += 1
+            try:
+                yield self
+            except BaseException:
+                self._depth -= 1
+                if self._depth == 0:
+                    self._conn.execute("ROLLBACK")
+                raise
+            self._depth -= 1
+            if self._depth == 0:
+                self._conn.execute("COMMIT")
+
+    # --- MutableMapping arayüzü ---
+
+    def __getitem__(self, relative_path: str) -> Dict[str, Any]:
+        with self._lock:
+            row = self._conn.execute("SELECT info FROM files WHERE relative_path = ?",
+                                     (relative_path,)).fetchone()
+        if row is None:
+            raise KeyError(relative_path)
+        return json.loads(row[0])
+
+    def __setitem__(self, relative_path: str, file_info: Dict[str, Any]):
+        with self._lock:
+            self._conn.execute(UPSERT, _row(relative_path, file_info))
+
+    def __delitem__(self, relative_path: str):
+        with self._lock:
+            cursor = self._conn.execute("DELETE FROM files WHERE relative_path = ?", (relative_path,))
+        if cursor.rowcount == 0:
+            raise KeyError(relative_path)
+
+    def __contains__(self, relative_path) -> bool:
+        with self._lock:
+            return self._conn.execute("SELECT 1 FROM files WHERE relative_path = ?",
+                                      (relative_path,)).fetchone() is not None
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM files").fetchone()[0]
+
+    def __iter__(self) -> Iterator[str]:
+        for relative_path, _ in self.items():
+            yield relative_path
+
+    def items(self) -> Iterator[Tuple[str, Dict[str, Any]]]:
+        """(göreli yol, bilgi) çiftleri, yol sırasıyla; bellek kullanımı sabit"""
+        return self._select("", ())
+
+    def update_many(self, records: Iterable[Tuple[str, Dict[str, Any]]]):
+        """Birden çok kaydı tek işlemde ekle / güncelle"""
+        with self.transaction():
+            self._conn.executemany(UPSERT, (_row(path, info) for path, info in records))
+
+    def update(self, other=(), **kwargs):
+        """dict.update ile aynı; tüm kayıtlar tek işlemde yazılır"""
+        records = list(other.items() if hasattr(other, "items") else other) + list(kwargs.items())
+        self.update_many(records)
+
+    def replace_all(self, catalog: Dict[str, Dict[str, Any]]):
+        """Katalog içeriğini verilen sözlükle değiştir (JSON'dan içe aktarma)"""
+        with self.transaction():
+            self._conn.execute("DELETE FROM files")
+            self.update_many(catalog.items())
+
+    # --- Sorgular ---
+
+    def _select(self, where: str, parameters: Tuple, batch_size: int = 1000):
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT relative_path, info FROM files {where} ORDER BY relative_path", parameters)
+            batch = rows.fetchmany(batch_size)
+        while batch:
+            for relative_path, info in batch:
+                yield relative_path, json.loads(info)
+            with self._lock:
+                batch = rows.fetchmany(batch_size)
+
+    def query(self, environment: Optional[str] = None, source_device: Optional[str] = None,
+              file_type: Optional[str] = None, date_from: Optional[str] = None,
+              date_to: Optional[str] = None, hash_sha256: Optional[str] = None
+              ) -> List[Tuple[str, Dict[str, Any]]]:
+        """
+        İndeksli alanlara göre filtrele
+
+        Args:
+            environment: Ortam (ör. 'ofis')
+            source_device: Cihaz (ör. 'samsung')
+            file_type: 'audio' / 'video' / 'image'
+            date_from, date_to: Toplama tarihi aralığı (ISO 'YYYY-MM-DD', uçlar dahil)
+            hash_sha256: Belirli bir içerik hash'i (kopya arama)
+
+        Returns:
+            [(göreli yol, bilgi), ...]
+        """
+        conditions = []
+        parameters = []
+        for column, value in (("environment", environment), ("source_device", source_device),
+                              ("file_type", file_type), ("hash_sha256", hash_sha256)):
+            if value is not None:
+                conditions.append(f"{column} = ?")
+                parameters.append(value)
+        if date_from is not None:
+            conditions.append("collection_date >= ?")
+            parameters.append(date_from)
+        if date_to is not None:
+            conditions.append("collection_date <= ?")
+            parameters.append(date_to)
+
+        where = "WHERE " + " AND ".join(conditions) if conditions else ""
+        return list(self._select(where, tuple(parameters)))
+
+    # --- Dışa aktarma görünümleri ---
+
+    def export_json(self, json_file):
+        """metadata_catalog.json biçiminde akış halinde dışa aktar"""
+        with open(json_file, 'w', encoding='utf-8') as f:
+            separator = "{\n  "
+            for relative_path, file_info in self.items():
+                f.write(separator + json.dumps(relative_path, ensure_ascii=False) + ": ")
+                f.write(json.dumps(file_info, indent=2, ensure_ascii=False).replace("\n", "\n  "))
+                separator = ",\n  "
+            f.write("{}" if separator == "{\n  " else "\n}")
@@ -0,0 +1,270 @@
+"""
+Zincirli Chain-of-Custody Logu - Yalnızca eklemeli, hash zincirli JSON Lines
+
+Her satır bir olaydır; satır, önceki satırın hash'ini (prev_hash) ve kendi
+içeriğinin SHA-256'sını (entry_hash) taşır:
+
+    {"action":...,"details":{...},"prev_hash":"...","seq":N,"timestamp":"..."
+     ,"entry_hash":"<sha256(entry_hash alanı olmadan satır)>"}
+
+- Ekleme O(1): zincirin başı yalnızca dosyanın son satırından okunur
+  (aynı süreçte dosya boyutu değişmediyse bellekteki değer kullanılır).
+- Süreçler arası güvenlik: her ekleme dosya kilidi altında yapılır.
+- fsync toplu yapılır (fsync_every olay veya fsync_interval saniyede bir);
+  çökmede en fazla son toplu grup kaybolur, yarım kalmış son satır bir
+  sonraki eklemede kesilir ve zincir bozulmaz.
+- verify_custody_log tüm zinciri tek sıralı geçişte doğrular.
+"""
+
+import hashlib
+import json
+import os
+import time
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterable, Optional, Tuple
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+GENESIS_HASH = "0" * 64
+HASH_FIELD = b',"entry_hash":"'
+TAIL_READ_SIZE = 4096
+
+
+def _lock(fd: int):
+    if fcntl is not None:
+        fcntl.flock(fd, fcntl.LOCK_EX)
+    else:
+        os.lseek(fd, 0, os.SEEK_SET)
+        msvcrt.locking(fd, msvcrt.LK_LOCK, 1)
+
+
+def _unlock(fd: int):
+    if fcntl is not None:
+        fcntl.flock(fd, fcntl.LOCK_UN)
+    else:
+        os.lseek(fd, 0, os.SEEK_SET)
+        msvcrt.locking(fd, msvcrt.LK_UNLCK, 1)
+
+
+def _encode_entry(entry: Dict[str, Any]) -> Tuple[bytes, str]:
+    """Olayı kanonik JSON satırına çevir; (satır, entry_hash) döndür"""
+    body = json.dumps(entry, sort_keys=True, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+    entry_hash = hashlib.sha256(body).hexdigest()
+    return body[:-1] + HASH_FIELD + entry_hash.encode("ascii") + b'"}\n', entry_hash
+
+
+def _split_line(line: bytes) -> Tuple[bytes, bytes]:
+    """Satırı (hash'lenen gövde, entry_hash) olarak ayır"""
+    index = line.rfind(HASH_FIELD)
+    if index < 0 or not line.endswith(b'"}'):
+        raise ValueError("entry_hash alanı bulunamadı")
+    return line[:index] + b"}", line[index + len(HASH_FIELD):-2]
+
+
+class CustodyLog:
+    """Hash zincirli, yalnızca eklemeli custody logu (JSON Lines)"""
+
+    def __init__(self, log_file, fsync_every: int = 64, fsync_interval: float = 1.0):
+        """
+        Args:
+            log_file: Log dosyası (ör. data/chain_of_custody.jsonl)
+            fsync_every: Bu kadar olayda bir fsync
+            fsync_interval: Son fsync'ten bu kadar saniye geçtiyse fsync
+        """
+        self.log_file = str(log_file)
+        self.fsync_every = fsync_every
+        self.fsync_interval = fsync_interval
+        self._fd = os.open(self.log_file, os.O_RDWR | os.O_APPEND | os.O_CREAT | getattr(os, "O_BINARY", 0),
+                           0o644)
+        self._known_size = -1
+        self._head: Tuple[int, str] = (-1, GENESIS_HASH)
+        self._unsynced = 0
+        self._last_sync = time.monotonic()
+
+    def close(self):
+        if self._fd is not None:
+            self.flush()
+            os.close(self._fd)
+            self._fd = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def flush(self):
+        """Bekleyen olayları diske yaz (fsync)"""
+        if self._unsynced:
+            os.fsync(self._fd)
+            self._unsynced = 0
+        self._last_sync = time.monotonic()
+
+    def _read_head(self) -> Tuple[int, str]:
+        """
+        Zincirin başını (son seq, son entry_hash) dosya sonundan oku
+
+        Kilit altında çağrılır. Yarım kalmış (yeni satırla bitmeyen) son
+        kayıt kesilir: bu kayıt hiçbir zaman tamamlanmamıştır.
+        """
+        size = os.fstat(self._fd).st_size
+        if size == self._known_size:
+            return self._head
+        if size == 0:
+            self._known_size = 0
+            self._head = (-1, GENESIS_HASH)
+            return self._head
+
+        read_size = TAIL_READ_SIZE
+        while True:
+            start = max(0, size - read_size)
+            tail = self._read_at(start, size - start)
+            if not tail.endswith(b"\n"):
+                cut = tail.rfind(b"\n")
+                if cut < 0 and start > 0:
+                    read_size *= 2
+                    continue
+                os.ftruncate(self._fd, start + cut + 1)
+                os.fsync(self._fd)
+                self._known_size = -1
+                return self._read_head()
+
+            newline = tail.rfind(b"\n", 0, len(tail) - 1)
+            if newline < 0 and start > 0:
+                read_size *= 2
+                continue
+            last = tail[newline + 1:-1]
+            break
+
+        body, entry_hash = _split_line(last)
+        self._known_size = size
+        self._head = (json.loads(body)["seq"], entry_hash.decode("ascii"))
+        return self._head
+
+    def _read_at(self, offset: int, length: int) -> bytes:
+        if hasattr(os, "pread"):
+            return os.pread(self._fd, length, offset)
+        os.lseek(self._fd, offset, os.SEEK_SET)
+        return os.read(self._fd, length)
+
+    def append_many(self, events: Iterable[Tuple[str, Dict[str, Any]]]) -> str:
+        """
+        Birden çok olayı tek kilit ve tek yazma ile ekle
+
+        Args:
+            events: (action, details) çiftleri
+
+        Returns:
+            str: Zincirin yeni başı (son entry_hash)
+        """
+        _lock(self._fd)
+        try:
+            return self._append_locked(events)
+        finally:
+            _unlock(self._fd)
+
+    def append_if_empty(self, events: Iterable[Tuple[str, Dict[str, Any]]]) -> bool:
+        """
+        Olayları yalnızca log boşsa (baş GENESIS_HASH ise) ekle
+
+        Kontrol ve ekleme aynı kilit altında yapılır; aynı anda başlayan
+        süreçlerden yalnızca biri başlangıç olaylarını yazar.
+
+        Returns:
+            bool: Olaylar eklendiyse True
+        """
+        _lock(self._fd)
+        try:
+            if self._read_head()[1] != GENESIS_HASH:
+                return False
+            self._append_locked(events)
+            return True
+        finally:
+            _unlock(self._fd)
+
+    def _append_locked(self, events: Iterable[Tuple[str, Dict[str, Any]]]) -> str:
+        """Olayları zincire yaz (kilit altında çağrılır)"""
+        seq, prev_hash = self._read_head()
+        timestamp = datetime.now(timezone.utc).isoformat()
+        lines = []
+        for action, details in events:
+            seq += 1
+            line, prev_hash = _encode_entry({
+                "seq": seq,
+                "timestamp": timestamp,
+                "action": action,
+                "details": details or {},
+                "prev_hash": prev_hash,
+            })
+            lines.append(line)
+        if not lines:
+            return prev_hash
+
+        data = b"".join(lines)
+        written = 0
+        while written < len(data):
+            written += os.write(self._fd, data[written:])
+        self._known_size = os.fstat(self._fd).st_size
+        self._head = (seq, prev_hash)
+
+        self._unsynced += len(lines)
+        if (self._unsynced >= self.fsync_every
+                or time.monotonic() - self._last_sync >= self.fsync_interval):
+            self.flush()
+        return prev_hash
+
+    def append(self, action: str, details: Optional[Dict[str, Any]] = None) -> str:
+        """Tek olay ekle; zincirin yeni başını döndür"""
+        return self.append_many([(action, details)])
+
+    @property
+    def head(self) -> str:
+        """Son olayın entry_hash'i (log boşsa GENESIS_HASH)"""
+        _lock(self._fd)
+        try:
+            return self._read_head()[1]
+        finally:
+            _unlock(self._fd)
+
+
+def verify_custody_log(log_file) -> Dict[str, Any]:
+    """
+    Zinciri tek sıralı geçişte doğrula
+
+    Her satırın entry_hash'i yeniden hesaplanır, prev_hash önceki satırla
+    ve seq ardışıklığı karşılaştırılır. İlk hatada durulur.
+
+    Returns:
+        Dict: valid, entries, head_hash ve hata varsa error / line
+    """
+    result = {"valid": True, "entries": 0, "head_hash": GENESIS_HASH}
+    expected_prev = GENESIS_HASH
+    expected_seq = 0
+
+    with open(log_file, "rb", buffering=1024 * 1024) as f:
+        for line_number, line in enumerate(f, 1):
+            try:
+                if not line.endswith(b"\n"):
+                    raise ValueError("yarım kalmış son satır")
+                body, entry_hash = _split_line(line[:-1])
+                if hashlib.sha256(body).hexdigest().encode("ascii") != entry_hash:
+                    raise ValueError("entry_hash içerikle uyuşmuyor (kayıt değiştirilmiş)")
+                entry = json.loads(body)
+                if entry.get("prev_hash") != expected_prev:
+                    raise ValueError("prev_hash önceki kayıtla uyuşmuyor (kayıt silinmiş/eklenmiş)")
+                if entry.get("seq") != expected_seq:
+                    raise ValueError(f"seq beklenen {expected_seq}, bulunan {entry.get('seq')}")
+            except ValueError as e:
+                result.update(valid=False, error=str(e), line=line_number)
+                return result
+
+            expected_prev = entry_hash.decode("ascii")
+            expected_seq += 1
+            result["entries"] += 1
+            result["head_hash"] = expected_prev
+
+    return result
@@ -0,0 +1,135 @@
+"""
+ENF Ara Sonuç Önbelleği - İçerik adresli spektrogram ve tepe izi önbelleği
+"""
+
+import hashlib
+import json
+import os
+import zipfile
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+import numpy as np
+
+from utils.atomic_io import atomic_write
+from utils.file_hasher import hash_file
+
+
+class ENFCache:
+    """
+    (dosya hash'i, aşama parametreleri) anahtarlı disk önbelleği
+
+    Her giriş tek bir .npz dosyasıdır (bant sınırlı spektrogram + ham tepe
+    izi). Erişilen girişlerin mtime'ı güncellenir; toplam boyut max_bytes'ı
+    aşınca en eski erişilenler silinir (LRU).
+    """
+
+    def __init__(self, cache_dir: str, max_bytes: int = 2 * 1024 ** 3):
+        """
+        Args:
+            cache_dir: Önbellek dizini
+            max_bytes: Önbelleğin en fazla kaplayacağı alan (byte)
+        """
+        self.cache_dir = Path(cache_dir)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+        # Dosya başına bir hash kaydı: paralel işçiler ortak bir indeksi
+        # oku-değiştir-yaz yapmadığı için birbirinin kaydını ezmez
+        self.hash_dir = self.cache_dir / "file_hashes"
+
+    def file_hash(self, file_path: str) -> str:
+        """
+        Dosyanın SHA-256 hash'i (DataCollector.calculate_file_hash ile aynı)
+
+        (boyut, mtime_ns) değişmediyse önceki hash yeniden kullanılır, böylece
+        çok GB'lık kanıt dosyaları her çalıştırmada yeniden okunmaz.
+        """
+        file_path = Path(file_path).resolve()
+        stat = file_path.stat()
+        stamp = [stat.st_size, stat.st_mtime_ns]
+
+        record_file = self._hash_record_path(file_path)
+        try:
+            with open(record_file, "r", encoding="utf-8") as f:
+                record = json.load(f)
+            if record["path"] == str(file_path) and record["stamp"] == stamp:
+                return record["sha256"]
+        except (FileNotFoundError, ValueError, KeyError):
+            pass
+
+        digest = hash_file(file_path)["sha256"]
+
+        record_file.parent.mkdir(parents=True, exist_ok=True)
+        with atomic_write(str(record_file)) as f:
+            f.write(json.dumps({"path": str(file_path), "stamp": stamp, "sha256": digest}).encode("utf-8"))
+        return digest
+
+    def make_key(self, file_hash: str, params: Dict[str, Any]) -> str:
+        """Dosya hash'i ve aşama parametrelerinden önbellek anahtarı üret"""
+        payload = json.dumps({"file": file_hash, "params": params}, sort_keys=True, default=str)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def load(self, key: str) -> Optional[Dict[str, np.ndarray]]:
+        """Girişi yükle (yoksa None) ve LRU için erişim zamanını güncelle"""
+        entry_file = self._entry_path(key)
+        try:
+            with np.load(entry_file, allow_pickle=False) as data:
+                arrays = {name: data[name] for name in data.files}
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError, EOFError, zipfile.BadZipFile):
+            # Yarım kalmış / bozuk giriş: sil, çağıran yeniden hesaplar
+            try:
+                entry_file.unlink()
+            except OSError:
+                pass
+            return None
+
+        try:
+            os.utime(entry_file)
+        except OSError:
+            pass
+        return arrays
+
+    def store(self, key: str, **arrays: np.ndarray) -> Path:
+        """Girişi atomik olarak yaz ve gerekirse eski girişleri çıkar"""
+        entry_file = self._entry_path(key)
+        entry_file.parent.mkdir(parents=True, exist_ok=True)
+
+        with atomic_write(str(entry_file)) as f:
+            np.savez(f, **arrays)
+
+        self.evict()
+        return entry_file
+
+    def evict(self) -> int:
+        """Toplam boyut max_bytes altına inene kadar en eski girişleri sil"""
+        entries = []
+        for entry_file in self.cache_dir.glob("*/*.npz"):
+            try:
+                stat = entry_file.stat()
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_mtime_ns, stat.st_size, entry_file))
+
+        total = sum(size for _, size, _ in entries)
+        removed = 0
+        for _, size, entry_file in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            try:
+                entry_file.unlink()
+                total -= size
+                removed += 1
+            except FileNotFoundError:
+                continue
+        return removed
+
+    def _entry_path(self, key: str) -> Path:
+        """Anahtar için giriş yolu (dizin başına dosya sayısını sınırlamak için iki seviye)"""
+        return self.cache_dir / key[:2] / f"{key}.npz"
+
+    def _hash_record_path(self, file_path: Path) -> Path:
+        """Kaynak dosyanın hash kaydı (mutlak yolun SHA-256'sı ile adlandırılır)"""
+        name = hashlib.sha256(str(file_path).encode("utf-8")).hexdigest()
+        return self.hash_dir / f"{name}.json"
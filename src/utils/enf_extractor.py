@@ -3,31 +3,36 @@ ENF (Electric Network Frequency) Çıkarma Modülü
 """
 
 import numpy as np
-import librosa
-import cv2
-from scipy import signal
-from scipy.fft import fft, fftfreq
-import matplotlib.pyplot as plt
 from typing import Tuple, List, Optional
 import json
 from datetime import datetime
 
+from utils.spectral import (decimation_factor, decimate, StreamingDecimator, track_peaks,
+                            zoom_peak_track)
+from utils.video_reader import VideoFrameReader
+
 class ENFExtractor:
     """ENF sinyali çıkarma sınıfı"""
     
-    def __init__(self, target_freq: float = 50.0, tolerance: float = 0.1):
+    def __init__(self, target_freq: float = 50.0, tolerance: float = 0.1,
+                 decimate_to: Optional[float] = None):
         """
         Args:
             target_freq: Hedef ENF frekansı (Hz)
             tolerance: Kabul edilebilir frekans toleransı (Hz)
+            decimate_to: STFT öncesi seyreltme hedefi (Hz), None ise seyreltme yok
         """
         self.target_freq = target_freq
         self.tolerance = tolerance
         self.freq_range = (target_freq - tolerance, target_freq + tolerance)
+        self.decimate_to = decimate_to
         
     def extract_from_audio(self, audio_file: str, 
                           window_size: int = 4096,
-                          hop_size: int = 1024) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+                          hop_size: int = 1024,
+                          interpolation: Optional[str] = None,
+                          engine: str = 'stft',
+                          zoom_resolution: float = 0.001) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
         """
         Ses dosyasından ENF sinyali çıkarma
         
@@ -35,95 +40,118 @@ class ENFExtractor:
             audio_file: Ses dosyası yolu
             window_size: FFT pencere boyutu
             hop_size: Pencere atlama boyutu
+            interpolation: Alt-bin frekans kestirimi (None, 'parabolic', 'gaussian')
+            engine: Spektral motor: 'stft' (librosa) veya 'zoom' (yalnızca freq_range
+                bandında chirp-z dönüşümü)
+            zoom_resolution: Zoom motorunda frekans adımı (Hz)
             
         Returns:
             frequencies: ENF frekans değerleri
             timestamps: Zaman damgaları
             confidence: Güven skorları
         """
+        import librosa
+        
         # Ses dosyasını yükle
         y, sr = librosa.load(audio_file, sr=None)
         
-        # STFT hesapla
-        stft = librosa.stft(y, n_fft=window_size, hop_length=hop_size)
-        
-        # Spektrogram hesapla
-        spectrogram = np.abs(stft) ** 2
+        # İsteğe bağlı çok fazlı seyreltme (pencere boyutu örnek sayısı olarak
+        # korunduğundan frekans çözünürlüğü q kat artar)
+        q = decimation_factor(sr, self.decimate_to, min_rate=2 * self.freq_range[1])
+        if q > 1:
+            y = decimate(y, q)
+            sr = sr / q
         
-        # ENF frekans bandını filtrele
-        freq_bins = librosa.fft_frequencies(sr=sr, n_fft=window_size)
-        enf_mask = (freq_bins >= self.freq_range[0]) & (freq_bins <= self.freq_range[1])
-        
-        # ENF frekanslarını çıkar
-        enf_spectrogram = spectrogram[enf_mask, :]
-        enf_freq_bins = freq_bins[enf_mask]
-        
-        # Her zaman dilimi için en güçlü frekansı bul
-        frequencies = []
-        confidence = []
-        
-        for i in range(enf_spectrogram.shape[1]):
-            power_spectrum = enf_spectrogram[:, i]
-            if len(power_spectrum) > 0 and np.sum(power_spectrum) > 0:
-                max_idx = np.argmax(power_spectrum)
-                freq = enf_freq_bins[max_idx]
-                conf = power_spectrum[max_idx] / np.sum(power_spectrum)
-                
-                frequencies.append(freq)
-                confidence.append(conf)
-            else:
-                # Varsayılan değerler
-                frequencies.append(self.target_freq)
-                confidence.append(0.0)
+        if engine == 'zoom':
+            # Yalnızca ENF bandını değerlendir (tam bant FFT yok, güç matrisi tutulmaz)
+            frequencies, confidence, _ = zoom_peak_track(
+                y, sr, window_size, hop_size, self.freq_range, zoom_resolution, self.target_freq,
+                interpolation=interpolation)
+        else:
+            # STFT hesapla
+            stft = librosa.stft(y, n_fft=window_size, hop_length=hop_size)
+            
+            # Spektrogram hesapla
+            spectrogram = np.abs(stft) ** 2
+            
+            # ENF frekans bandını filtrele
+            freq_bins = librosa.fft_frequencies(sr=sr, n_fft=window_size)
+            enf_mask = (freq_bins >= self.freq_range[0]) & (freq_bins <= self.freq_range[1])
+            
+            # ENF frekanslarını çıkar
+            enf_spectrogram = spectrogram[enf_mask, :]
+            enf_freq_bins = freq_bins[enf_mask]
+            
+            # Her zaman dilimi için en güçlü frekansı bul (tüm spektrogram tek geçişte)
+            frequencies, confidence = track_peaks(enf_spectrogram, enf_freq_bins, self.target_freq,
+                                                  interpolation=interpolation)
         
         # Zaman damgaları
-        timestamps = librosa.times_like(np.array(frequencies), sr=sr, hop_length=hop_size)
+        timestamps = librosa.times_like(frequencies, sr=sr, hop_length=hop_size)
         
-        return np.array(frequencies), timestamps, np.array(confidence)
+        return frequencies, timestamps, confidence
     
     def extract_from_video(self, video_file: str,
-                          roi: Optional[Tuple[int, int, int, int]] = None) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+                          roi: Optional[Tuple[int, int, int, int]] = None,
+                          mode: str = 'frame',
+                          readout_ratio: float = 1.0,
+                          segment_seconds: float = 4.0,
+                          hop_seconds: float = 1.0,
+                          zoom_resolution: float = 0.001,
+                          scene_frames: int = 30,
+                          backend: str = 'opencv',
+                          scale: Optional[Tuple[int, int]] = None,
+                          queue_size: int = 32) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
         """
         Video dosyasından ENF sinyali çıkarma (LED flicker analizi)
         
         Args:
             video_file: Video dosyası yolu
             roi: İlgi alanı (x, y, width, height)
+            mode: 'frame' (kare başına tek parlaklık, kare hızında örnekleme) veya
+                'rolling_shutter' (her sensör satırı ayrı zaman örneği; zamanla
+                değişen ENF eğrisi, kesim başına güven skoru)
+            readout_ratio: Rolling shutter satır okuma süresinin kare süresine oranı
+                (kalan kısım satırların örneklenmediği boşluk)
+            segment_seconds: Rolling shutter analiz penceresi (s)
+            hop_seconds: Rolling shutter pencere atlaması (s)
+            zoom_resolution: Rolling shutter frekans adımı (Hz, flicker bandında)
+            scene_frames: Sahne (sabit satır profili) ortalamasının alındığı kare sayısı
+            backend: Kod çözücü: 'opencv' veya 'ffmpeg' (doğrudan gri rawvideo borusu)
+            scale: ROI sonrası küçültme boyutu (width, height); rolling shutter için
+                yalnızca genişliği küçültmek satır örneklemesini korur
+            queue_size: Arka planda önden çözülen en fazla kare sayısı
             
         Returns:
             frequencies: ENF frekans değerleri
             timestamps: Zaman damgaları
             confidence: Güven skorları
         """
-        cap = cv2.VideoCapture(video_file)
-        fps = cap.get(cv2.CAP_PROP_FPS)
+        reader = VideoFrameReader(video_file, roi=roi, gray=True, scale=scale,
+                                  backend=backend, queue_size=queue_size)
+        
+        if mode == 'rolling_shutter':
+            return self._extract_rolling_shutter(reader, readout_ratio, segment_seconds,
+                                                 hop_seconds, zoom_resolution, scene_frames)
         
+        import cv2
+        from scipy.fft import fft, fftfreq
+        
+        fps = reader.fps
         brightness_values = []
         timestamps = []
         
         frame_count = 0
-        while cap.isOpened():
-            ret, frame = cap.read()
-            if not ret:
-                break
+        with reader:
+            for gray in reader:
+                # Ortalama parlaklık (ROI ve gri dönüşüm okuyucu iş parçacığında yapıldı)
+                brightness_values.append(cv2.mean(gray)[0])
                 
-            # ROI uygula
-            if roi:
-                x, y, w, h = roi
-                frame = frame[y:y+h, x:x+w]
-            
-            # Ortalama parlaklık hesapla
-            gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
-            brightness = np.mean(gray)
-            brightness_values.append(brightness)
-            
-            # Zaman damgası
-            timestamp = frame_count / fps
-            timestamps.append(timestamp)
-            
-            frame_count += 1
-            
-        cap.release()
+                # Zaman damgası
+                timestamp = frame_count / fps
+                timestamps.append(timestamp)
+                
+                frame_count += 1
         
         # Flicker analizi
         brightness_signal = np.array(brightness_values)
@@ -149,6 +177,72 @@ class ENFExtractor:
         
         return frequencies, timestamps, confidences
     
+    def _extract_rolling_shutter(self, reader: VideoFrameReader,
+                                 readout_ratio: float, segment_seconds: float, hop_seconds: float,
+                                 zoom_resolution: float,
+                                 scene_frames: int) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Rolling shutter satır örneklemesiyle zamanla değişen ENF çıkarımı
+        
+        Her karenin satır ortalamaları, satırın okunduğu ana yerleştirilerek
+        (kare başına satır sayısı / okuma süresi hızında, kareler arası boşluk
+        sıfır) sürekli bir sinyal oluşturulur. Sahne içeriği scene_frames'lik
+        gruplarda satır profiline bölünerek çıkarılır; sinyal akış halinde
+        seyreltilir ve 2 x ENF flicker bandında zoom FFT ile takip edilir.
+        """
+        import cv2
+        
+        # LED ışık şiddeti |sin|^2 ile değiştiğinden flicker ENF'nin iki katındadır
+        band = (2 * self.freq_range[0], 2 * self.freq_range[1])
+        
+        signal_chunks = []
+        row_profiles = []
+        
+        def flush_group():
+            # Grup içindeki satır toplamları: (kare, satır)
+            rows = np.stack(row_profiles).reshape(len(row_profiles), n_rows).astype(np.float32)
+            scene = rows.mean(axis=0)
+            scene[scene <= 0] = 1.0
+            flicker = rows / scene - 1.0
+            
+            # Kareler arası okuma boşluğu (satır örneği yok) sıfırla doldurulur
+            samples = np.zeros((len(flicker), n_rows + idle_rows), dtype=np.float32)
+            samples[:, :n_rows] = flicker
+            signal_chunks.append(decimator.process(samples.ravel()))
+            row_profiles.clear()
+        
+        n_rows = reader.frame_size[1]
+        idle_rows = int(round(n_rows * (1.0 / readout_ratio - 1.0)))
+        line_rate = (n_rows + idle_rows) * reader.fps
+        q = decimation_factor(line_rate, 1000.0, min_rate=4 * band[1])
+        decimator = StreamingDecimator(q)
+        analysis_rate = line_rate / q
+        
+        frame_count = 0
+        with reader:
+            for gray in reader:
+                # Satır toplamları tek çağrıda (H x 1); normalizasyon grup halinde yapılır
+                row_profiles.append(cv2.reduce(gray, 1, cv2.REDUCE_SUM, dtype=cv2.CV_32S))
+                frame_count += 1
+                if len(row_profiles) == scene_frames:
+                    flush_group()
+        
+        if row_profiles:
+            flush_group()
+        
+        if frame_count == 0:
+            raise ValueError(f"Videoda kare bulunamadı: {reader.video_file}")
+        
+        signal = np.concatenate(signal_chunks + [decimator.flush()])
+        n_fft = int(round(segment_seconds * analysis_rate))
+        hop = max(1, int(round(hop_seconds * analysis_rate)))
+        
+        flicker_freqs, confidence, timestamps = zoom_peak_track(
+            signal, analysis_rate, n_fft, hop, band, 2 * zoom_resolution, 2 * self.target_freq,
+            interpolation='parabolic')
+        
+        return flicker_freqs / 2, timestamps, confidence
+    
     def save_enf_data(self, frequencies: np.ndarray, 
                      timestamps: np.ndarray, 
                      confidence: np.ndarray,
@@ -181,6 +275,8 @@ class ENFExtractor:
                          output_file: str = None):
         """ENF analiz sonuçlarını görselleştir"""
         
+        import matplotlib.pyplot as plt
+        
         fig, (ax1, ax2, ax3) = plt.subplots(3, 1, figsize=(12, 10))
         
         # Frekans zaman serisi
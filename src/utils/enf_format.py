@@ -0,0 +1,144 @@
+"""
+ENF Sonuç Dosya Formatı - Sütunlu ikili (binary) format ve tembel yükleme
+
+Dosya düzeni (.enfb):
+    8 byte   : sihirli değer b"ENFB" + uint16 sürüm + uint16 ayrılmış
+    4 byte   : JSON başlık uzunluğu (uint32, little-endian)
+    N byte   : UTF-8 JSON başlık (extraction_info, statistics, ... ve dizi tablosu)
+    dolgu    : dizilerin 64 byte hizalı başlaması için
+    diziler  : ham little-endian diziler (np.memmap ile kopyasız okunur)
+"""
+
+import json
+import os
+import struct
+import tempfile
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+import numpy as np
+
+MAGIC = b"ENFB"
+FORMAT_VERSION = 1
+ALIGNMENT = 64
+BINARY_SUFFIX = ".enfb"
+
+
+def _json_default(value):
+    """numpy skalerlerini JSON'a dönüştür"""
+    if isinstance(value, np.generic):
+        return value.item()
+    raise TypeError(f"JSON'a dönüştürülemeyen tür: {type(value)}")
+
+
+def save_enf_binary(output_path: str, header: Dict[str, Any],
+                    arrays: Dict[str, Optional[np.ndarray]]) -> Path:
+    """
+    ENF sonuçlarını ikili formatta (atomik olarak) kaydet
+
+    Args:
+        output_path: Çıktı dosyası (.enfb)
+        header: Dizi olmayan alanlar (extraction_info, statistics, ...)
+        arrays: Ad -> dizi (None olanlar atlanır)
+
+    Returns:
+        Path: Yazılan dosya
+    """
+    output_path = Path(output_path)
+    arrays = {name: np.ascontiguousarray(a) for name, a in arrays.items() if a is not None}
+
+    # Dizi tablosu: ofsetler veri bölgesinin başına göredir
+    table = {}
+    offset = 0
+    for name, array in arrays.items():
+        array = array.astype(array.dtype.newbyteorder('<'), copy=False)
+        arrays[name] = array
+        table[name] = {"dtype": array.dtype.str, "shape": list(array.shape), "offset": offset}
+        offset += -(-array.nbytes // ALIGNMENT) * ALIGNMENT
+
+    header_bytes = json.dumps(dict(header, arrays=table), ensure_ascii=False,
+                              default=_json_default).encode("utf-8")
+    prefix_len = 12 + len(header_bytes)
+    data_start = -(-prefix_len // ALIGNMENT) * ALIGNMENT
+
+    fd, tmp_path = tempfile.mkstemp(dir=output_path.parent, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(MAGIC + struct.pack("<HH", FORMAT_VERSION, 0))
+            f.write(struct.pack("<I", len(header_bytes)))
+            f.write(header_bytes)
+            f.write(b"\0" * (data_start - prefix_len))
+            for name, array in arrays.items():
+                f.write(array.tobytes())
+                f.write(b"\0" * (-array.nbytes % ALIGNMENT))
+        os.replace(tmp_path, output_path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+    return output_path
+
+
+def read_enf_header(file_path: str) -> Dict[str, Any]:
+    """Yalnızca JSON başlığı oku (diziler okunmaz)"""
+    with open(file_path, "rb") as f:
+        prefix = f.read(12)
+        if len(prefix) < 12 or prefix[:4] != MAGIC:
+            raise ValueError(f"Geçersiz ENF ikili dosyası: {file_path}")
+        version, _ = struct.unpack("<HH", prefix[4:8])
+        if version > FORMAT_VERSION:
+            raise ValueError(f"Desteklenmeyen ENF ikili sürümü: {version}")
+        (header_len,) = struct.unpack("<I", prefix[8:12])
+        header = json.loads(f.read(header_len).decode("utf-8"))
+
+    header["_data_start"] = -(-(12 + header_len) // ALIGNMENT) * ALIGNMENT
+    return header
+
+
+def load_enf_binary(file_path: str, mmap: bool = True) -> Dict[str, Any]:
+    """
+    İkili ENF dosyasını yükle
+
+    Args:
+        file_path: .enfb dosyası
+        mmap: True ise diziler np.memmap (salt okunur, kopyasız) olarak döner
+
+    Returns:
+        Dict: başlık alanları + "arrays" altında ad -> dizi
+    """
+    header = read_enf_header(file_path)
+    data_start = header.pop("_data_start")
+    table = header.pop("arrays", {})
+
+    arrays = {}
+    for name, info in table.items():
+        dtype = np.dtype(info["dtype"])
+        shape = tuple(info["shape"])
+        offset = data_start + info["offset"]
+        if mmap and int(np.prod(shape)) > 0:
+            arrays[name] = np.memmap(file_path, dtype=dtype, mode="r", offset=offset, shape=shape)
+        else:
+            count = int(np.prod(shape))
+            with open(file_path, "rb") as f:
+                f.seek(offset)
+                arrays[name] = np.fromfile(f, dtype=dtype, count=count).reshape(shape)
+
+    header["arrays"] = arrays
+    return header
+
+
+def load_enf_results(file_path: str, mmap: bool = True) -> Dict[str, Any]:
+    """
+    ENF sonuç dosyasını biçime göre yükle (JSON veya .enfb)
+
+    Her iki biçim de save_enf_results'ın JSON yapısıyla aynı sözlüğü döndürür;
+    .enfb'de enf_data altındaki diziler bellek eşlemli gelir.
+    """
+    if Path(file_path).suffix.lower() != BINARY_SUFFIX:
+        with open(file_path, "r", encoding="utf-8") as f:
+            return json.load(f)
+
+    data = load_enf_binary(file_path, mmap=mmap)
+    data["enf_data"] = data.pop("arrays")
+    return data
@@ -0,0 +1,111 @@
+"""
+Çok Çözünürlüklü ENF İndeksi - Yıllarca süren referans üzerinde kaba-ince arama
+"""
+
+from typing import Any, Dict, List, Optional, Sequence
+
+import numpy as np
+
+from utils.enf_matcher import ENFMatcher
+
+
+def block_mean(series: np.ndarray, factor: int) -> np.ndarray:
+    """
+    Seriyi factor örneklik blokların ortalamasıyla seyrelt
+
+    Eksik (NaN) örnekler ortalamaya katılmaz; tamamen eksik bloklar NaN kalır.
+    Sondaki tam olmayan blok atılır.
+    """
+    series = np.asarray(series, dtype=np.float64)
+    n_blocks = len(series) // factor
+    blocks = series[:n_blocks * factor].reshape(n_blocks, factor)
+
+    missing = np.isnan(blocks)
+    counts = factor - missing.sum(axis=1)
+    totals = np.where(missing, 0.0, blocks).sum(axis=1)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return np.where(counts > 0, totals / counts, np.nan)
+
+
+class ENFPyramidIndex:
+    """
+    Referans ENF serisi üzerinde blok ortalamalı piramit indeksi
+
+    En kaba seviyede tüm ofsetler FFT ile taranır (N / F noktalık seri) ve en
+    iyi adaylar seçilir; her ince seviyede yalnızca önceki adayların
+    çevresindeki ofsetler doğrudan iç çarpımla puanlanır. Son seviye tam
+    çözünürlüklü NCC olduğundan döndürülen skorlar ENFMatcher ile aynıdır;
+    kaba seviyede elenen doğru ofset ise kaçırılır (geri çağırma < 1 olabilir).
+    """
+
+    def __init__(self, reference: np.ndarray, sample_rate: float = 1.0, start_time: float = 0.0,
+                 factors: Sequence[int] = (32, 4), candidates: int = 64, min_query_points: int = 16):
+        """
+        Args:
+            reference: Referans ENF serisi (ör. ReferenceENFStore.samples), eksikler NaN
+            sample_rate: Referans örnekleme oranı (Hz), sorguyla aynı olmalı
+            start_time: İlk örneğin zamanı (Unix epoch, s)
+            factors: Piramit seviyelerinin seyreltme oranları (her biri bir öncekine bölünebilir)
+            candidates: Her seviyede bir sonrakine aktarılan aday sayısı
+            min_query_points: Bir seviyenin kullanılması için seyreltilmiş sorgunun
+                en az uzunluğu (kısa sorgularda kaba seviyeler atlanır)
+        """
+        self.sample_rate = sample_rate
+        self.start_time = start_time
+        self.candidates = candidates
+        self.min_query_points = min_query_points
+
+        self.base = ENFMatcher(reference, sample_rate, start_time)
+        self.levels = []
+        for factor in sorted(set(factors), reverse=True):
+            if factor > 1:
+                coarse = block_mean(reference, factor)
+                self.levels.append((factor, ENFMatcher(coarse, sample_rate / factor, start_time)))
+
+    def match(self, query: np.ndarray, top_k: int = 5,
+              min_separation: Optional[int] = None) -> List[Dict[str, Any]]:
+        """
+        En iyi k aday başlangıç zamanını kaba-ince arama ile bul
+
+        Args:
+            query: 1 Hz ENF eğrisi (ör. ENFAudioExtractor.resample_to_1hz çıktısı)
+            top_k: Döndürülecek aday sayısı
+            min_separation: Adaylar arası en az ofset farkı (örnek), varsayılan m / 2
+
+        Returns:
+            List[Dict]: ENFMatcher.match ile aynı biçimde adaylar
+        """
+        query = np.asarray(query, dtype=np.float64)
+        m = len(query)
+        min_separation = min_separation or max(1, m // 2)
+
+        levels = [(factor, matcher) for factor, matcher in self.levels
+                  if m // factor >= self.min_query_points and m // factor <= matcher.length]
+        if not levels:
+            return self.base.match(query, top_k, min_separation)
+
+        # 1. En kaba seviye: tüm ofsetler FFT ile
+        factor, matcher = levels[0]
+        scores = matcher.correlate(block_mean(query, factor))
+        selected = matcher.top_candidates(scores, self.candidates, min_separation=2)
+        offsets = np.array([c["offset"] for c in selected], dtype=np.int64) * factor
+        previous = factor
+
+        # 2. İnce seviyeler: adayların ±(önceki oran) örneklik komşuluğu
+        for factor, matcher in levels[1:] + [(1, self.base)]:
+            level_query = block_mean(query, factor) if factor > 1 else query
+            span = previous // factor + 1
+            level_offsets = (offsets[:, None] // factor + np.arange(-span, span + 1)).ravel()
+            level_offsets = np.unique(level_offsets[(level_offsets >= 0) &
+                                                    (level_offsets <= matcher.length - len(level_query))])
+            if len(level_offsets) == 0:
+                return []
+
+            scores = matcher.score_offsets(level_query, level_offsets)
+            if factor == 1:
+                return matcher.top_candidates(scores, top_k, min_separation, offsets=level_offsets)
+
+            selected = matcher.top_candidates(scores, self.candidates, min_separation=2,
+                                              offsets=level_offsets)
+            offsets = np.array([c["offset"] for c in selected], dtype=np.int64) * factor
+            previous = factor
@@ -0,0 +1,210 @@
+"""
+ENF Eşleştirme - Çıkarılan ENF eğrisini uzun bir referans şebeke kaydına
+karşı kaydırarak kaydın başlangıç zamanını bulma
+"""
+
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+
+class ENFMatcher:
+    """
+    FFT tabanlı normalize çapraz korelasyon (NCC) ile ENF eşleştirme sınıfı
+
+    Her ofsetteki skor, sorgu ile o ofsetten başlayan referans penceresi
+    arasındaki Pearson korelasyonudur ([-1, 1]). Pay tek bir overlap-add
+    FFT korelasyonuyla, pencere ortalama/varyansları kümülatif toplamlarla
+    hesaplanır: N noktalı referansta sorgu başına O(N log m).
+    """
+
+    def __init__(self, reference: np.ndarray, sample_rate: float = 1.0, start_time: float = 0.0):
+        """
+        Args:
+            reference: Referans ENF serisi (Hz); eksik örnekler NaN olabilir
+            sample_rate: Referans örnekleme oranı (Hz), sorguyla aynı olmalı
+            start_time: Referansın ilk örneğinin zamanı (ör. Unix epoch, s)
+        """
+        reference = np.asarray(reference, dtype=np.float64)
+        self.sample_rate = sample_rate
+        self.start_time = start_time
+        self.length = len(reference)
+
+        # Eksik örnekler: korelasyonda 0, içeren pencereler geçersiz
+        missing = ~np.isfinite(reference)
+        count_dtype = np.int32 if self.length < 2 ** 31 else np.int64
+        self._missing_cumsum = np.concatenate([[0], np.cumsum(missing, dtype=count_dtype)])
+
+        # Sayısal kararlılık için küresel ortalamayı çıkar (50 Hz civarı değerlerin
+        # karelerinin kümülatif toplamı varyansı yutmasın)
+        offset = np.nanmean(reference) if not np.all(missing) else 0.0
+        self.reference = np.where(missing, 0.0, reference - offset)
+        self._cumsum = np.concatenate([[0.0], np.cumsum(self.reference)])
+        self._cumsum_sq = np.concatenate([[0.0], np.cumsum(self.reference ** 2)])
+
+    def correlate(self, query: np.ndarray) -> np.ndarray:
+        """
+        Tüm geçerli ofsetler için NCC skorları
+
+        Args:
+            query: Sorgu ENF eğrisi (referansla aynı örnekleme oranında)
+
+        Returns:
+            np.ndarray: len(reference) - len(query) + 1 skor; eksik örnek içeren
+            veya sabit pencerelerde -inf
+        """
+        from scipy.signal import oaconvolve
+
+        query, query_norm = self._prepare_query(query)
+        m = len(query)
+
+        # Pay: sum_i q~[i] * r[k + i] (sıfır ortalamalı sorguda pencere ortalaması düşer)
+        scores = oaconvolve(self.reference, query[::-1], mode='valid')
+        return self._normalize(scores, m, query_norm, slice(0, self.length - m + 1))
+
+    def score_offsets(self, query: np.ndarray, offsets: np.ndarray,
+                      chunk_size: int = 1024) -> np.ndarray:
+        """
+        Yalnızca verilen ofsetlerde NCC skorları (correlate ile aynı değerler)
+
+        Kaba-ince aramada az sayıda aday ofset için FFT yerine doğrudan iç
+        çarpım kullanılır: ofset başına O(m).
+        """
+        query, query_norm = self._prepare_query(query)
+        m = len(query)
+        offsets = np.asarray(offsets, dtype=np.int64)
+        if np.any((offsets < 0) | (offsets > self.length - m)):
+            raise ValueError("Ofset referans dışında")
+
+        windows = np.lib.stride_tricks.sliding_window_view(self.reference, m)
+        scores = np.empty(len(offsets), dtype=np.float64)
+        for start in range(0, len(offsets), chunk_size):
+            chunk = offsets[start:start + chunk_size]
+            scores[start:start + len(chunk)] = windows[chunk] @ query
+        return self._normalize(scores, m, query_norm, offsets)
+
+    def _prepare_query(self, query: np.ndarray):
+        """Sorguyu doğrula, sıfır ortalamalı hale getir ve normunu döndür"""
+        query = np.asarray(query, dtype=np.float64)
+        m = len(query)
+        if m < 2 or m > self.length:
+            raise ValueError(f"Sorgu uzunluğu geçersiz: {m} (referans: {self.length})")
+        if not np.all(np.isfinite(query)):
+            raise ValueError("Sorgu NaN/sonsuz değer içeriyor")
+
+        query = query - query.mean()
+        query_norm = np.sqrt(np.sum(query ** 2))
+        if query_norm == 0:
+            raise ValueError("Sorgu sabit (varyansı sıfır)")
+        return query, query_norm
+
+    def _normalize(self, scores: np.ndarray, m: int, query_norm: float, starts) -> np.ndarray:
+        """
+        Payı (yerinde) NCC'ye dönüştür
+
+        starts: tüm ofsetler için dilim ya da seçili ofset dizisi
+        """
+        ends = slice(starts.start + m, starts.stop + m) if isinstance(starts, slice) else starts + m
+
+        # Payda: |q~| * sqrt(pencere kareler toplamı - (pencere toplamı)^2 / m)
+        # (yıllık referansta her geçici dizi ~250 MB, işlemler yerinde yapılır)
+        window_sum = self._cumsum[ends] - self._cumsum[starts]
+        window_sum **= 2
+        window_sum /= m
+        denominator = self._cumsum_sq[ends] - self._cumsum_sq[starts]
+        denominator -= window_sum
+        del window_sum
+
+        invalid = denominator <= 1e-9 * m
+        invalid |= (self._missing_cumsum[ends] - self._missing_cumsum[starts]) > 0
+
+        np.maximum(denominator, 0.0, out=denominator)
+        np.sqrt(denominator, out=denominator)
+        denominator *= query_norm
+        with np.errstate(divide='ignore', invalid='ignore'):
+            scores /= denominator
+
+        scores[invalid] = -np.inf
+        return scores
+
+    def match(self, query: np.ndarray, top_k: int = 5,
+              min_separation: Optional[int] = None) -> List[Dict[str, Any]]:
+        """
+        En iyi k aday başlangıç zamanını bul
+
+        Args:
+            query: Sorgu ENF eğrisi (ör. extract_enf_from_audio'nun 1 Hz eğrisi)
+            top_k: Döndürülecek aday sayısı
+            min_separation: Adaylar arası en az ofset farkı (örnek); varsayılan
+                sorgu uzunluğunun yarısı (aynı tepenin komşuları tekrar gelmesin)
+
+        Returns:
+            List[Dict]: skora göre azalan sırada {"offset", "start_time", "score"}
+        """
+        scores = self.correlate(query)
+        return self.top_candidates(scores, top_k, min_separation or max(1, len(query) // 2))
+
+    def top_candidates(self, scores: np.ndarray, top_k: int, min_separation: int,
+                       offsets: Optional[np.ndarray] = None) -> List[Dict[str, Any]]:
+        """
+        Skorlardan komşuluk bastırmalı (NMS) en iyi k adayı seç
+
+        offsets verilmezse scores tüm ofsetleri kapsar; verilirse scores[i]
+        offsets[i] ofsetinin skorudur (seyrek aday kümesi).
+        """
+        if offsets is None:
+            scores = scores.copy()
+            selected = []
+            for _ in range(top_k):
+                offset = int(np.argmax(scores))
+                if not np.isfinite(scores[offset]):
+                    break
+                selected.append((offset, float(scores[offset])))
+                scores[max(0, offset - min_separation + 1):offset + min_separation] = -np.inf
+        else:
+            selected = []
+            for i in np.argsort(-scores, kind='stable'):
+                if len(selected) == top_k or not np.isfinite(scores[i]):
+                    break
+                if all(abs(int(offsets[i]) - offset) >= min_separation for offset, _ in selected):
+                    selected.append((int(offsets[i]), float(scores[i])))
+
+        return [{
+            "offset": offset,
+            "start_time": self.start_time + offset / self.sample_rate,
+            "score": score
+        } for offset, score in selected]
+
+
+def main():
+    """Sonuç dosyasındaki ENF eğrisini bir referans seriye karşı eşleştir"""
+    import argparse
+    import time
+    from datetime import datetime, timezone
+
+    from utils.enf_format import load_enf_results
+
+    parser = argparse.ArgumentParser(description="ENF referans eşleştirme")
+    parser.add_argument("results", help="ENF sonuç dosyası (.json veya .enfb)")
+    parser.add_argument("reference", help="Referans ENF serisi (.npy, float)")
+    parser.add_argument("--rate", type=float, default=1.0, help="Referans örnekleme oranı (Hz)")
+    parser.add_argument("--start-time", type=float, default=0.0, help="Referans başlangıcı (Unix epoch, s)")
+    parser.add_argument("--top-k", type=int, default=5, help="Aday sayısı")
+    args = parser.parse_args()
+
+    query = np.asarray(load_enf_results(args.results)["enf_data"]["frequencies"], dtype=np.float64)
+    reference = np.load(args.reference, mmap_mode='r')
+
+    start = time.perf_counter()
+    matcher = ENFMatcher(reference, args.rate, args.start_time)
+    candidates = matcher.match(query, args.top_k)
+    elapsed = time.perf_counter() - start
+
+    print(f"🔍 {len(query)} noktalık sorgu, {len(reference)} noktalık referans ({elapsed:.2f} s)")
+    for rank, candidate in enumerate(candidates, 1):
+        when = datetime.fromtimestamp(candidate["start_time"], tz=timezone.utc).isoformat()
+        print(f"   {rank}. {when}  skor: {candidate['score']:.4f}  (ofset {candidate['offset']})")
+
+
+if __name__ == "__main__":
+    main()
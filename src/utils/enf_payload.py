@@ -0,0 +1,290 @@
+"""
+Gömülü ENF Yükü (Payload) Formatı - Sıkıştırılmış, sürümlü ikili kodlama
+
+İkili düzen (little-endian):
+    4 byte   : sihirli değer b"ENFP"
+    1 byte   : sürüm
+    1 byte   : sıkıştırma (0: yok, 1: zlib, 2: zstd)
+    2 byte   : ayrılmış
+    4 byte   : özet başlık uzunluğu (uint32)
+    N byte   : sıkıştırılmamış UTF-8 JSON özet (sayı, istatistikler, diğer alanlar, düzen)
+    gövde    : sıkıştırılmış diziler
+        - frekanslar: int32 ilk değer (mHz) + int16/int32 ardışık farklar (mHz)
+        - eksik değer bit maskesi (varsa, np.packbits)
+        - güven: uint8 (0-255 -> 0-1, varsa)
+        - zaman damgaları: float64 dizi veya JSON metin listesi (düzenli değilse)
+
+Yalnızca metin taşıyabilen alanlar (ID3 TXXX, Vorbis yorumu, EXIF
+UserComment, PNG tEXt) için "enfp1:" + base64 biçimi kullanılır. Eski
+sürümlerin düz JSON metni decode_enf_payload ile aynen okunmaya devam eder.
+"""
+
+import base64
+import json
+import struct
+import zlib
+from typing import Any, Dict, Optional, Union
+
+import numpy as np
+
+MAGIC = b"ENFP"
+PAYLOAD_VERSION = 1
+TEXT_PREFIX = "enfp1:"
+
+CODECS = {"none": 0, "zlib": 1, "zstd": 2}
+ARRAY_FIELDS = ("frequencies", "timestamps", "confidence")
+
+# Frekans kuantizasyonu: 1 mHz
+FREQUENCY_SCALE = 1000
+
+
+def _compress(data: bytes, codec: str) -> bytes:
+    if codec == "zlib":
+        return zlib.compress(data)
+    if codec == "zstd":
+        try:
+            import zstandard
+        except ImportError:
+            raise ValueError("zstd sıkıştırması için 'zstandard' paketi gerekli")
+        return zstandard.ZstdCompressor(level=10).compress(data)
+    return data
+
+
+def _decompress(data: bytes, codec_id: int) -> bytes:
+    if codec_id == CODECS["zlib"]:
+        return zlib.decompress(data)
+    if codec_id == CODECS["zstd"]:
+        try:
+            import zstandard
+        except ImportError:
+            raise ValueError("zstd ile sıkıştırılmış ENF verisi için 'zstandard' paketi gerekli")
+        return zstandard.ZstdDecompressor().decompress(data)
+    if codec_id == CODECS["none"]:
+        return data
+    raise ValueError(f"Bilinmeyen sıkıştırma kodu: {codec_id}")
+
+
+def _summary_statistics(frequencies: np.ndarray, confidence: Optional[np.ndarray]) -> Dict[str, Any]:
+    valid = frequencies[np.isfinite(frequencies)]
+    statistics = {"count": int(len(frequencies)), "valid_count": int(len(valid))}
+    if len(valid):
+        statistics.update({
+            "mean_frequency": round(float(np.mean(valid)), 6),
+            "std_frequency": round(float(np.std(valid)), 6),
+            "min_frequency": round(float(np.min(valid)), 6),
+            "max_frequency": round(float(np.max(valid)), 6),
+        })
+    if confidence is not None and len(confidence):
+        statistics["mean_confidence"] = round(float(np.nanmean(confidence)), 6)
+    return statistics
+
+
+def encode_enf_payload(enf_data: Dict[str, Any], codec: str = "zlib") -> bytes:
+    """
+    ENF verisini sürümlü ikili yüke kodla
+
+    enf_data["enf_data"] altındaki frequencies / confidence / timestamps
+    dizileri sıkıştırılır; diğer tüm alanlar özet başlıkta JSON olarak
+    saklanır. Frekanslar 1 mHz'e, güven skorları 1/255'e yuvarlanır.
+    Uzunluğu frekanslarla uyuşmayan confidence / timestamps dizileri
+    hata vermek yerine özet başlıkta olduğu gibi (JSON) saklanır.
+
+    Args:
+        enf_data: {"enf_data": {"frequencies": [...], ...}, ...} sözlüğü
+        codec: 'zlib', 'zstd' (zstandard paketi gerekir) veya 'none'
+
+    Returns:
+        bytes: İkili yük
+    """
+    if codec not in CODECS:
+        raise ValueError(f"Bilinmeyen sıkıştırma: {codec}")
+
+    extra = {key: value for key, value in enf_data.items() if key != "enf_data"}
+    source = enf_data.get("enf_data", {})
+    fields = {key: value for key, value in source.items() if key not in ARRAY_FIELDS}
+
+    frequencies = np.asarray(source.get("frequencies", []), dtype=np.float64)
+    confidence = source.get("confidence")
+    timestamps = source.get("timestamps")
+
+    n = len(frequencies)
+    # Uzunluğu frekanslarla uyuşmayan dizi sıkıştırılmaz, başlıkta olduğu gibi saklanır
+    if confidence is not None and len(confidence) != n:
+        fields["confidence"] = np.asarray(confidence).tolist()
+        confidence = None
+    if timestamps is not None and len(timestamps) != n:
+        fields["timestamps"] = np.asarray(timestamps).tolist()
+        timestamps = None
+    confidence = None if confidence is None else np.asarray(confidence, dtype=np.float64)
+
+    layout = {}
+    body = []
+
+    if n:
+        missing = ~np.isfinite(frequencies)
+        quantized = np.rint(np.where(missing, 0.0, frequencies) * FREQUENCY_SCALE).astype(np.int64)
+        if missing.all():
+            quantized[:] = 0
+        elif missing[0]:
+            quantized[0] = quantized[np.argmin(missing)]
+        if missing.any():
+            # Eksik değerler farkı sıfır olacak şekilde bir öncekiyle doldurulur
+            index = np.where(missing, 0, np.arange(n))
+            np.maximum.accumulate(index, out=index)
+            quantized = quantized[index]
+
+        deltas = np.diff(quantized)
+        delta_dtype = "<i2" if not len(deltas) or np.abs(deltas).max() <= 32767 else "<i4"
+        layout["delta_dtype"] = delta_dtype
+        body.append(struct.pack("<i", int(quantized[0])))
+        body.append(deltas.astype(delta_dtype).tobytes())
+
+        if missing.any():
+            layout["missing"] = True
+            body.append(np.packbits(missing).tobytes())
+
+    if confidence is not None:
+        layout["confidence"] = True
+        body.append(np.rint(np.clip(np.nan_to_num(confidence), 0.0, 1.0) * 255).astype(np.uint8).tobytes())
+
+    if timestamps is not None:
+        if n and np.asarray(timestamps).dtype.kind in "iuf":
+            times = np.asarray(timestamps, dtype=np.float64)
+            step = float(times[1] - times[0]) if n > 1 else 0.0
+            if np.array_equal(times[0] + step * np.arange(n), times):
+                layout["timestamps"] = {"start": float(times[0]), "step": step}
+            else:
+                layout["timestamps"] = "float64"
+                body.append(times.astype("<f8").tobytes())
+        else:
+            layout["timestamps"] = "json"
+            body.append(json.dumps(list(timestamps), separators=(',', ':')).encode("utf-8"))
+
+    summary = {
+        "statistics": _summary_statistics(frequencies, confidence),
+        "fields": fields,
+        "layout": layout,
+    }
+    if extra:
+        summary["extra"] = extra
+
+    header = json.dumps(summary, separators=(',', ':'), ensure_ascii=False).encode("utf-8")
+    return (MAGIC + struct.pack("<BBHI", PAYLOAD_VERSION, CODECS[codec], 0, len(header))
+            + header + _compress(b"".join(body), codec))
+
+
+def encode_enf_text(enf_data: Dict[str, Any], codec: str = "zlib") -> str:
+    """Metin alanları için "enfp1:" + base64 biçiminde kodla"""
+    return TEXT_PREFIX + base64.b64encode(encode_enf_payload(enf_data, codec)).decode("ascii")
+
+
+def _to_binary(payload: Union[str, bytes]) -> Optional[bytes]:
+    """Yükü ikili forma çevir; eski JSON biçimiyse None döndür"""
+    if isinstance(payload, str):
+        if payload.startswith(TEXT_PREFIX):
+            return base64.b64decode(payload[len(TEXT_PREFIX):])
+        return None
+    if payload.startswith(MAGIC):
+        return bytes(payload)
+    if payload.startswith(TEXT_PREFIX.encode("ascii")):
+        return base64.b64decode(payload[len(TEXT_PREFIX):])
+    return None
+
+
+def _text_header(payload: str) -> bytes:
+    """base64 metnin yalnızca özet başlığı kapsayan başını çöz"""
+    encoded = payload[len(TEXT_PREFIX):]
+    fixed = base64.b64decode(encoded[:16])
+    header_len = struct.unpack_from("<I", fixed, 8)[0]
+    needed = -(-(12 + header_len) // 3) * 4
+    return base64.b64decode(encoded[:needed])
+
+
+def _parse_header(binary: bytes):
+    version, codec_id, _, header_len = struct.unpack_from("<BBHI", binary, 4)
+    if version > PAYLOAD_VERSION:
+        raise ValueError(f"Desteklenmeyen ENF yük sürümü: {version}")
+    summary = json.loads(binary[12:12 + header_len].decode("utf-8"))
+    return codec_id, summary, 12 + header_len
+
+
+def read_enf_summary(payload: Union[str, bytes]) -> Dict[str, Any]:
+    """
+    Eğriyi çözmeden özet başlığı oku (istatistikler ve diğer alanlar)
+
+    Eski JSON biçiminde özet, tam veriden hesaplanır.
+    """
+    if isinstance(payload, bytes) and payload.startswith(TEXT_PREFIX.encode("ascii")):
+        payload = payload.decode("ascii")
+    if isinstance(payload, str) and payload.startswith(TEXT_PREFIX):
+        binary = _text_header(payload)
+    else:
+        binary = _to_binary(payload)
+
+    if binary is None:
+        enf_data = json.loads(payload)
+        source = enf_data.get("enf_data", {})
+        confidence = source.get("confidence")
+        return {
+            "statistics": _summary_statistics(
+                np.asarray(source.get("frequencies", []), dtype=np.float64),
+                None if confidence is None else np.asarray(confidence, dtype=np.float64)),
+            "fields": {key: value for key, value in source.items() if key not in ARRAY_FIELDS},
+        }
+
+    _, summary, _ = _parse_header(binary)
+    summary.pop("layout", None)
+    return summary
+
+
+def decode_enf_payload(payload: Union[str, bytes]) -> Dict[str, Any]:
+    """
+    Gömülü ENF verisini çöz (ikili, "enfp1:" base64 veya eski düz JSON)
+
+    Returns:
+        Dict: {"enf_data": {...}, ...} sözlüğü
+    """
+    binary = _to_binary(payload)
+    if binary is None:
+        return json.loads(payload)
+
+    codec_id, summary, body_start = _parse_header(binary)
+    layout = summary["layout"]
+    n = summary["statistics"]["count"]
+    body = memoryview(_decompress(binary[body_start:], codec_id))
+
+    enf_data = {}
+    position = 0
+    if n:
+        first = struct.unpack_from("<i", body, 0)[0]
+        delta_dtype = np.dtype(layout["delta_dtype"])
+        position = 4 + (n - 1) * delta_dtype.itemsize
+        deltas = np.frombuffer(body[4:position], dtype=delta_dtype)
+        quantized = np.concatenate([[first], first + np.cumsum(deltas, dtype=np.int64)])
+        frequencies = quantized / FREQUENCY_SCALE
+
+        if layout.get("missing"):
+            mask_bytes = (n + 7) // 8
+            missing = np.unpackbits(np.frombuffer(body[position:position + mask_bytes], dtype=np.uint8),
+                                    count=n).astype(bool)
+            frequencies[missing] = np.nan
+            position += mask_bytes
+        enf_data["frequencies"] = frequencies.tolist()
+    else:
+        enf_data["frequencies"] = []
+
+    if layout.get("confidence"):
+        quantized = np.frombuffer(body[position:position + n], dtype=np.uint8)
+        enf_data["confidence"] = np.round(quantized / 255.0, 3).tolist()
+        position += n
+
+    timestamps = layout.get("timestamps")
+    if isinstance(timestamps, dict):
+        enf_data["timestamps"] = (timestamps["start"] + timestamps["step"] * np.arange(n)).tolist()
+    elif timestamps == "float64":
+        enf_data["timestamps"] = np.frombuffer(body[position:position + 8 * n], dtype="<f8").tolist()
+    elif timestamps == "json":
+        enf_data["timestamps"] = json.loads(bytes(body[position:]).decode("utf-8"))
+
+    enf_data.update(summary.get("fields", {}))
+    return dict(summary.get("extra", {}), enf_data=enf_data)
@@ -0,0 +1,259 @@
+"""
+Klasör İzleme - Ağacı baştan taramadan yeni dosyaları bulma
+
+- DirectoryPoller: her turda yalnızca dizinlerin stat'ı alınır; mtime'ı
+  değişen (içine dosya eklenen / taşınan / silinen) dizinler yeniden listelenir.
+  Maliyet dosya sayısıyla değil dizin sayısıyla orantılıdır.
+- InotifyWatcher (Linux): çekirdek olaylarıyla yalnızca değişen dizinler
+  listelenir; ek bağımlılık yoktur (ctypes ile libc). Olay kuyruğu taşarsa
+  veya izleme sınırına ulaşılırsa tüm dizinler yeniden taranır.
+
+İki izleyici de yalnızca yeni görülen dosya yollarını döndürür; dosyanın
+yazımının bitip bitmediği (boyut kararlılığı) çağıranın işidir.
+"""
+
+import ctypes
+import ctypes.util
+import errno
+import os
+import select
+import struct
+import sys
+import time
+from typing import Dict, Iterable, List, Optional, Set
+
+from utils.integrity import RACY_WINDOW_NS
+
+# Yükleme araçlarının geçici dosyaları (tamamlanınca asıl ada taşınır)
+IGNORED_SUFFIXES = (".part", ".partial", ".tmp", ".crdownload", ".download")
+
+# <sys/inotify.h>
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_DELETE_SELF = 0x00000400
+IN_MOVE_SELF = 0x00000800
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ONLYDIR = 0x01000000
+WATCH_MASK = (IN_CREATE | IN_MOVED_TO | IN_MOVED_FROM | IN_DELETE
+              | IN_DELETE_SELF | IN_MOVE_SELF | IN_ONLYDIR)
+EVENT_HEADER = struct.Struct("iIII")  # wd, mask, cookie, len
+
+
+def _is_candidate(name: str, extensions: Optional[Set[str]]) -> bool:
+    if name.startswith(".") or name.lower().endswith(IGNORED_SUFFIXES):
+        return False
+    return extensions is None or os.path.splitext(name)[1].lower() in extensions
+
+
+class DirectoryPoller:
+    """Dizin mtime'larıyla artımlı yoklama yapan izleyici"""
+
+    def __init__(self, root, extensions: Optional[Iterable[str]] = None):
+        """
+        Args:
+            root: İzlenecek kök dizin (ör. data/raw)
+            extensions: Yalnızca bu uzantılar (ör. {'.wav'}); None ise tüm dosyalar
+        """
+        self.root = os.path.abspath(root)
+        self.extensions = {e.lower() for e in extensions} if extensions is not None else None
+        self._dirs: Dict[str, Optional[int]] = {}  # dizin -> mtime_ns (None: bir sonraki turda yeniden listele)
+        self._files: Dict[str, Set[str]] = {}      # dizin -> bilinen dosya adları
+        self._subdirs: Dict[str, Set[str]] = {}    # dizin -> bilinen alt dizinler
+        self.directories_listed = 0
+
+    def close(self):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def wait(self, timeout: float):
+        """Bir sonraki yoklamaya kadar bekle"""
+        time.sleep(timeout)
+
+    def poll(self) -> List[str]:
+        """
+        Son yoklamadan beri eklenen dosyaların yolları
+
+        İlk çağrı tüm ağacı listeler (mevcut dosyalar da "yeni" döner);
+        sonrakiler yalnızca mtime'ı değişen dizinleri listeler.
+        """
+        if not self._dirs:
+            return self._scan_dir(self.root)
+
+        new_files = []
+        for directory, mtime_ns in list(self._dirs.items()):
+            if directory not in self._dirs:
+                continue  # bu turda silinen bir üst dizinle birlikte unutuldu
+            try:
+                current = os.stat(directory).st_mtime_ns
+            except OSError:
+                self._forget(directory)
+                continue
+            if current != mtime_ns:
+                new_files.extend(self._scan_dir(directory))
+        return new_files
+
+    def _on_new_directory(self, directory: str) -> bool:
+        """Dizin ilk kez görüldüğünde (listelemeden önce) çağrılır"""
+        return True
+
+    def _scan_dir(self, directory: str) -> List[str]:
+        """Dizini listele; yeni dosyaları döndür, yeni alt dizinleri de tara"""
+        if directory not in self._dirs and not self._on_new_directory(directory):
+            return []
+        try:
+            # stat listelemeden önce alınır: listeleme sırasında gelen dosya mtime'ı yine değiştirir
+            mtime_ns = os.stat(directory).st_mtime_ns
+            with os.scandir(directory) as entries:
+                names, subdirs = set(), []
+                for entry in entries:
+                    try:
+                        if entry.is_dir(follow_symlinks=False):
+                            subdirs.append(entry.path)
+                        elif entry.is_file() and _is_candidate(entry.name, self.extensions):
+                            names.add(entry.name)
+                    except OSError:
+                        continue
+        except OSError:
+            self._forget(directory)
+            return []
+        self.directories_listed += 1
+
+        # mtime çözünürlüğü kaba olabilir: yakın zamanda değişen dizin bir sonraki turda da listelenir
+        racy = time.time_ns() - mtime_ns < RACY_WINDOW_NS
+        self._dirs[directory] = None if racy else mtime_ns
+
+        known = self._files.get(directory, set())
+        self._files[directory] = names
+        new_files = [os.path.join(directory, name) for name in sorted(names - known)]
+
+        # Taşınan / silinen alt dizinler unutulur, yeniler taranır
+        for gone in self._subdirs.get(directory, set()).difference(subdirs):
+            self._forget(gone)
+        self._subdirs[directory] = set(subdirs)
+        for subdir in sorted(subdirs):
+            if subdir not in self._dirs:
+                new_files.extend(self._scan_dir(subdir))
+        return new_files
+
+    def _forget(self, directory: str):
+        """Silinen dizini ve alt ağacını unut"""
+        prefix = directory + os.sep
+        for known in [d for d in self._dirs if d == directory or d.startswith(prefix)]:
+            del self._dirs[known]
+            self._files.pop(known, None)
+            self._subdirs.pop(known, None)
+
+
+class _InotifyUnavailable(OSError):
+    pass
+
+
+def _load_libc():
+    if not sys.platform.startswith("linux"):
+        raise _InotifyUnavailable("inotify yalnızca Linux'ta var")
+    libc = ctypes.CDLL(ctypes.util.find_library("c") or None, use_errno=True)
+    if not hasattr(libc, "inotify_init1"):
+        raise _InotifyUnavailable("libc inotify_init1 içermiyor")
+    libc.inotify_add_watch.argtypes = (ctypes.c_int, ctypes.c_char_p, ctypes.c_uint32)
+    return libc
+
+
+class InotifyWatcher(DirectoryPoller):
+    """inotify olaylarıyla yalnızca değişen dizinleri listeleyen izleyici"""
+
+    def __init__(self, root, extensions: Optional[Iterable[str]] = None):
+        super().__init__(root, extensions)
+        self._libc = _load_libc()
+        self._fd = self._libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self._fd < 0:
+            error = ctypes.get_errno()
+            raise _InotifyUnavailable(error, os.strerror(error))
+        self._watches: Dict[int, str] = {}
+        self._dirty: Set[str] = set()
+        # İzleme sınırı (fs.inotify.max_user_watches) aşılırsa mtime yoklamasına düşülür
+        self.polling_fallback = False
+
+    def close(self):
+        if self._fd is not None:
+            os.close(self._fd)
+            self._fd = None
+
+    def wait(self, timeout: float):
+        """Olay gelene veya süre dolana kadar bekle"""
+        select.select([self._fd], [], [], timeout)
+
+    def _on_new_directory(self, directory: str) -> bool:
+        if self.polling_fallback:
+            return True
+        wd = self._libc.inotify_add_watch(self._fd, os.fsencode(directory), WATCH_MASK)
+        if wd < 0:
+            if ctypes.get_errno() in (errno.ENOENT, errno.ENOTDIR):
+                return False  # dizin bu arada silinmiş
+            self.polling_fallback = True
+            return True
+        self._watches[wd] = directory
+        return True
+
+    def _read_events(self):
+        """Bekleyen olayları oku; değişen dizinleri kirli olarak işaretle"""
+        while True:
+            try:
+                data = os.read(self._fd, 64 * 1024)
+            except BlockingIOError:
+                return
+            offset = 0
+            while offset < len(data):
+                wd, mask, _, length = EVENT_HEADER.unpack_from(data, offset)
+                offset += EVENT_HEADER.size + length
+                if mask & IN_Q_OVERFLOW:
+                    self._dirty.update(self._dirs)
+                    continue
+                directory = self._watches.get(wd)
+                if directory is None:
+                    continue
+                if mask & IN_IGNORED:
+                    del self._watches[wd]
+                    if directory in self._dirs:
+                        self._dirty.add(directory)
+                else:
+                    self._dirty.add(directory)
+
+    def poll(self) -> List[str]:
+        if not self._dirs or self.polling_fallback:
+            return super().poll()
+
+        self._read_events()
+        dirty, self._dirty = self._dirty, set()
+        new_files = []
+        for directory in sorted(dirty):
+            if directory in self._dirs:
+                new_files.extend(self._scan_dir(directory))
+        return new_files
+
+
+def create_watcher(root, extensions: Optional[Iterable[str]] = None,
+                   use_inotify: Optional[bool] = None) -> DirectoryPoller:
+    """
+    Uygun izleyiciyi oluştur
+
+    Args:
+        root: İzlenecek kök dizin
+        extensions: Uzantı filtresi
+        use_inotify: True: inotify zorunlu, False: yoklama, None: varsa inotify
+    """
+    if use_inotify is False:
+        return DirectoryPoller(root, extensions)
+    try:
+        return InotifyWatcher(root, extensions)
+    except OSError:
+        if use_inotify:
+            raise
+        return DirectoryPoller(root, extensions)
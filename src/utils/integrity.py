@@ -0,0 +1,201 @@
+"""
+Artımlı Bütünlük Doğrulama - Stat önbelleği ve katalog Merkle ağacı
+
+- IntegrityCache: dosya başına (boyut, mtime_ns, inode, sha256, son doğrulama)
+  tutar; stat bilgisi değişmemiş dosyalar yeniden okunmadan atlanabilir.
+- MerkleTree: katalogdaki (yol, hash) çiftleri üzerinde ikili Merkle ağacı;
+  tek bir kök hash tüm veri setini temsil eder, iki ağaç arasındaki
+  değişen yapraklar O(k log n) karşılaştırmayla bulunur.
+"""
+
+import hashlib
+import json
+import math
+import os
+import time
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+from utils.atomic_io import atomic_write
+
+CACHE_VERSION = 1
+
+# RFC 6962 tarzı alan ayrımı: yaprak ve iç düğüm hash'leri karışmaz
+LEAF_PREFIX = b"\x00"
+NODE_PREFIX = b"\x01"
+
+# mtime çözünürlüğü: önbellek yazılırken değiştirilen ("racy") dosyalar
+# stat eşleşse bile yeniden hash'lenir
+RACY_WINDOW_NS = 2 * 1_000_000_000
+
+
+def leaf_hash(path: str, file_hash: Optional[str]) -> bytes:
+    """Katalog girdisinin yaprak hash'i (yol + dosya hash'i; eksik dosya için boş)"""
+    return hashlib.sha256(LEAF_PREFIX + path.encode("utf-8") + b"\x00"
+                          + (file_hash or "").encode("ascii")).digest()
+
+
+def _node_hash(left: bytes, right: bytes) -> bytes:
+    return hashlib.sha256(NODE_PREFIX + left + right).digest()
+
+
+class MerkleTree:
+    """Sıralı yapraklar üzerinde ikili Merkle ağacı (tek kalan düğüm bir üst seviyeye aynen çıkar)"""
+
+    def __init__(self, leaves: Sequence[bytes], paths: Optional[Sequence[str]] = None):
+        self.paths = list(paths) if paths is not None else None
+        self.levels: List[List[bytes]] = [list(leaves)]
+        while len(self.levels[-1]) > 1:
+            previous = self.levels[-1]
+            level = [_node_hash(previous[i], previous[i + 1]) for i in range(0, len(previous) - 1, 2)]
+            if len(previous) % 2:
+                level.append(previous[-1])
+            self.levels.append(level)
+
+    @classmethod
+    def from_hashes(cls, file_hashes: Dict[str, Optional[str]]) -> "MerkleTree":
+        """{göreli yol: sha256} sözlüğünden yol sırasına göre ağaç kur"""
+        paths = sorted(file_hashes)
+        return cls([leaf_hash(path, file_hashes[path]) for path in paths], paths)
+
+    @property
+    def root(self) -> str:
+        """Kök hash (hex); boş katalog için boş verinin SHA-256'sı"""
+        if not self.levels[0]:
+            return hashlib.sha256(b"").hexdigest()
+        return self.levels[-1][0].hex()
+
+    def __len__(self) -> int:
+        return len(self.levels[0])
+
+    def diff(self, other: "MerkleTree") -> Optional[List[int]]:
+        """
+        İki ağaç arasında farklı olan yaprak indeksleri
+
+        Eşit alt ağaçlara inilmez; k değişiklik için O(k log n) düğüm
+        karşılaştırılır. Yaprak sayıları farklıysa konumlar eşleşmediği
+        için None döner.
+        """
+        if len(self) != len(other):
+            return None
+        if not len(self):
+            return []
+
+        changed = []
+        stack = [(len(self.levels) - 1, 0)]
+        while stack:
+            level, index = stack.pop()
+            if self.levels[level][index] == other.levels[level][index]:
+                continue
+            if level == 0:
+                changed.append(index)
+                continue
+            for child in (2 * index + 1, 2 * index):
+                if child < len(self.levels[level - 1]):
+                    stack.append((level - 1, child))
+        return sorted(changed)
+
+    def proof(self, index: int) -> List[Tuple[str, str]]:
+        """
+        Tek bir yaprağın köke kanıt yolu (denetim yolu)
+
+        Returns:
+            [(kardeşin yönü 'left'/'right', kardeş hash hex), ...]
+        """
+        path = []
+        for level in self.levels[:-1]:
+            sibling = index ^ 1
+            if sibling < len(level):
+                path.append(("left" if sibling < index else "right", level[sibling].hex()))
+            index //= 2
+        return path
+
+    @staticmethod
+    def verify_proof(leaf: bytes, proof: Iterable[Tuple[str, str]], root: str) -> bool:
+        """proof() çıktısı ile yaprağın verilen köke ait olduğunu doğrula"""
+        node = leaf
+        for side, sibling in proof:
+            sibling = bytes.fromhex(sibling)
+            node = _node_hash(sibling, node) if side == "left" else _node_hash(node, sibling)
+        return node.hex() == root
+
+
+class IntegrityCache:
+    """Dosya başına stat imzası ve son doğrulanan hash önbelleği (JSON)"""
+
+    def __init__(self, cache_file):
+        self.cache_file = cache_file
+        self.entries: Dict[str, Dict] = {}
+        self.merkle_root: Optional[str] = None
+        self.written_at_ns = 0
+
+        if os.path.exists(cache_file):
+            with open(cache_file, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            if data.get("version") == CACHE_VERSION:
+                self.entries = data.get("entries", {})
+                self.merkle_root = data.get("merkle_root")
+                self.written_at_ns = data.get("written_at_ns", 0)
+
+    def is_clean(self, relative_path: str, stat: os.stat_result, expected_hash: Optional[str]) -> bool:
+        """
+        Dosya son doğrulamadan beri değişmemiş görünüyor mu?
+
+        Boyut, mtime_ns ve inode eşleşmeli, önbellekteki hash katalogdaki
+        hash ile aynı olmalı ve dosya önbellek yazılırken değiştirilmemiş
+        olmalıdır.
+        """
+        entry = self.entries.get(relative_path)
+        if entry is None or not expected_hash:
+            return False
+        return (entry["size"] == stat.st_size
+                and entry["mtime_ns"] == stat.st_mtime_ns
+                and entry["inode"] == stat.st_ino
+                and entry["sha256"] == expected_hash
+                and stat.st_mtime_ns < self.written_at_ns - RACY_WINDOW_NS)
+
+    def update(self, relative_path: str, stat: os.stat_result, sha256: Optional[str],
+               verified_at: Optional[float] = None):
+        """Dosyanın yeni stat imzasını ve okunan hash'ini kaydet"""
+        self.entries[relative_path] = {
+            "size": stat.st_size,
+            "mtime_ns": stat.st_mtime_ns,
+            "inode": stat.st_ino,
+            "sha256": sha256,
+            "verified_at": verified_at if verified_at is not None else time.time(),
+        }
+
+    def forget(self, relative_path: str):
+        """
+        Eksik ya da okunamayan dosyanın kaydını sil
+
+        Merkle kökü bu dosyalar için boş yaprakla hesaplandığından eski hash
+        önbellekte kalırsa sonraki çalıştırmanın önceki ağacı köke uymaz.
+        """
+        self.entries.pop(relative_path, None)
+
+    def oldest(self, relative_paths: Sequence[str], fraction: float) -> List[str]:
+        """
+        Yeniden okunacak örneklem: en uzun süredir okunmamış dosyaların fraction kadarı
+
+        Her çalıştırmada en eski doğrulananlar seçildiği için tüm arşiv
+        yaklaşık 1 / fraction çalıştırmada bir tamamen yeniden okunur.
+        """
+        if fraction <= 0 or not relative_paths:
+            return []
+        count = min(len(relative_paths), math.ceil(len(relative_paths) * fraction))
+        return sorted(relative_paths, key=lambda path: self.entries[path]["verified_at"])[:count]
+
+    def save(self, relative_paths: Iterable[str], merkle_root: str):
+        """Önbelleği (yalnızca verilen katalog yollarıyla) atomik olarak yaz"""
+        entries = {path: self.entries[path] for path in relative_paths if path in self.entries}
+        self.entries = entries
+        self.merkle_root = merkle_root
+        self.written_at_ns = time.time_ns()
+        data = {
+            "version": CACHE_VERSION,
+            "written_at_ns": self.written_at_ns,
+            "merkle_root": merkle_root,
+            "entries": entries,
+        }
+        with atomic_write(str(self.cache_file)) as f:
+            f.write(json.dumps(data, separators=(",", ":"), ensure_ascii=False).encode("utf-8"))
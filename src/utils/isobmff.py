@@ -0,0 +1,358 @@
+"""
+ISO-BMFF (MP4/MOV) Atom Düzenleyici - Medya verisini yeniden yazmadan ENF kutusu gömme
+"""
+
+import os
+import struct
+import uuid
+from typing import BinaryIO, List, NamedTuple, Optional, Tuple
+
+from utils.atomic_io import atomic_write, copy_range
+
+# moov/udta altındaki ENF kutusunun kullanıcı türü (uuid5, proje URL'si)
+ENF_UUID = uuid.UUID("3bdb6833-634e-52a4-a1f4-550c8cbe524e").bytes
+
+FREE_TYPES = (b"free", b"skip")
+
+# stco/co64 aramak için inilen kap kutular
+CHUNK_OFFSET_PATH = (b"moov", b"trak", b"mdia", b"minf", b"stbl")
+
+DEFAULT_RESERVE = 4096
+
+
+class Box(NamedTuple):
+    """Dosyadaki bir kutunun konumu"""
+    type: bytes
+    offset: int
+    size: int
+    header_size: int
+
+    @property
+    def end(self) -> int:
+        return self.offset + self.size
+
+
+def read_boxes(f: BinaryIO, start: int = 0, end: Optional[int] = None) -> List[Box]:
+    """
+    [start, end) aralığındaki kardeş kutuların başlıklarını oku (içerik okunmaz)
+
+    Args:
+        f: İkili modda açık dosya
+        start: İlk kutunun ofseti
+        end: Aralığın sonu (None: dosya sonu)
+    """
+    if end is None:
+        end = os.fstat(f.fileno()).st_size
+
+    boxes = []
+    offset = start
+    while offset + 8 <= end:
+        f.seek(offset)
+        size, box_type = struct.unpack(">I4s", f.read(8))
+        header_size = 8
+        if size == 1:
+            size = struct.unpack(">Q", f.read(8))[0]
+            header_size = 16
+        elif size == 0:
+            size = end - offset
+
+        if size < header_size or offset + size > end:
+            raise ValueError(f"Bozuk ISO-BMFF kutusu: {box_type!r} (ofset {offset}, boyut {size})")
+
+        boxes.append(Box(box_type, offset, size, header_size))
+        offset += size
+    return boxes
+
+
+def make_box(box_type: bytes, payload: bytes) -> bytes:
+    """Başlık + içerikten kutu oluştur (gerekirse 64 bit boyut)"""
+    size = len(payload) + 8
+    if size > 0xFFFFFFFF:
+        return struct.pack(">I4sQ", 1, box_type, size + 8) + payload
+    return struct.pack(">I4s", size, box_type) + payload
+
+
+def split_boxes(data: bytes) -> Tuple[List[Tuple[bytes, bytes]], bytes]:
+    """
+    Bellekteki kutu dizisini (tür, tam kutu baytları) listesine ayır
+
+    Returns:
+        boxes: (tür, başlık dahil kutu) listesi
+        trailer: Kutu oluşturmayan artık baytlar (ör. QuickTime udta 32 bit sıfır sonlandırıcısı)
+    """
+    boxes = []
+    offset = 0
+    while offset + 8 <= len(data):
+        size, box_type = struct.unpack_from(">I4s", data, offset)
+        if size == 1:
+            size = struct.unpack_from(">Q", data, offset + 8)[0]
+        elif size == 0:
+            size = len(data) - offset
+        if size < 8 or offset + size > len(data):
+            break
+        boxes.append((box_type, data[offset:offset + size]))
+        offset += size
+    return boxes, data[offset:]
+
+
+def _payload(box: bytes) -> bytes:
+    size = struct.unpack_from(">I", box)[0]
+    return box[16:] if size == 1 else box[8:]
+
+
+def build_enf_box(payload: bytes) -> bytes:
+    """ENF verisini taşıyan uuid kutusunu oluştur"""
+    return make_box(b"uuid", ENF_UUID + payload)
+
+
+def replace_udta_box(moov: bytes, new_box: Optional[bytes]) -> bytes:
+    """
+    moov içindeki udta'dan eski ENF kutusunu çıkarıp yenisini ekle
+
+    Args:
+        moov: Başlık dahil moov kutusu
+        new_box: Eklenecek kutu (None ise yalnızca eski ENF kutusu silinir)
+
+    Returns:
+        bytes: Yeni moov kutusu
+    """
+    children, trailer = split_boxes(_payload(moov))
+
+    udta_index = next((i for i, (box_type, _) in enumerate(children) if box_type == b"udta"), None)
+    if udta_index is None:
+        udta_children, udta_trailer = [], b""
+        children.append((b"udta", b""))
+        udta_index = len(children) - 1
+    else:
+        udta_children, udta_trailer = split_boxes(_payload(children[udta_index][1]))
+
+    udta_children = [(box_type, box) for box_type, box in udta_children
+                     if not (box_type == b"uuid" and _payload(box)[:16] == ENF_UUID)]
+    if new_box is not None:
+        udta_children.append((b"uuid", new_box))
+
+    udta = make_box(b"udta", b"".join(box for _, box in udta_children) + udta_trailer)
+    children[udta_index] = (b"udta", udta)
+    return make_box(b"moov", b"".join(box for _, box in children) + trailer)
+
+
+def shift_chunk_offsets(box: bytes, delta: int, threshold: int, depth: int = 0) -> bytes:
+    """
+    moov içindeki tüm stco/co64 girişlerinden threshold ve sonrasını gösterenlere delta ekle
+
+    Args:
+        box: Başlık dahil kutu (moov ile başlanır)
+        delta: Eklenecek bayt farkı
+        threshold: Bu ofset ve sonrasındaki parçalar kaydırılmıştır
+    """
+    box_type = box[4:8]
+    header = box[:16] if struct.unpack_from(">I", box)[0] == 1 else box[:8]
+    body = box[len(header):]
+
+    if box_type in (b"stco", b"co64"):
+        count = struct.unpack_from(">I", body, 4)[0]
+        fmt = ">%dI" % count if box_type == b"stco" else ">%dQ" % count
+        entries = struct.unpack_from(fmt, body, 8)
+        shifted = [offset + delta if offset >= threshold else offset for offset in entries]
+        if box_type == b"stco" and shifted and max(shifted) > 0xFFFFFFFF:
+            raise ValueError("stco ofsetleri 32 bit sınırını aşıyor (co64 dönüşümü desteklenmiyor)")
+        return header + body[:8] + struct.pack(fmt, *shifted) + body[8 + struct.calcsize(fmt):]
+
+    if depth < len(CHUNK_OFFSET_PATH) and box_type == CHUNK_OFFSET_PATH[depth]:
+        children, trailer = split_boxes(body)
+        body = b"".join(shift_chunk_offsets(child, delta, threshold, depth + 1)
+                        for _, child in children) + trailer
+        return header + body
+    return box
+
+
+def _write_free_header(f: BinaryIO, offset: int, size: int):
+    f.seek(offset)
+    f.write(struct.pack(">I4s", size, b"free"))
+
+
+def _sync(f: BinaryIO):
+    f.flush()
+    os.fsync(f.fileno())
+
+
+def _free_run(boxes: List[Box], start: int, step: int) -> Tuple[int, int]:
+    """start'tan itibaren step yönünde ardışık free/skip kutularının [ilk, son] indeksleri"""
+    index = start
+    while 0 <= index + step < len(boxes) and boxes[index + step].type in FREE_TYPES:
+        index += step
+    return min(start, index), max(start, index)
+
+
+def _place_box(f: BinaryIO, start: int, end: Optional[int], box: bytes):
+    """
+    Kutuyu [start, end) boş bölgesine (end None ise dosya sonuna) kesintiye dayanıklı yaz
+
+    Bölge önce tek bir free kutusu yapılır (dosya sonunda boyut 0: "sona
+    kadar"), içerik bu kutunun içine yazılıp fsync edilir ve kutu başlığı en
+    son yazılır; yarıda kalan her adımda dosya ayrıştırılabilir kalır.
+    """
+    _write_free_header(f, start, 0 if end is None else end - start)
+    _sync(f)
+    f.seek(start + 8)
+    f.write(box[8:])
+    if end is not None and end - start > len(box):
+        _write_free_header(f, start + len(box), end - start - len(box))
+    _sync(f)
+    f.seek(start)
+    f.write(box[:8])
+
+
+def _fits(region_size: int, box_size: int) -> bool:
+    spare = region_size - box_size
+    return region_size <= 0xFFFFFFFF and (spare == 0 or spare >= 8)
+
+
+def embed_enf_box(path: str, payload: bytes, keep_faststart: bool = False,
+                  reserve: int = DEFAULT_RESERVE) -> str:
+    """
+    MP4/MOV dosyasının moov/udta kutusuna ENF uuid kutusunu yerinde yaz
+
+    Medya verisi (mdat) hiçbir durumda taşınmaz ve geçerli moov hiçbir
+    zaman üzerine yazılmaz: yeni moov önce boş bir alana yazılıp fsync
+    edilir, ancak ondan sonra eski moov free kutusuna çevrilir. Kesinti
+    anında dosya eski veya yeni moov ile okunabilir kalır.
+      - moov'un hemen önündeki / arkasındaki free/skip alanına sığıyorsa
+        oraya yazılır ('free'),
+      - sığmıyor ve moov dosyanın sonundaysa dosya sonuna eklenir ('end'),
+      - sığmıyorsa dosya sonuna eklenir ('relocated').
+    Dosya sonunda kalan free kutuları kesilir.
+    keep_faststart=True ise son durumda moov başta tutulur: dosya geçici
+    kopyaya yeniden yazılır ve stco/co64 ofsetleri kaydırılır ('rewritten').
+
+    Args:
+        path: MP4/MOV dosyası
+        payload: Gömülecek veri (ör. ENF JSON baytları)
+        keep_faststart: Akış için moov'u mdat'tan önce tut (tam kopya gerekebilir)
+        reserve: Yeniden yazımda moov arkasına bırakılan free alanı (bayt)
+
+    Returns:
+        str: Kullanılan yöntem ('end', 'free', 'relocated' veya 'rewritten')
+    """
+    with open(path, "r+b") as f:
+        boxes = read_boxes(f)
+        file_size = boxes[-1].end if boxes else 0
+        index = next((i for i, box in enumerate(boxes) if box.type == b"moov"), None)
+        if index is None:
+            raise ValueError(f"moov kutusu bulunamadı: {path}")
+
+        moov = boxes[index]
+        f.seek(moov.offset)
+        new_moov = replace_udta_box(f.read(moov.size), build_enf_box(payload))
+
+        # moov'un önündeki ve arkasındaki boş alanlar (öncelik önde: faststart korunur)
+        first, _ = _free_run(boxes, index, -1)
+        _, last = _free_run(boxes, index, 1)
+        regions = [(boxes[first].offset, moov.offset), (moov.end, boxes[last].end)]
+        target = next((region for region in regions if region[1] > region[0]
+                       and _fits(region[1] - region[0], len(new_moov))), None)
+        fragmented = any(box.type == b"moof" for box in boxes)
+
+        if target is not None:
+            method = "free"
+            _place_box(f, target[0], target[1], new_moov)
+        elif last == len(boxes) - 1:
+            method = "end"
+            _place_box(f, file_size, None, new_moov)
+        elif keep_faststart or fragmented:
+            # Parçalı MP4'te moov, moof kutularından önce kalmak zorunda
+            method = "rewritten"
+        else:
+            method = "relocated"
+            tail = boxes[-1]
+            if tail.header_size == 8:
+                # Boyutu 0 ("dosya sonuna kadar") olan son kutu açıkça sınırlandırılır
+                f.seek(tail.offset)
+                if struct.unpack(">I", f.read(4))[0] == 0:
+                    if tail.size > 0xFFFFFFFF:
+                        raise ValueError("Boyutsuz son kutu 4 GB'tan büyük; moov taşınamaz")
+                    f.seek(tail.offset)
+                    f.write(struct.pack(">I", tail.size))
+            _place_box(f, file_size, None, new_moov)
+
+        if method != "rewritten":
+            # Yeni moov kalıcı olduktan sonra eski moov serbest bırakılır
+            _sync(f)
+            _write_free_header(f, moov.offset, moov.size)
+            _sync(f)
+
+            # Dosya sonundaki free kutuları gereksizdir
+            boxes = read_boxes(f)
+            if boxes[-1].type in FREE_TYPES:
+                trailing, _ = _free_run(boxes, len(boxes) - 1, -1)
+                f.truncate(boxes[trailing].offset)
+                _sync(f)
+
+    if method == "rewritten":
+        rewrite_with_enf_box(path, path, payload, reserve)
+    return method
+
+
+def rewrite_with_enf_box(src_path: str, dst_path: str, payload: bytes,
+                         reserve: int = DEFAULT_RESERVE):
+    """
+    Kutu sırasını koruyarak ENF kutulu kopyayı yaz (atomik, stco/co64 düzeltmeli)
+
+    moov arkasındaki free/skip kutuları tek bir reserve baytlık free kutusuyla
+    değiştirilir, böylece sonraki güncellemeler embed_enf_box ile yerinde
+    yapılabilir. moov'dan sonra gelen medya verisi kayan miktar kadar
+    parça ofsetleri düzeltilir.
+    """
+    with open(src_path, "rb") as src:
+        boxes = read_boxes(src)
+        index = next((i for i, box in enumerate(boxes) if box.type == b"moov"), None)
+        if index is None:
+            raise ValueError(f"moov kutusu bulunamadı: {src_path}")
+
+        moov = boxes[index]
+        src.seek(moov.offset)
+        new_moov = replace_udta_box(src.read(moov.size), build_enf_box(payload))
+
+        following = index + 1
+        old_span = moov.size
+        while following < len(boxes) and boxes[following].type in FREE_TYPES:
+            old_span += boxes[following].size
+            following += 1
+
+        free_box = make_box(b"free", bytes(reserve)) if reserve >= 8 and following < len(boxes) else b""
+        delta = len(new_moov) + len(free_box) - old_span
+        if delta and following < len(boxes):
+            if any(box.type == b"moof" for box in boxes[following:]):
+                raise ValueError("Parçalı MP4'te moov boyutu değiştirilemez (moof ofsetleri mutlak olabilir)")
+            new_moov = shift_chunk_offsets(new_moov, delta, moov.offset + old_span)
+
+        with atomic_write(dst_path, mode_source=src_path) as dst:
+            copy_range(src, dst, 0, moov.offset)
+            dst.write(new_moov)
+            dst.write(free_box)
+            if following < len(boxes):
+                copy_range(src, dst, boxes[following].offset)
+
+
+def read_enf_box(path: str) -> Optional[bytes]:
+    """
+    moov/udta içindeki ENF uuid kutusunun içeriğini oku (yalnızca başlıklar gezilir)
+
+    Returns:
+        bytes: Gömülü veri veya None
+    """
+    with open(path, "rb") as f:
+        for box in read_boxes(f):
+            if box.type != b"moov":
+                continue
+            for child in read_boxes(f, box.offset + box.header_size, box.end):
+                if child.type != b"udta":
+                    continue
+                for item in read_boxes(f, child.offset + child.header_size, child.end):
+                    if item.type == b"uuid" and item.size >= item.header_size + 16:
+                        f.seek(item.offset + item.header_size)
+                        if f.read(16) == ENF_UUID:
+                            return f.read(item.size - item.header_size - 16)
+            return None
+    return None
+
@@ -0,0 +1,126 @@
+"""
+JPEG EXIF Segment Yazıcı - Piksel verisine dokunmadan APP1 (EXIF) değiştirme
+"""
+
+import struct
+from typing import BinaryIO, List, Optional, Tuple
+
+from utils.atomic_io import atomic_write, copy_range
+
+SOI = b"\xff\xd8"
+APP0 = 0xE0
+APP1 = 0xE1
+SOS = 0xDA
+EOI = 0xD9
+EXIF_HEADER = b"Exif\x00\x00"
+MAX_SEGMENT_PAYLOAD = 0xFFFF - 2
+
+# Uzunluk alanı olmayan bağımsız markerlar (TEM, RST0-7)
+STANDALONE_MARKERS = {0x01} | set(range(0xD0, 0xD8))
+
+
+def read_jpeg_header(f: BinaryIO) -> Tuple[List[Tuple[int, bytes]], int]:
+    """
+    SOS'a kadar olan marker segmentlerini oku (sıkıştırılmış görüntü verisi okunmaz)
+
+    Args:
+        f: Başında konumlanmış, ikili modda açık JPEG dosyası
+
+    Returns:
+        segments: (marker, payload) listesi, SOI hariç
+        data_offset: SOS markerının dosyadaki konumu (buradan sonrası aynen kopyalanır)
+    """
+    if f.read(2) != SOI:
+        raise ValueError("Geçerli bir JPEG dosyası değil (SOI yok)")
+
+    segments = []
+    while True:
+        offset = f.tell()
+        prefix = f.read(1)
+        if prefix != b"\xff":
+            raise ValueError(f"Bozuk JPEG marker dizisi (ofset {offset})")
+
+        # Markerdan önce gelebilen 0xFF doldurma baytları atlanır
+        marker = 0xFF
+        while marker == 0xFF:
+            byte = f.read(1)
+            if not byte:
+                raise ValueError("JPEG başlığı beklenmedik şekilde bitti")
+            marker = byte[0]
+
+        if marker == SOS:
+            return segments, f.tell() - 2
+        if marker == EOI:
+            raise ValueError("JPEG dosyasında görüntü verisi (SOS) yok")
+        if marker in STANDALONE_MARKERS:
+            segments.append((marker, b""))
+            continue
+
+        length_bytes = f.read(2)
+        if len(length_bytes) < 2:
+            raise ValueError("JPEG başlığı beklenmedik şekilde bitti")
+        length = struct.unpack(">H", length_bytes)[0]
+        payload = f.read(length - 2)
+        if len(payload) < length - 2:
+            raise ValueError("JPEG başlığı beklenmedik şekilde bitti")
+        segments.append((marker, payload))
+
+
+def find_exif(segments: List[Tuple[int, bytes]]) -> Optional[bytes]:
+    """Segmentler arasından EXIF APP1 verisini ("Exif\\0\\0" ile başlayan) bul"""
+    for marker, payload in segments:
+        if marker == APP1 and payload.startswith(EXIF_HEADER):
+            return payload
+    return None
+
+
+def write_jpeg_exif(src_path: str, dst_path: str, exif_bytes: bytes,
+                    header: Optional[Tuple[List[Tuple[int, bytes]], int]] = None) -> None:
+    """
+    JPEG'in EXIF segmentini değiştirip kalan bayt akışını aynen kopyala
+
+    Mevcut EXIF APP1 kendi yerinde değiştirilir; yoksa yeni segment JFIF
+    APP0 segmentlerinin hemen arkasına (yoksa SOI'nin arkasına) eklenir.
+    Diğer tüm segmentler ve SOS'tan itibaren görüntü verisi bayt bayt
+    korunur. Çıktı geçici dosyaya yazılıp atomik olarak yerine taşınır,
+    bu nedenle src_path ile dst_path aynı olabilir.
+
+    Args:
+        src_path: Kaynak JPEG
+        dst_path: Hedef JPEG
+        exif_bytes: "Exif\\0\\0" ile başlayan EXIF verisi (ör. piexif.dump çıktısı)
+        header: Önceden okunmuş read_jpeg_header sonucu (tekrar okumamak için)
+    """
+    if not exif_bytes.startswith(EXIF_HEADER):
+        raise ValueError("EXIF verisi 'Exif\\0\\0' başlığı ile başlamalı")
+    if len(exif_bytes) > MAX_SEGMENT_PAYLOAD:
+        raise ValueError(f"EXIF verisi tek APP1 segmentine sığmıyor "
+                         f"({len(exif_bytes)} > {MAX_SEGMENT_PAYLOAD} bayt)")
+
+    with open(src_path, "rb") as src:
+        segments, data_offset = header if header else read_jpeg_header(src)
+
+        position = None
+        output_segments = []
+        for marker, payload in segments:
+            if marker == APP1 and payload.startswith(EXIF_HEADER):
+                if position is None:
+                    position = len(output_segments)
+                continue
+            output_segments.append((marker, payload))
+
+        if position is None:
+            position = 0
+            while position < len(output_segments) and output_segments[position][0] == APP0:
+                position += 1
+        output_segments.insert(position, (APP1, exif_bytes))
+
+        with atomic_write(dst_path, mode_source=src_path) as dst:
+            dst.write(SOI)
+            for marker, payload in output_segments:
+                if marker in STANDALONE_MARKERS:
+                    dst.write(bytes((0xFF, marker)))
+                else:
+                    dst.write(bytes((0xFF, marker)) + struct.pack(">H", len(payload) + 2))
+                    dst.write(payload)
+            copy_range(src, dst, data_offset)
@@ -4,25 +4,45 @@ Metadata Gömme Modülü - ENF verilerini dosya metadata'sına gömme
 
 import json
 import os
+import shutil
 from typing import Dict, Any, Optional
 from datetime import datetime
-import mutagen
-from mutagen.mp3 import MP3
-from mutagen.id3 import ID3, TXXX
-from PIL import Image
-import piexif
-import cv2
-from pydub import AudioSegment
 import subprocess
 
+from utils.enf_payload import decode_enf_payload, encode_enf_payload, encode_enf_text
+from utils.isobmff import embed_enf_box, rewrite_with_enf_box
+from utils.jpeg_exif import find_exif, read_jpeg_header, write_jpeg_exif
+from utils.metadata_scanner import READERS as HEADER_READERS, read_enf_metadata
+from utils.riff import embed_riff_chunk
+
 class MetadataEmbedder:
     """ENF verilerini dosya metadata'sına gömme sınıfı"""
     
-    def __init__(self):
+    def __init__(self, payload_format: str = 'compact'):
+        """
+        Args:
+            payload_format: Gömülen veri biçimi: 'compact' (sürümlü, sıkıştırılmış
+                ikili yük; metin alanlarında base64) veya 'json' (eski düz JSON)
+        """
+        if payload_format not in ('compact', 'json'):
+            raise ValueError(f"Bilinmeyen yük biçimi: {payload_format}")
+        self.payload_format = payload_format
         self.supported_audio_formats = ['.wav', '.mp3', '.flac', '.m4a']
         self.supported_video_formats = ['.mp4', '.avi', '.mov', '.mkv']
         self.supported_image_formats = ['.jpg', '.jpeg', '.png', '.tiff']
     
+    def _encode_text(self, enf_data: Dict[str, Any]) -> str:
+        """Metin alanları (ID3, Vorbis, EXIF, PNG) için ENF yükü"""
+        if self.payload_format == 'json':
+            return json.dumps(enf_data, separators=(',', ':'))
+        return encode_enf_text(enf_data)
+    
+    def _encode_binary(self, enf_data: Dict[str, Any]) -> bytes:
+        """İkili alanlar (MP4 uuid kutusu, RIFF chunk'ı) için ENF yükü"""
+        if self.payload_format == 'json':
+            return json.dumps(enf_data, separators=(',', ':')).encode('utf-8')
+        return encode_enf_payload(enf_data)
+    
     def embed_to_audio(self, audio_file: str, enf_data: Dict[str, Any], 
                       output_file: Optional[str] = None) -> bool:
         """
@@ -41,7 +61,11 @@ class MetadataEmbedder:
             
             if file_ext == '.mp3':
                 return self._embed_to_mp3(audio_file, enf_data, output_file)
-            elif file_ext in ['.wav', '.flac', '.m4a']:
+            elif file_ext == '.wav':
+                return self._embed_to_wav(audio_file, enf_data, output_file)
+            elif file_ext == '.flac':
+                return self._embed_to_flac(audio_file, enf_data, output_file)
+            elif file_ext == '.m4a':
                 return self._embed_to_generic_audio(audio_file, enf_data, output_file)
             else:
                 print(f"Desteklenmeyen ses formatı: {file_ext}")
@@ -67,7 +91,7 @@ class MetadataEmbedder:
         try:
             file_ext = os.path.splitext(video_file)[1].lower()
             
-            if file_ext == '.mp4':
+            if file_ext in ['.mp4', '.mov']:
                 return self._embed_to_mp4(video_file, enf_data, output_file)
             else:
                 return self._embed_to_generic_video(video_file, enf_data, output_file)
@@ -108,6 +132,9 @@ class MetadataEmbedder:
                      output_file: Optional[str] = None) -> bool:
         """MP3 dosyasına ID3 tag ile gömme"""
         try:
+            from mutagen.mp3 import MP3
+            from mutagen.id3 import ID3, TXXX
+            
             # MP3 dosyasını yükle
             audio = MP3(audio_file)
             
@@ -115,8 +142,8 @@ class MetadataEmbedder:
             if audio.tags is None:
                 audio.tags = ID3()
             
-            # ENF verilerini JSON string olarak göm
-            enf_json = json.dumps(enf_data, separators=(',', ':'))
+            # ENF verilerini metin olarak göm
+            enf_json = self._encode_text(enf_data)
             
             # TXXX frame'leri ekle
             audio.tags.add(TXXX(desc="ENF_DATA", text=enf_json))
@@ -134,10 +161,70 @@ class MetadataEmbedder:
             print(f"MP3 gömme hatası: {e}")
             return False
     
+    def _embed_to_wav(self, audio_file: str, enf_data: Dict[str, Any],
+                     output_file: Optional[str] = None) -> bool:
+        """
+        WAV dosyasına özel RIFF chunk'ı ('enf ') ile gömme
+        
+        Ses verisi taşınmaz; chunk arkasında bırakılan JUNK alanı sayesinde
+        tekrar gömme dosya boyutundan bağımsız, sabit sürede yapılır.
+        """
+        try:
+            payload = self._encode_binary(enf_data)
+            
+            save_file = output_file if output_file else audio_file
+            if os.path.abspath(save_file) != os.path.abspath(audio_file):
+                shutil.copyfile(audio_file, save_file)
+            
+            method = embed_riff_chunk(save_file, payload)
+            
+            print(f"ENF verileri WAV dosyasına gömüldü ({method}): {save_file}")
+            return True
+            
+        except Exception as e:
+            print(f"WAV gömme hatası: {e}")
+            return False
+    
+    def _embed_to_flac(self, audio_file: str, enf_data: Dict[str, Any],
+                      output_file: Optional[str] = None) -> bool:
+        """
+        FLAC dosyasına VORBIS_COMMENT alanları ile gömme
+        
+        Mevcut PADDING bloğu yetiyorsa hiç küçültülmeden kullanılır (yalnızca
+        metadata blokları yeniden yazılır); yetmezse ses verisi bir kez
+        kaydırılır ve sonraki güncellemeler için ENF verisinin dörtte biri
+        kadar (en az 4 KB) PADDING bırakılır.
+        """
+        try:
+            from mutagen.flac import FLAC
+            
+            enf_json = self._encode_text(enf_data)
+            
+            save_file = output_file if output_file else audio_file
+            if os.path.abspath(save_file) != os.path.abspath(audio_file):
+                shutil.copyfile(audio_file, save_file)
+            
+            audio = FLAC(save_file)
+            audio['ENF_DATA'] = enf_json
+            audio['ENF_TIMESTAMP'] = datetime.now().isoformat()
+            audio['ENF_VERSION'] = "1.0.0"
+            
+            reserve = max(4096, len(enf_json) // 4)
+            audio.save(padding=lambda info: info.padding if info.padding >= 0 else reserve)
+            
+            print(f"ENF verileri FLAC dosyasına gömüldü: {save_file}")
+            return True
+            
+        except Exception as e:
+            print(f"FLAC gömme hatası: {e}")
+            return False
+    
     def _embed_to_generic_audio(self, audio_file: str, enf_data: Dict[str, Any],
                               output_file: Optional[str] = None) -> bool:
         """Genel ses dosyalarına gömme"""
         try:
+            import mutagen
+            
             # Mutagen ile genel metadata gömme
             audio = mutagen.File(audio_file)
             
@@ -146,7 +233,7 @@ class MetadataEmbedder:
                 return False
             
             # ENF verilerini göm
-            enf_json = json.dumps(enf_data, separators=(',', ':'))
+            enf_json = self._encode_text(enf_data)
             audio['enf_data'] = enf_json
             audio['enf_timestamp'] = datetime.now().isoformat()
             audio['enf_version'] = "1.0.0"
@@ -164,30 +251,27 @@ class MetadataEmbedder:
     
     def _embed_to_mp4(self, video_file: str, enf_data: Dict[str, Any],
                      output_file: Optional[str] = None) -> bool:
-        """MP4 dosyasına metadata gömme"""
+        """
+        MP4/MOV dosyasına moov/udta içindeki ENF uuid kutusu ile gömme
+        
+        Yerinde güncellemede (output_file None) mdat taşınmaz, yalnızca
+        metadata kutuları yazılır; ayrı çıktı dosyasında kopya stco/co64
+        ofsetleri düzeltilerek ve sonraki güncellemeler için boş alan
+        bırakılarak yazılır.
+        """
         try:
-            # FFmpeg ile metadata gömme
-            enf_json = json.dumps(enf_data, separators=(',', ':'))
-            
-            output_path = output_file if output_file else video_file + "_enf.mp4"
-            
-            cmd = [
-                'ffmpeg', '-i', video_file,
-                '-metadata', f'ENF_DATA={enf_json}',
-                '-metadata', f'ENF_TIMESTAMP={datetime.now().isoformat()}',
-                '-metadata', 'ENF_VERSION=1.0.0',
-                '-c', 'copy',  # Codec'i kopyala (yeniden encode etme)
-                output_path
-            ]
+            payload = self._encode_binary(enf_data)
             
-            result = subprocess.run(cmd, capture_output=True, text=True)
+            output_path = output_file if output_file else video_file
             
-            if result.returncode == 0:
-                print(f"ENF verileri MP4 dosyasına gömüldü: {output_path}")
-                return True
+            if os.path.abspath(output_path) == os.path.abspath(video_file):
+                method = embed_enf_box(video_file, payload)
             else:
-                print(f"FFmpeg hatası: {result.stderr}")
-                return False
+                rewrite_with_enf_box(video_file, output_path, payload)
+                method = "copy"
+            
+            print(f"ENF verileri MP4 dosyasına gömüldü ({method}): {output_path}")
+            return True
                 
         except Exception as e:
             print(f"MP4 gömme hatası: {e}")
@@ -195,64 +279,58 @@ class MetadataEmbedder:
     
     def _embed_to_generic_video(self, video_file: str, enf_data: Dict[str, Any],
                               output_file: Optional[str] = None) -> bool:
-        """Genel video dosyalarına gömme"""
-        try:
-            # OpenCV ile video metadata gömme (sınırlı)
-            enf_json = json.dumps(enf_data, separators=(',', ':'))
-            
-            output_path = output_file if output_file else video_file + "_enf" + os.path.splitext(video_file)[1]
-            
-            # Basit kopyalama (metadata desteği sınırlı)
-            cap = cv2.VideoCapture(video_file)
-            fps = cap.get(cv2.CAP_PROP_FPS)
-            width = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH))
-            height = int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
-            
-            fourcc = cv2.VideoWriter_fourcc(*'mp4v')
-            out = cv2.VideoWriter(output_path, fourcc, fps, (width, height))
-            
-            while cap.isOpened():
-                ret, frame = cap.read()
-                if not ret:
-                    break
-                out.write(frame)
-            
-            cap.release()
-            out.release()
-            
-            print(f"Video kopyalandı (metadata sınırlı): {output_path}")
-            return True
-            
-        except Exception as e:
-            print(f"Genel video gömme hatası: {e}")
-            return False
+        """
+        Genel video dosyalarına gömme (desteklenmiyor)
+        
+        Yalnızca MP4/MOV kapsayıcısına kayıpsız gömme yapılabilir; diğer
+        biçimlerde video yeniden kodlanmadan metadata yazılamadığından
+        dosyaya dokunulmaz.
+        """
+        print(f"Bu video biçimi yerinde gömme için desteklenmiyor "
+              f"(yalnızca .mp4/.mov): {video_file}")
+        return False
     
     def _embed_to_jpeg(self, image_file: str, enf_data: Dict[str, Any],
                       output_file: Optional[str] = None) -> bool:
-        """JPEG dosyasına EXIF ile gömme"""
+        """
+        JPEG dosyasına EXIF ile gömme
+        
+        Görüntü çözülüp yeniden kodlanmaz: yalnızca APP1 (EXIF) segmenti
+        değiştirilir, sıkıştırılmış piksel verisi bayt bayt korunur ve çıktı
+        geçici dosyadan atomik olarak yerine taşınır.
+        """
         try:
-            # Görüntüyü yükle
-            image = Image.open(image_file)
+            import piexif
+            import piexif.helper
+            
+            # Yalnızca başlık segmentlerini oku (SOS'a kadar)
+            with open(image_file, 'rb') as f:
+                header = read_jpeg_header(f)
             
             # Mevcut EXIF verilerini al
-            exif_dict = piexif.load(image.info.get("exif", b""))
+            exif_payload = find_exif(header[0])
+            if exif_payload:
+                exif_dict = piexif.load(exif_payload)
+            else:
+                exif_dict = {"0th": {}, "Exif": {}, "GPS": {}, "1st": {}, "thumbnail": None}
             
-            # ENF verilerini JSON string olarak göm
-            enf_json = json.dumps(enf_data, separators=(',', ':'))
+            # ENF verilerini metin olarak göm (base64 yük ASCII'dir)
+            enf_json = self._encode_text(enf_data)
             
-            # UserComment alanına ENF verilerini ekle
-            if "0th" not in exif_dict:
-                exif_dict["0th"] = {}
+            # UserComment (Exif IFD) alanına ENF verilerini ekle
+            for ifd in ("0th", "Exif"):
+                if ifd not in exif_dict:
+                    exif_dict[ifd] = {}
             
-            exif_dict["0th"][piexif.ImageIFD.UserComment] = enf_json.encode('utf-8')
+            exif_dict["Exif"][piexif.ExifIFD.UserComment] = piexif.helper.UserComment.dump(enf_json)
             exif_dict["0th"][piexif.ImageIFD.Software] = "ENF Embedder v1.0"
             
             # EXIF verilerini byte'a çevir
             exif_bytes = piexif.dump(exif_dict)
             
-            # Görüntüyü kaydet
+            # EXIF segmentini bayt akışına ekle
             output_path = output_file if output_file else image_file
-            image.save(output_path, exif=exif_bytes)
+            write_jpeg_exif(image_file, output_path, exif_bytes, header=header)
             
             print(f"ENF verileri JPEG dosyasına gömüldü: {output_path}")
             return True
@@ -265,11 +343,13 @@ class MetadataEmbedder:
                               output_file: Optional[str] = None) -> bool:
         """Genel görüntü dosyalarına gömme"""
         try:
+            from PIL import Image
+            
             # PIL ile genel metadata gömme
             image = Image.open(image_file)
             
             # ENF verilerini info alanına ekle
-            enf_json = json.dumps(enf_data, separators=(',', ':'))
+            enf_json = self._encode_text(enf_data)
             
             # Metadata bilgilerini hazırla
             metadata = {
@@ -325,19 +405,23 @@ class MetadataEmbedder:
             print(f"Veri çıkarma hatası: {e}")
             return None
     
+    def _read_header_payload(self, file_path: str) -> Optional[Dict[str, Any]]:
+        """Yalnızca kap başlıklarını okuyarak gömülü ENF verisini çöz"""
+        payload = read_enf_metadata(file_path)
+        return decode_enf_payload(payload) if payload is not None else None
+    
     def _extract_from_audio(self, file_path: str) -> Optional[Dict[str, Any]]:
         """Ses dosyasından ENF verilerini çıkar"""
         try:
-            if file_path.lower().endswith('.mp3'):
-                audio = MP3(file_path)
-                if audio.tags:
-                    for frame in audio.tags.values():
-                        if frame.FrameID == 'TXXX' and frame.desc == 'ENF_DATA':
-                            return json.loads(frame.text[0])
-            else:
-                audio = mutagen.File(file_path)
-                if audio and 'enf_data' in audio:
-                    return json.loads(audio['enf_data'][0])
+            # WAV / MP3 / FLAC / M4A: RIFF chunk, ID3, Vorbis yorumu veya MP4
+            # etiketleri başlıktan okunur (ses verisi çözülmez)
+            if os.path.splitext(file_path)[1].lower() in HEADER_READERS:
+                return self._read_header_payload(file_path)
+            
+            import mutagen
+            audio = mutagen.File(file_path)
+            if audio and 'enf_data' in audio:
+                return decode_enf_payload(audio['enf_data'][0])
             
             return None
             
@@ -348,7 +432,11 @@ class MetadataEmbedder:
     def _extract_from_video(self, file_path: str) -> Optional[Dict[str, Any]]:
         """Video dosyasından ENF verilerini çıkar"""
         try:
-            # FFprobe ile metadata çıkarma
+            # MP4/MOV: moov/udta ENF kutusu ve meta etiketleri (yalnızca kutu başlıkları okunur)
+            if os.path.splitext(file_path)[1].lower() in HEADER_READERS:
+                return self._read_header_payload(file_path)
+            
+            # Diğer kaplar (AVI, MKV): FFprobe ile metadata çıkarma
             cmd = ['ffprobe', '-v', 'quiet', '-print_format', 'json', 
                    '-show_format', file_path]
             
@@ -360,7 +448,7 @@ class MetadataEmbedder:
                 tags = format_info.get('tags', {})
                 
                 if 'ENF_DATA' in tags:
-                    return json.loads(tags['ENF_DATA'])
+                    return decode_enf_payload(tags['ENF_DATA'])
             
             return None
             
@@ -371,19 +459,16 @@ class MetadataEmbedder:
     def _extract_from_image(self, file_path: str) -> Optional[Dict[str, Any]]:
         """Görüntü dosyasından ENF verilerini çıkar"""
         try:
-            image = Image.open(file_path)
+            # JPEG (EXIF UserComment) / PNG (tEXt, iTXt): görüntü açılmadan
+            # yalnızca metadata segmentleri okunur
+            if os.path.splitext(file_path)[1].lower() in HEADER_READERS:
+                return self._read_header_payload(file_path)
             
-            if file_path.lower().endswith(('.jpg', '.jpeg')):
-                # EXIF'ten çıkar
-                exif_dict = piexif.load(image.info.get("exif", b""))
-                if "0th" in exif_dict:
-                    user_comment = exif_dict["0th"].get(piexif.ImageIFD.UserComment, b"")
-                    if user_comment:
-                        return json.loads(user_comment.decode('utf-8'))
-            else:
-                # PNG metadata'dan çıkar
-                if 'ENF_DATA' in image.info:
-                    return json.loads(image.info['ENF_DATA'])
+            from PIL import Image
+            
+            image = Image.open(file_path)
+            if 'ENF_DATA' in image.info:
+                return decode_enf_payload(image.info['ENF_DATA'])
             
             return None
             
@@ -392,22 +477,35 @@ class MetadataEmbedder:
             return None
 
 def main():
-    """Test fonksiyonu"""
+    """Test fonksiyonu / dosyalardan ENF metadata okuma"""
+    import argparse
+    
+    parser = argparse.ArgumentParser(description="ENF metadata okuma")
+    parser.add_argument("files", nargs="*", help="ENF verisi okunacak dosyalar")
+    args = parser.parse_args()
+    
     embedder = MetadataEmbedder()
     
-    # Test ENF verisi
-    test_enf_data = {
-        "enf_data": {
-            "frequencies": [50.1, 50.2, 50.0],
-            "timestamps": ["2024-01-01T12:00:00Z"],
-            "confidence": [0.95],
-            "source_type": "audio"
-        }
-    }
+    for file_path in args.files:
+        enf_data = embedder.extract_from_file(file_path)
+        if enf_data:
+            frequencies = enf_data.get("enf_data", {}).get("frequencies", [])
+            print(f"✅ {file_path}: {len(frequencies)} frekans değeri")
+        else:
+            print(f"❌ {file_path}: ENF verisi bulunamadı")
     
-    print("Metadata gömme testi tamamlandı!")
+    if not args.files:
+        # Test ENF verisi
+        test_enf_data = {
+            "enf_data": {
+                "frequencies": [50.1, 50.2, 50.0],
+                "timestamps": ["2024-01-01T12:00:00Z"],
+                "confidence": [0.95],
+                "source_type": "audio"
+            }
+        }
+        
+        print("Metadata gömme testi tamamlandı!")
 
 if __name__ == "__main__":
     main()
-
-
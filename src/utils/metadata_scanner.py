@@ -0,0 +1,521 @@
+"""
+Başlık Tabanlı ENF Metadata Okuyucu - Alt süreç ve tam çözme olmadan tarama
+
+Her biçim için yalnızca kap başlıkları ve metadata segmentleri okunur;
+ENF alanı bulunduğu anda okuma durur:
+    - MP4/MOV : moov/udta ENF uuid kutusu, moov(/udta)/meta ilst etiketleri
+    - JPEG    : APP1 (EXIF) -> Exif IFD -> UserComment
+    - PNG     : IDAT'tan önceki tEXt / zTXt / iTXt chunk'ları
+    - MP3     : ID3v2.3 / ID3v2.4 TXXX:ENF_DATA çerçevesi
+    - FLAC    : VORBIS_COMMENT bloğu (ENF_DATA=...)
+    - WAV     : RIFF 'enf ' chunk'ı
+
+Okuyucular gömülü yükü (ham metin veya ikili) döndürür; çözmek için
+utils.enf_payload.decode_enf_payload / read_enf_summary kullanılır.
+"""
+
+import os
+import struct
+import time
+import zlib
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import BinaryIO, Callable, Dict, Iterable, Iterator, NamedTuple, Optional, Tuple, Union
+
+from utils.enf_payload import MAGIC, TEXT_PREFIX
+from utils.isobmff import ENF_UUID, read_boxes
+from utils.jpeg_exif import APP1, EOI, EXIF_HEADER, SOI, SOS, STANDALONE_MARKERS
+from utils.riff import ENF_CHUNK_ID, read_chunks
+
+ENF_KEY = "ENF_DATA"
+
+PNG_SIGNATURE = b"\x89PNG\r\n\x1a\n"
+PNG_TEXT_CHUNKS = (b"tEXt", b"zTXt", b"iTXt")
+
+EXIF_IFD_POINTER = 0x8769
+EXIF_USER_COMMENT = 0x9286
+USER_COMMENT_ENCODINGS = {
+    b"ASCII\x00\x00\x00": "ascii",
+    b"UNICODE\x00": "utf_16_be",
+    b"JIS\x00\x00\x00\x00\x00": "shift_jis",
+    b"\x00" * 8: "utf-8",
+}
+
+# TIFF alan türlerinin bayt boyutları (BYTE, ASCII, SHORT, LONG, RATIONAL, ...)
+TIFF_TYPE_SIZES = {1: 1, 2: 1, 3: 2, 4: 4, 5: 8, 6: 1, 7: 1, 8: 2, 9: 4, 10: 8, 11: 4, 12: 8}
+
+ID3_TEXT_ENCODINGS = {0: ("latin-1", b"\x00"), 1: ("utf-16", b"\x00\x00"),
+                      2: ("utf-16-be", b"\x00\x00"), 3: ("utf-8", b"\x00")}
+
+FLAC_VORBIS_COMMENT = 4
+
+Payload = Union[str, bytes]
+
+
+class ScanResult(NamedTuple):
+    """Toplu taramada tek dosyanın sonucu"""
+    path: str
+    payload: Optional[Payload]
+    error: Optional[str] = None
+
+
+def _looks_like_enf(text: str) -> bool:
+    """Metin alanının ENF yükü olup olmadığını ayırt et (kamera yorumu vb. değil)"""
+    text = text.lstrip()
+    return text.startswith(TEXT_PREFIX) or text.startswith("{")
+
+
+def _read_exact(f: BinaryIO, size: int) -> bytes:
+    data = f.read(size)
+    if len(data) < size:
+        raise ValueError("Dosya başlığı beklenmedik şekilde bitti")
+    return data
+
+
+def read_mp4_enf(f: BinaryIO) -> Optional[Payload]:
+    """
+    MP4/MOV: ENF uuid kutusu, yoksa ENF_DATA adlı metadata etiketi
+
+    Yalnızca moov kutusunun içi gezilir; mdat hiç okunmaz.
+    """
+    for box in read_boxes(f):
+        if box.type != b"moov":
+            continue
+        tag = None
+        for child in read_boxes(f, box.offset + box.header_size, box.end):
+            if child.type == b"udta":
+                for item in read_boxes(f, child.offset + child.header_size, child.end):
+                    if item.type == b"uuid" and item.size >= item.header_size + 16:
+                        f.seek(item.offset + item.header_size)
+                        if f.read(16) == ENF_UUID:
+                            return f.read(item.size - item.header_size - 16)
+                    elif item.type == b"meta" and tag is None:
+                        tag = _read_meta_tag(f, item)
+            elif child.type == b"meta" and tag is None:
+                tag = _read_meta_tag(f, child)
+        return tag
+    return None
+
+
+def _read_meta_tag(f: BinaryIO, meta) -> Optional[str]:
+    """meta kutusundaki (mdta anahtarları veya '----' serbest biçim) ENF_DATA etiketi"""
+    start = meta.offset + meta.header_size
+    f.seek(start + 4)
+    # ISO meta tam kutudur (4 bayt sürüm/bayrak); QuickTime meta değildir
+    if f.read(4) != b"hdlr":
+        start += 4
+
+    children = read_boxes(f, start, meta.end)
+    key_index = None
+    for child in children:
+        if child.type == b"keys":
+            f.seek(child.offset + child.header_size + 4)
+            count = struct.unpack(">I", _read_exact(f, 4))[0]
+            for index in range(1, count + 1):
+                key_size, _ = struct.unpack(">I4s", _read_exact(f, 8))
+                if _read_exact(f, key_size - 8) == ENF_KEY.encode("ascii"):
+                    key_index = struct.pack(">I", index)
+                    break
+
+    for child in children:
+        if child.type != b"ilst":
+            continue
+        for item in read_boxes(f, child.offset + child.header_size, child.end):
+            if item.type != key_index and item.type != b"----":
+                continue
+            value = None
+            name = None
+            for atom in read_boxes(f, item.offset + item.header_size, item.end):
+                if atom.type == b"name":
+                    f.seek(atom.offset + atom.header_size + 4)
+                    name = f.read(atom.size - atom.header_size - 4)
+                elif atom.type == b"data":
+                    value = atom
+            if value is None or (item.type == b"----" and name != ENF_KEY.encode("ascii")):
+                continue
+            # data: 4 bayt tür göstergesi + 4 bayt yerel ayar + değer
+            f.seek(value.offset + value.header_size + 8)
+            text = f.read(value.size - value.header_size - 8).decode("utf-8", errors="replace")
+            return text if _looks_like_enf(text) else None
+    return None
+
+
+def _exif_user_comment(exif: bytes) -> Optional[bytes]:
+    """EXIF (TIFF) verisinden Exif IFD UserComment alanının ham baytlarını bul"""
+    tiff = memoryview(exif)[len(EXIF_HEADER):]
+    if len(tiff) < 8:
+        return None
+    order = {b"II": "<", b"MM": ">"}.get(bytes(tiff[:2]))
+    if order is None:
+        return None
+
+    def find_entry(ifd_offset: int, tag: int) -> Optional[Tuple[int, int, int]]:
+        if ifd_offset + 2 > len(tiff):
+            return None
+        count = struct.unpack_from(order + "H", tiff, ifd_offset)[0]
+        for index in range(count):
+            entry = ifd_offset + 2 + 12 * index
+            if entry + 12 > len(tiff):
+                return None
+            entry_tag, field_type, value_count = struct.unpack_from(order + "HHI", tiff, entry)
+            if entry_tag == tag:
+                return field_type, value_count, entry + 8
+        return None
+
+    ifd0 = struct.unpack_from(order + "I", tiff, 4)[0]
+    pointer = find_entry(ifd0, EXIF_IFD_POINTER)
+    if pointer is None:
+        return None
+    exif_ifd = struct.unpack_from(order + "I", tiff, pointer[2])[0]
+    comment = find_entry(exif_ifd, EXIF_USER_COMMENT)
+    if comment is None:
+        return None
+
+    field_type, value_count, value_field = comment
+    size = TIFF_TYPE_SIZES.get(field_type, 1) * value_count
+    offset = value_field if size <= 4 else struct.unpack_from(order + "I", tiff, value_field)[0]
+    return bytes(tiff[offset:offset + size])
+
+
+def read_jpeg_enf(f: BinaryIO) -> Optional[str]:
+    """
+    JPEG: EXIF APP1 içindeki UserComment
+
+    Marker segmentleri SOS'a kadar gezilir; EXIF dışındaki segmentlerin
+    içeriği okunmadan atlanır.
+    """
+    if f.read(2) != SOI:
+        raise ValueError("Geçerli bir JPEG dosyası değil (SOI yok)")
+
+    while True:
+        if f.read(1) != b"\xff":
+            raise ValueError("Bozuk JPEG marker dizisi")
+        marker = 0xFF
+        while marker == 0xFF:
+            marker = _read_exact(f, 1)[0]
+        if marker in (SOS, EOI):
+            return None
+        if marker in STANDALONE_MARKERS:
+            continue
+
+        length = struct.unpack(">H", _read_exact(f, 2))[0]
+        if marker != APP1 or length - 2 < len(EXIF_HEADER):
+            f.seek(length - 2, os.SEEK_CUR)
+            continue
+        prefix = _read_exact(f, len(EXIF_HEADER))
+        if prefix != EXIF_HEADER:
+            # XMP vb. diğer APP1 segmentleri
+            f.seek(length - 2 - len(prefix), os.SEEK_CUR)
+            continue
+
+        comment = _exif_user_comment(prefix + _read_exact(f, length - 2 - len(prefix)))
+        if comment is None or len(comment) < 8:
+            return None
+        encoding = USER_COMMENT_ENCODINGS.get(comment[:8])
+        if encoding is None:
+            return None
+        text = comment[8:].decode(encoding, errors="replace").rstrip("\x00")
+        return text if _looks_like_enf(text) else None
+
+
+def read_png_enf(f: BinaryIO) -> Optional[str]:
+    """
+    PNG: ENF_DATA anahtarlı tEXt / zTXt / iTXt chunk'ı
+
+    İlk IDAT chunk'ına gelindiğinde durulur (PIL'in Image.open ile
+    gördüğü metin alanlarıyla aynı kapsam).
+    """
+    if f.read(8) != PNG_SIGNATURE:
+        raise ValueError("Geçerli bir PNG dosyası değil")
+
+    key = ENF_KEY.encode("latin-1") + b"\x00"
+    while True:
+        header = f.read(8)
+        if len(header) < 8:
+            return None
+        length, chunk_type = struct.unpack(">I4s", header)
+        if chunk_type in (b"IDAT", b"IEND"):
+            return None
+        if chunk_type not in PNG_TEXT_CHUNKS or length < len(key):
+            f.seek(length + 4, os.SEEK_CUR)
+            continue
+
+        prefix = _read_exact(f, len(key))
+        if prefix != key:
+            f.seek(length - len(key) + 4, os.SEEK_CUR)
+            continue
+
+        data = _read_exact(f, length - len(key))
+        if chunk_type == b"tEXt":
+            return data.decode("latin-1")
+        if chunk_type == b"zTXt":
+            return zlib.decompress(data[1:]).decode("latin-1")
+        # iTXt: sıkıştırma bayrağı, yöntem, dil etiketi\0, çevrilmiş anahtar\0, metin
+        compressed = data[0]
+        _, _, rest = data[2:].partition(b"\x00")
+        _, _, text = rest.partition(b"\x00")
+        return (zlib.decompress(text) if compressed else text).decode("utf-8")
+
+
+def _id3_syncsafe(data: bytes) -> int:
+    return (data[0] << 21) | (data[1] << 14) | (data[2] << 7) | data[3]
+
+
+def _decode_txxx(data: bytes) -> Optional[str]:
+    """TXXX çerçevesi: kodlama, açıklama\\0, değer; açıklama ENF_DATA ise değeri döndür"""
+    if not data or data[0] not in ID3_TEXT_ENCODINGS:
+        return None
+    encoding, terminator = ID3_TEXT_ENCODINGS[data[0]]
+    body = data[1:]
+
+    position = 0
+    while True:
+        position = body.find(terminator, position)
+        if position < 0:
+            return None
+        if position % len(terminator) == 0:
+            break
+        position += 1
+    description = body[:position].decode(encoding, errors="replace")
+    if description != ENF_KEY:
+        return None
+
+    value = body[position + len(terminator):]
+    if data[0] == 1 and value[:2] not in (b"\xff\xfe", b"\xfe\xff"):
+        # BOM'suz UTF-16 değer açıklamanın bayt sırasını kullanır
+        encoding = "utf-16-le" if body[:2] == b"\xff\xfe" else "utf-16-be"
+    # Birden çok değer \0 ile ayrılır; ilk değer alınır
+    text = value.decode(encoding, errors="replace").split("\x00")[0]
+    return text
+
+
+def read_id3_enf(f: BinaryIO) -> Optional[str]:
+    """
+    MP3: ID3v2.3 / ID3v2.4 etiketindeki TXXX:ENF_DATA çerçevesi
+
+    Yalnızca dosya başındaki ID3 etiketi okunur; çerçeve başlıkları gezilir
+    ve TXXX dışındaki çerçevelerin içeriği atlanır.
+    """
+    header = f.read(10)
+    if len(header) < 10 or header[:3] != b"ID3":
+        return None
+    major, flags, size = header[3], header[5], _id3_syncsafe(header[6:10])
+    if major not in (3, 4):
+        return None
+
+    tag = _read_exact(f, size)
+    if major == 3 and flags & 0x80:
+        # Etiket düzeyinde senkronizasyon bozma (unsynchronisation)
+        tag = tag.replace(b"\xff\x00", b"\xff")
+    position = 0
+    if flags & 0x40:
+        extended = tag[:4]
+        position = _id3_syncsafe(extended) if major == 4 else struct.unpack(">I", extended)[0] + 4
+
+    while position + 10 <= len(tag):
+        frame_id = tag[position:position + 4]
+        if frame_id[:1] == b"\x00":
+            break
+        frame_size = (_id3_syncsafe(tag[position + 4:position + 8]) if major == 4
+                      else struct.unpack(">I", tag[position + 4:position + 8])[0])
+        format_flags = tag[position + 9]
+        data = tag[position + 10:position + 10 + frame_size]
+        position += 10 + frame_size
+
+        if frame_id != b"TXXX":
+            continue
+        if major == 4:
+            if format_flags & 0x0C:  # sıkıştırılmış / şifreli
+                continue
+            if format_flags & 0x01:  # veri uzunluğu göstergesi
+                data = data[4:]
+            if format_flags & 0x02:
+                data = data.replace(b"\xff\x00", b"\xff")
+        elif format_flags & 0xC0:
+            continue
+        text = _decode_txxx(data)
+        if text is not None:
+            return text
+    return None
+
+
+def read_flac_enf(f: BinaryIO) -> Optional[str]:
+    """FLAC: VORBIS_COMMENT bloğundaki ENF_DATA alanı (ses çerçeveleri okunmaz)"""
+    header = f.read(10)
+    if header[:3] == b"ID3":
+        f.seek(10 + _id3_syncsafe(header[6:10]))
+    else:
+        f.seek(0)
+    if f.read(4) != b"fLaC":
+        raise ValueError("Geçerli bir FLAC dosyası değil")
+
+    key = ENF_KEY.lower().encode("ascii") + b"="
+    while True:
+        block_header = _read_exact(f, 4)
+        last = block_header[0] & 0x80
+        block_type = block_header[0] & 0x7F
+        length = int.from_bytes(block_header[1:], "big")
+        if block_type != FLAC_VORBIS_COMMENT:
+            if last:
+                return None
+            f.seek(length, os.SEEK_CUR)
+            continue
+
+        block = _read_exact(f, length)
+        vendor_length = struct.unpack_from("<I", block, 0)[0]
+        position = 4 + vendor_length
+        count = struct.unpack_from("<I", block, position)[0]
+        position += 4
+        for _ in range(count):
+            comment_length = struct.unpack_from("<I", block, position)[0]
+            position += 4
+            comment = block[position:position + comment_length]
+            position += comment_length
+            if comment[:len(key)].lower() == key:
+                return comment[len(key):].decode("utf-8", errors="replace")
+        return None
+
+
+def read_wav_enf(f: BinaryIO) -> Optional[bytes]:
+    """WAV: RIFF 'enf ' chunk'ı (yalnızca chunk başlıkları gezilir)"""
+    _, chunks, _ = read_chunks(f)
+    for chunk in chunks:
+        if chunk.id == ENF_CHUNK_ID:
+            f.seek(chunk.offset + 8)
+            return _read_exact(f, chunk.size)
+    return None
+
+
+READERS: Dict[str, Callable[[BinaryIO], Optional[Payload]]] = {
+    ".mp4": read_mp4_enf,
+    ".mov": read_mp4_enf,
+    ".m4a": read_mp4_enf,
+    ".jpg": read_jpeg_enf,
+    ".jpeg": read_jpeg_enf,
+    ".png": read_png_enf,
+    ".mp3": read_id3_enf,
+    ".flac": read_flac_enf,
+    ".wav": read_wav_enf,
+}
+
+
+def read_enf_metadata(path: str) -> Optional[Payload]:
+    """
+    Dosyadaki gömülü ENF yükünü yalnızca başlıkları okuyarak bul
+
+    Args:
+        path: Medya dosyası
+
+    Returns:
+        Ham yük (metin veya ikili) veya None (yoksa ya da biçim desteklenmiyorsa)
+    """
+    reader = READERS.get(os.path.splitext(path)[1].lower())
+    if reader is None:
+        return None
+    with open(path, "rb") as f:
+        payload = reader(f)
+    if isinstance(payload, bytes) and not payload.startswith(MAGIC):
+        # Eski sürümlerin düz JSON baytları
+        payload = payload.decode("utf-8")
+    return payload
+
+
+def _scan_one(path: str) -> ScanResult:
+    try:
+        return ScanResult(path, read_enf_metadata(path))
+    except Exception as e:
+        return ScanResult(path, None, str(e))
+
+
+def iter_media_files(root: str, extensions: Optional[Iterable[str]] = None,
+                     recursive: bool = True) -> Iterator[str]:
+    """Dizindeki desteklenen uzantılı dosyaları (os.scandir ile) listele"""
+    extensions = tuple(ext.lower() for ext in (extensions or READERS))
+    pending = [root]
+    while pending:
+        with os.scandir(pending.pop()) as entries:
+            for entry in entries:
+                if entry.is_dir(follow_symlinks=False):
+                    if recursive:
+                        pending.append(entry.path)
+                elif entry.name.lower().endswith(extensions):
+                    yield entry.path
+
+
+def scan_directory(root: str, extensions: Optional[Iterable[str]] = None,
+                   recursive: bool = True, workers: int = 1) -> Iterator[ScanResult]:
+    """
+    Dizindeki medya dosyalarını ENF metadata'sı için tara
+
+    Okuma hataları taramayı durdurmaz, sonuçta error alanına yazılır.
+    Ağ / arşiv depolamasında gecikmeyi örtmek için workers > 1 ile iş
+    parçacığı havuzu kullanılır (bekleyen iş sayısı sınırlıdır, sonuçlar
+    dosya sırasıyla döner).
+
+    Args:
+        root: Taranacak dizin
+        extensions: Uzantı filtresi (varsayılan: desteklenen tüm biçimler)
+        recursive: Alt dizinlere in
+        workers: İş parçacığı sayısı
+
+    Yields:
+        ScanResult: (path, payload, error)
+    """
+    paths = iter_media_files(root, extensions, recursive)
+    if workers <= 1:
+        for path in paths:
+            yield _scan_one(path)
+        return
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        pending = deque()
+        for path in paths:
+            pending.append(executor.submit(_scan_one, path))
+            if len(pending) >= workers * 4:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+
+def main():
+    """Komut satırı: dizindeki dosyalarda gömülü ENF verisini tara"""
+    import argparse
+    import json
+
+    from utils.enf_payload import read_enf_summary
+
+    parser = argparse.ArgumentParser(description="Başlık tabanlı ENF metadata taraması")
+    parser.add_argument("root", help="Taranacak dizin")
+    parser.add_argument("--workers", type=int, default=1, help="İş parçacığı sayısı")
+    parser.add_argument("--no-recursive", action="store_true", help="Alt dizinlere inme")
+    parser.add_argument("--output", help="Bulunan dosyaların özetlerini JSON Lines olarak yaz")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    scanned = found = errors = 0
+    output = open(args.output, "w", encoding="utf-8") if args.output else None
+    try:
+        for result in scan_directory(args.root, recursive=not args.no_recursive, workers=args.workers):
+            scanned += 1
+            if result.error:
+                errors += 1
+                print(f"⚠️  {result.path}: {result.error}")
+            elif result.payload is not None:
+                found += 1
+                summary = read_enf_summary(result.payload)
+                statistics = summary.get("statistics", {})
+                print(f"✅ {result.path}: {statistics.get('count', 0)} değer, "
+                      f"ortalama {statistics.get('mean_frequency', float('nan')):.3f} Hz")
+                if output:
+                    output.write(json.dumps({"path": result.path, **summary}, ensure_ascii=False) + "\n")
+    finally:
+        if output:
+            output.close()
+
+    elapsed = time.perf_counter() - start
+    print(f"\n📊 {scanned} dosya tarandı, {found} dosyada ENF verisi, {errors} hata "
+          f"({scanned / max(elapsed, 1e-9):.0f} dosya/s)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,126 @@
+"""
+Aşama Bazlı Ölçüm - Boru hattı aşamaları için süre, CPU ve bellek ölçümü
+"""
+
+import os
+import sys
+import time
+import tracemalloc
+from contextlib import contextmanager
+from typing import Any, Dict, Optional
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+
+def max_rss_mb() -> Optional[float]:
+    """Sürecin şimdiye kadarki en yüksek RSS değeri (MB), desteklenmiyorsa None"""
+    if resource is None:
+        return None
+    max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux'ta KB, macOS'ta byte
+    return max_rss / (1024 ** 2) if sys.platform == "darwin" else max_rss / 1024
+
+
+def current_rss_mb() -> Optional[float]:
+    """Sürecin şu anki RSS değeri (MB, /proc/self/statm), desteklenmiyorsa None"""
+    try:
+        with open("/proc/self/statm", "rb") as f:
+            resident_pages = int(f.read().split()[1])
+    except (OSError, ValueError, IndexError):
+        return None
+    return resident_pages * os.sysconf("SC_PAGE_SIZE") / (1024 ** 2)
+
+
+class StageProfiler:
+    """
+    Aşama başına duvar saati, CPU süresi ve bellek değişimini kaydeden sınıf
+
+    Aşama başına bellek (ru_maxrss sürecin ömür boyu tepesi olduğundan ve
+    havuz işçilerinde önceki dosyalardan taşındığından aşamaya göre ayrılır):
+      - rss_delta_mb: aşama boyunca anlık RSS değişimi (/proc/self/statm,
+        yalnızca Linux); çağrılar arasında en büyüğü tutulur
+      - rss_peak_growth_mb: aşamanın süreç RSS tepesini yükselttiği miktar;
+        çağrılar boyunca toplanır (0: daha önceki tepenin altında kaldı)
+
+    Aynı adlı aşama birden çok kez çalışırsa (ör. akış modunda her blok)
+    süreler toplanır; peak_alloc_mb ve rss_delta_mb için en büyüğü tutulur.
+    """
+
+    def __init__(self, trace_memory: bool = False):
+        """
+        Args:
+            trace_memory: True ise tracemalloc ile aşama başına tepe ayrılan
+                bellek ölçülür (numpy ayırmaları dahil, ek yükü vardır)
+        """
+        self.trace_memory = trace_memory
+        self.stages: Dict[str, Dict[str, Any]] = {}
+        self._started_tracing = False
+        self._start_wall = None
+        self._start_cpu = None
+
+    def start(self):
+        """Ölçümü sıfırla ve başlat"""
+        self.stages = {}
+        self._start_wall = time.perf_counter()
+        self._start_cpu = time.process_time()
+        if self.trace_memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._started_tracing = True
+
+    def stop(self):
+        """Bu profiler'ın başlattığı bellek izlemesini durdur"""
+        if self._started_tracing:
+            tracemalloc.stop()
+            self._started_tracing = False
+
+    @contextmanager
+    def stage(self, name: str):
+        """Bir aşamayı ölç: `with profiler.stage("stft"): ...`"""
+        tracing = self.trace_memory and tracemalloc.is_tracing()
+        if tracing:
+            base_alloc = tracemalloc.get_traced_memory()[0]
+            tracemalloc.reset_peak()
+
+        rss_start = current_rss_mb()
+        peak_start = max_rss_mb()
+        wall_start = time.perf_counter()
+        cpu_start = time.process_time()
+        try:
+            yield
+        finally:
+            entry = self.stages.setdefault(name, {"wall_seconds": 0.0, "cpu_seconds": 0.0, "calls": 0})
+            entry["wall_seconds"] += time.perf_counter() - wall_start
+            entry["cpu_seconds"] += time.process_time() - cpu_start
+            entry["calls"] += 1
+
+            if tracing:
+                peak_mb = (tracemalloc.get_traced_memory()[1] - base_alloc) / (1024 ** 2)
+                entry["peak_alloc_mb"] = max(entry.get("peak_alloc_mb", 0.0), peak_mb)
+
+            rss_end = current_rss_mb()
+            if rss_start is not None and rss_end is not None:
+                entry["rss_delta_mb"] = max(entry.get("rss_delta_mb", float("-inf")), rss_end - rss_start)
+            peak_end = max_rss_mb()
+            if peak_start is not None and peak_end is not None:
+                entry["rss_peak_growth_mb"] = entry.get("rss_peak_growth_mb", 0.0) + peak_end - peak_start
+
+    def summary(self) -> Dict[str, Any]:
+        """
+        Aşama ölçümlerini JSON'a yazılabilir sözlük olarak döndür
+
+        Üst düzey rss_peak_mb sürecin ömür boyu RSS tepesidir (yeniden
+        kullanılan havuz işçilerinde önceki dosyaları da kapsar).
+        """
+        stages = {
+            name: {key: round(value, 6) if isinstance(value, float) else value
+                   for key, value in entry.items()}
+            for name, entry in self.stages.items()
+        }
+        summary = {"stages": stages, "rss_peak_mb": max_rss_mb()}
+        if self._start_wall is not None:
+            summary["total_wall_seconds"] = round(time.perf_counter() - self._start_wall, 6)
+            summary["total_cpu_seconds"] = round(time.process_time() - self._start_cpu, 6)
+        return summary
@@ -0,0 +1,403 @@
+"""
+Referans ENF Deposu - Şebeke frekansı kayıtları için bellek eşlemli,
+yalnızca eklemeli (append-only) depo
+
+Dizin düzeni (her şebeke için, ör. ground_truth/reference_enf/EU50/):
+    samples.f32 : ham little-endian float32 örnekler; örnek i'nin zamanı
+                  start_epoch + i / rate (eksik örnekler NaN)
+    index.json  : start_epoch, rate, length, nominal frekans ve boşluklar
+                  (length yetkilidir; yarım kalan bir eklemenin artığı okuyucularca
+                  yok sayılır, bir sonraki ekleme kilit altında üzerine yazar)
+"""
+
+import csv
+import itertools
+import json
+import os
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from utils.atomic_io import atomic_write
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+SAMPLES_FILE = "samples.f32"
+INDEX_FILE = "index.json"
+SAMPLE_DTYPE = np.dtype('<f4')
+
+# NaN ile doldurulacak en uzun boşluk: ms cinsinden epoch veya yanlış yıl
+# gibi hatalı bir zaman damgası gigabaytlarca dolgu yazdırmasın
+DEFAULT_MAX_GAP_SECONDS = 7 * 86400
+
+
+class ReferenceENFStore:
+    """Şebeke başına zaman ekseni sabit, bellek eşlemli referans ENF deposu"""
+
+    def __init__(self, root: str = "data/ground_truth/reference_enf",
+                 max_gap_seconds: float = DEFAULT_MAX_GAP_SECONDS):
+        """
+        Args:
+            root: Depo kök dizini (DataCollector'ın ground_truth/reference_enf dizini)
+            max_gap_seconds: Eklemede izin verilen en uzun boşluk (s); aşan
+                eklemeler hiçbir şey yazılmadan reddedilir
+        """
+        self.root = Path(root)
+        self.max_gap_seconds = max_gap_seconds
+
+    def grids(self) -> List[str]:
+        """Depodaki şebekeler"""
+        if not self.root.exists():
+            return []
+        return sorted(p.parent.name for p in self.root.glob(f"*/{INDEX_FILE}"))
+
+    def info(self, grid: str) -> Dict[str, Any]:
+        """Şebekenin indeksini döndür (end_epoch dahil)"""
+        index = self._load_index(grid)
+        index["end_epoch"] = index["start_epoch"] + index["length"] / index["rate"]
+        return index
+
+    def create(self, grid: str, start_epoch: float, rate: float = 1.0,
+               nominal_frequency: float = 50.0, exist_ok: bool = False) -> Dict[str, Any]:
+        """
+        Boş bir şebeke serisi oluştur
+
+        Varlık kontrolü ve indeks yazımı append ile aynı yazıcı kilidi
+        altında yapılır; aynı anda oluşturan iki süreçten yalnızca biri yazar.
+
+        Args:
+            exist_ok: Şebeke zaten varsa hata yerine mevcut indeksi döndür
+        """
+        grid_dir = self.root / grid
+        grid_dir.mkdir(parents=True, exist_ok=True)
+        with open(grid_dir / SAMPLES_FILE, "ab") as f:
+            _lock(f.fileno())
+            try:
+                if (grid_dir / INDEX_FILE).exists():
+                    if exist_ok:
+                        return self._load_index(grid)
+                    raise ValueError(f"Şebeke zaten mevcut: {grid}")
+
+                index = {
+                    "grid": grid,
+                    "nominal_frequency": nominal_frequency,
+                    "rate": rate,
+                    "start_epoch": float(start_epoch),
+                    "length": 0,
+                    "gaps": []
+                }
+                self._save_index(grid, index)
+                return index
+            finally:
+                _unlock(f.fileno())
+
+    def append(self, grid: str, epochs: np.ndarray, values: np.ndarray) -> int:
+        """
+        Zaman damgalı ölçümleri serinin sonuna ekle
+
+        Zamanlar en yakın örnek indeksine yuvarlanır; serinin sonundan önceye
+        düşenler atlanır (yalnızca ekleme), aradaki eksik örnekler NaN ile
+        doldurulur ve boşluk olarak indekse yazılır. max_gap_seconds'tan uzun
+        bir boşluk (ör. ms cinsinden epoch) ValueError ile reddedilir.
+
+        Args:
+            grid: Şebeke adı
+            epochs: Unix epoch zamanları (s)
+            values: Frekans değerleri (Hz)
+
+        Returns:
+            int: Eklenen örnek sayısı (NaN dolgu dahil)
+        """
+        self._load_index(grid)  # şebeke yoksa KeyError
+        samples_file = self.root / grid / SAMPLES_FILE
+        with open(samples_file, "r+b") as f:
+            # Tek yazıcı: indeks kilit altında yeniden okunur, yarım kalmış
+            # bir eklemenin artığı (length ötesi) burada üzerine yazılır/kesilir
+            _lock(f.fileno())
+            try:
+                index = self._load_index(grid)
+                rate, start_epoch, length = index["rate"], index["start_epoch"], index["length"]
+
+                positions = np.rint((np.asarray(epochs, dtype=np.float64) - start_epoch) * rate).astype(np.int64)
+                values = np.asarray(values, dtype=np.float32)
+                keep = positions >= length
+                positions, values = positions[keep], values[keep]
+                if len(positions) == 0:
+                    return 0
+
+                # Serinin sonu dahil ardışık örnekler arasındaki NaN koşuları
+                runs = np.diff(np.concatenate([[length - 1], np.unique(positions)])) - 1
+                longest = int(runs.max())
+                if longest > self.max_gap_seconds * rate:
+                    raise ValueError(
+                        f"{grid}: {longest / rate:.0f} s boşluk, izin verilen {self.max_gap_seconds:.0f} s'yi "
+                        f"aşıyor (hatalı zaman damgası? en geç epoch: {start_epoch + positions.max() / rate:.0f})")
+
+                block = np.full(int(positions.max()) + 1 - length, np.nan, dtype=SAMPLE_DTYPE)
+                block[positions - length] = values  # aynı örneğe düşen tekrarlarda son değer kalır
+
+                f.seek(length * SAMPLE_DTYPE.itemsize)
+                f.write(block.tobytes())
+                f.truncate()
+                f.flush()
+                os.fsync(f.fileno())
+
+                self._record_gaps(index, block, length)
+                index["length"] = length + len(block)
+                self._save_index(grid, index)
+                return len(block)
+            finally:
+                _unlock(f.fileno())
+
+    def samples(self, grid: str) -> np.ndarray:
+        """Tüm seri (salt okunur bellek eşlemi)"""
+        index = self._load_index(grid)
+        if index["length"] == 0:
+            return np.empty(0, dtype=SAMPLE_DTYPE)
+        return np.memmap(self.root / grid / SAMPLES_FILE, dtype=SAMPLE_DTYPE, mode="r",
+                         shape=(index["length"],))
+
+    def query(self, grid: str, t0: float, t1: float) -> Tuple[float, np.ndarray]:
+        """
+        [t0, t1) aralığındaki örnekler (kopyasız görünüm)
+
+        Args:
+            grid: Şebeke adı
+            t0, t1: Unix epoch sınırları (s); seri dışına taşan kısım kırpılır
+
+        Returns:
+            (ilk örneğin zamanı, float32 memmap görünümü); eksik örnekler NaN
+        """
+        index = self._load_index(grid)
+        rate, start_epoch = index["rate"], index["start_epoch"]
+
+        i0 = int(np.clip(np.ceil((t0 - start_epoch) * rate), 0, index["length"]))
+        i1 = int(np.clip(np.ceil((t1 - start_epoch) * rate), i0, index["length"]))
+        return start_epoch + i0 / rate, self.samples(grid)[i0:i1]
+
+    def matcher(self, grid: str, t0: Optional[float] = None, t1: Optional[float] = None):
+        """Seri (veya [t0, t1) dilimi) üzerinde ENFMatcher oluştur"""
+        from utils.enf_matcher import ENFMatcher
+
+        index = self._load_index(grid)
+        start_time, reference = self.query(
+            grid,
+            index["start_epoch"] if t0 is None else t0,
+            index["start_epoch"] + index["length"] / index["rate"] if t1 is None else t1)
+        return ENFMatcher(reference, index["rate"], start_time)
+
+    def pyramid_index(self, grid: str, t0: Optional[float] = None, t1: Optional[float] = None,
+                      **kwargs):
+        """Seri (veya [t0, t1) dilimi) üzerinde kaba-ince ENFPyramidIndex oluştur"""
+        from utils.enf_index import ENFPyramidIndex
+
+        index = self._load_index(grid)
+        start_time, reference = self.query(
+            grid,
+            index["start_epoch"] if t0 is None else t0,
+            index["start_epoch"] + index["length"] / index["rate"] if t1 is None else t1)
+        return ENFPyramidIndex(reference, index["rate"], start_time, **kwargs)
+
+    def ingest_csv(self, grid: str, csv_file: str, time_column=0, freq_column=1,
+                   rate: float = 1.0, nominal_frequency: float = 50.0,
+                   chunk_rows: int = 1_000_000) -> int:
+        """
+        Şebeke operatörü CSV dosyasını parça parça içe aktar
+
+        Zaman sütunu ISO 8601 (saat dilimi yoksa UTC kabul edilir) veya Unix
+        epoch saniyesi olabilir. Sütunlar ad ya da 0 tabanlı indeksle verilir.
+        Şebeke yoksa ilk zaman damgasıyla oluşturulur.
+
+        Returns:
+            int: Eklenen örnek sayısı
+        """
+        appended = 0
+        for epochs, values in _read_csv_chunks(csv_file, time_column, freq_column, chunk_rows):
+            if not (self.root / grid / INDEX_FILE).exists():
+                start_epoch = np.floor(epochs.min() * rate) / rate
+                self.create(grid, start_epoch, rate, nominal_frequency, exist_ok=True)
+            appended += self.append(grid, epochs, values)
+        return appended
+
+    def _record_gaps(self, index: Dict[str, Any], block: np.ndarray, block_start: int):
+        """Bloktaki NaN koşularını [başlangıç, bitiş) epoch aralıkları olarak ekle"""
+        missing = np.isnan(block).astype(np.int8)
+        if not missing.any():
+            return
+
+        edges = np.diff(np.concatenate([[0], missing, [0]]))
+        starts = np.flatnonzero(edges == 1) + block_start
+        ends = np.flatnonzero(edges == -1) + block_start
+        rate, start_epoch = index["rate"], index["start_epoch"]
+
+        gaps = index["gaps"]
+        for start, end in zip(starts, ends):
+            gap = [start_epoch + start / rate, start_epoch + end / rate]
+            if gaps and gaps[-1][1] == gap[0]:
+                gaps[-1][1] = gap[1]
+            else:
+                gaps.append(gap)
+
+    def _load_index(self, grid: str) -> Dict[str, Any]:
+        index_file = self.root / grid / INDEX_FILE
+        try:
+            with open(index_file, "r", encoding="utf-8") as f:
+                index = json.load(f)
+        except FileNotFoundError:
+            raise KeyError(f"Şebeke bulunamadı: {grid}") from None
+        return index
+
+    def _save_index(self, grid: str, index: Dict[str, Any]):
+        with atomic_write(str(self.root / grid / INDEX_FILE)) as f:
+            f.write(json.dumps(index, indent=2).encode("utf-8"))
+
+
+def _lock(fd: int):
+    if fcntl is not None:
+        fcntl.flock(fd, fcntl.LOCK_EX)
+    else:
+        os.lseek(fd, 0, os.SEEK_SET)
+        msvcrt.locking(fd, msvcrt.LK_LOCK, 1)
+
+
+def _unlock(fd: int):
+    if fcntl is not None:
+        fcntl.flock(fd, fcntl.LOCK_UN)
+    else:
+        os.lseek(fd, 0, os.SEEK_SET)
+        msvcrt.locking(fd, msvcrt.LK_UNLCK, 1)
+
+
+def _column_index(header: List[str], column) -> int:
+    """Sütun adı veya indeksinden indeks"""
+    if isinstance(column, int) or str(column).isdigit():
+        return int(column)
+    try:
+        return header.index(column)
+    except ValueError:
+        raise ValueError(f"CSV sütunu bulunamadı: {column} ({header})") from None
+
+
+def parse_epochs(raw: List[str]) -> np.ndarray:
+    """
+    Zaman damgalarını Unix epoch saniyesine dönüştür (vektörel)
+
+    Sayısal değerler epoch kabul edilir; ISO 8601 dizgeleri numpy ile
+    toplu, saat dilimi ofseti içerenler tek tek çözülür.
+    """
+    try:
+        return np.asarray(raw, dtype=np.float64)
+    except ValueError:
+        pass
+
+    stripped = [s[:-1] if s.endswith("Z") else s for s in raw]
+    try:
+        return np.asarray(stripped, dtype="datetime64[ms]").astype(np.int64) / 1000.0
+    except ValueError:
+        epochs = []
+        for s in raw:
+            stamp = datetime.fromisoformat(s.replace("Z", "+00:00"))
+            if stamp.tzinfo is None:
+                stamp = stamp.replace(tzinfo=timezone.utc)
+            epochs.append(stamp.timestamp())
+        return np.asarray(epochs, dtype=np.float64)
+
+
+def _read_csv_chunks(csv_file: str, time_column, freq_column,
+                     chunk_rows: int) -> Iterable[Tuple[np.ndarray, np.ndarray]]:
+    """CSV'yi (epoch, frekans) dizi parçaları halinde oku; başlık satırı otomatik algılanır"""
+    with open(csv_file, "r", encoding="utf-8-sig", newline="") as f:
+        try:
+            dialect = csv.Sniffer().sniff(f.read(4096), delimiters=",;\t")
+        except csv.Error:
+            dialect = csv.excel
+        f.seek(0)
+        reader = csv.reader(f, dialect)
+
+        first = next(reader, None)
+        if first is None:
+            return
+
+        # Sütunlar adla verildiyse ilk satır başlıktır; indeksle verildiyse
+        # frekans hücresi sayı değilse başlıktır
+        if str(time_column).isdigit() and str(freq_column).isdigit():
+            try:
+                float(first[int(freq_column)])
+                header, rows = [], itertools.chain([first], reader)
+            except ValueError:
+                header, rows = first, reader
+        else:
+            header, rows = first, reader
+
+        time_index = _column_index(header, time_column)
+        freq_index = _column_index(header, freq_column)
+
+        times, values = [], []
+        for row in rows:
+            if not row:
+                continue
+            times.append(row[time_index].strip())
+            values.append(row[freq_index])
+            if len(times) >= chunk_rows:
+                yield parse_epochs(times), np.asarray(values, dtype=np.float32)
+                times, values = [], []
+
+        if times:
+            yield parse_epochs(times), np.asarray(values, dtype=np.float32)
+
+
+def main():
+    """Referans ENF deposu komut satırı aracı"""
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Referans ENF deposu")
+    parser.add_argument("--root", default="data/ground_truth/reference_enf", help="Depo dizini")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    ingest = subparsers.add_parser("ingest", help="Şebeke operatörü CSV dosyalarını içe aktar")
+    ingest.add_argument("grid", help="Şebeke adı (ör. EU50, US60)")
+    ingest.add_argument("files", nargs="+", help="CSV dosyaları (zaman sırasıyla)")
+    ingest.add_argument("--time-column", default="0", help="Zaman sütunu (ad veya indeks)")
+    ingest.add_argument("--freq-column", default="1", help="Frekans sütunu (ad veya indeks)")
+    ingest.add_argument("--rate", type=float, default=1.0, help="Örnekleme oranı (Hz)")
+    ingest.add_argument("--nominal", type=float, default=50.0, help="Nominal şebeke frekansı (Hz)")
+
+    subparsers.add_parser("info", help="Depodaki şebekeleri listele")
+
+    query = subparsers.add_parser("query", help="[t0, t1) aralığını .npy olarak dışa aktar")
+    query.add_argument("grid", help="Şebeke adı")
+    query.add_argument("t0", type=float, help="Başlangıç (Unix epoch, s)")
+    query.add_argument("t1", type=float, help="Bitiş (Unix epoch, s)")
+    query.add_argument("output", help="Çıktı .npy dosyası")
+
+    args = parser.parse_args()
+    store = ReferenceENFStore(args.root)
+
+    if args.command == "ingest":
+        for csv_file in args.files:
+            appended = store.ingest_csv(args.grid, csv_file, args.time_column, args.freq_column,
+                                        args.rate, args.nominal)
+            print(f"✅ {csv_file}: {appended} örnek eklendi")
+
+    if args.command in ("ingest", "info"):
+        for grid in store.grids():
+            info = store.info(grid)
+            start = datetime.fromtimestamp(info["start_epoch"], tz=timezone.utc).isoformat()
+            end = datetime.fromtimestamp(info["end_epoch"], tz=timezone.utc).isoformat()
+            print(f"📊 {grid}: {info['length']} örnek @ {info['rate']} Hz, {start} - {end}, "
+                  f"{len(info['gaps'])} boşluk")
+
+    elif args.command == "query":
+        start_time, samples = store.query(args.grid, args.t0, args.t1)
+        np.save(args.output, samples)
+        print(f"✅ {len(samples)} örnek ({start_time:.0f} itibarıyla) kaydedildi: {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,159 @@
+"""
+RIFF (WAV) Chunk Düzenleyici - Ses verisini taşımadan ENF chunk'ı gömme
+"""
+
+import os
+import struct
+from typing import BinaryIO, List, NamedTuple, Optional, Tuple
+
+ENF_CHUNK_ID = b"enf "
+JUNK_CHUNK_IDS = (b"JUNK", b"junk", b"PAD ")
+
+MIN_RESERVE = 4096
+
+
+class Chunk(NamedTuple):
+    """Dosyadaki bir RIFF chunk'ının konumu"""
+    id: bytes
+    offset: int
+    size: int
+
+    @property
+    def end(self) -> int:
+        # Tek boyutlu chunk'lar bir dolgu baytı ile çift sınıra hizalanır
+        return self.offset + 8 + self.size + (self.size & 1)
+
+
+def read_chunks(f: BinaryIO) -> Tuple[bytes, List[Chunk], int]:
+    """
+    RIFF dosyasının üst düzey chunk başlıklarını oku (içerik okunmaz)
+
+    Returns:
+        form_type: RIFF form türü (ör. b'WAVE')
+        chunks: Chunk listesi
+        riff_end: RIFF başlığına göre dosya sonu
+    """
+    f.seek(0)
+    header = f.read(12)
+    if len(header) < 12 or header[:4] != b"RIFF":
+        raise ValueError("Geçerli bir RIFF dosyası değil (RF64/RIFX desteklenmez)")
+
+    riff_size, form_type = struct.unpack("<I4s", header[4:])
+    file_size = os.fstat(f.fileno()).st_size
+    riff_end = min(8 + riff_size, file_size)
+
+    chunks = []
+    offset = 12
+    while offset + 8 <= riff_end:
+        f.seek(offset)
+        chunk_id, size = struct.unpack("<4sI", f.read(8))
+        chunk = Chunk(chunk_id, offset, size)
+        if chunk.offset + 8 + size > riff_end:
+            raise ValueError(f"Bozuk RIFF chunk'ı: {chunk_id!r} (ofset {offset}, boyut {size})")
+        chunks.append(chunk)
+        offset = chunk.end
+    return form_type, chunks, riff_end
+
+
+def _chunk_bytes(chunk_id: bytes, payload: bytes) -> bytes:
+    return struct.pack("<4sI", chunk_id, len(payload)) + payload + b"\x00" * (len(payload) & 1)
+
+
+def _junk_header(size: int) -> bytes:
+    """Toplam size baytlık (başlık dahil) JUNK chunk başlığı"""
+    return struct.pack("<4sI", b"JUNK", size - 8)
+
+
+def embed_riff_chunk(path: str, payload: bytes, chunk_id: bytes = ENF_CHUNK_ID,
+                     reserve: Optional[int] = None) -> str:
+    """
+    WAV dosyasına ENF chunk'ını yerinde yaz
+
+    Ses verisi (data chunk'ı) hiçbir durumda taşınmaz:
+      - mevcut chunk ve arkasındaki JUNK alanı yeni veriye yetiyorsa
+        oraya yazılır, artan kısım JUNK olarak kalır ('inplace'),
+      - yetmiyor ama chunk dosyanın sonundaysa orada büyütülür ('end'),
+      - aksi halde yeni chunk dosya sonuna eklenir ve eski chunk JUNK'a
+        çevrilir ('appended').
+    Eklenen chunk'ın arkasına reserve baytlık JUNK bırakılır, böylece
+    sonraki (biraz daha büyük) güncellemeler de sabit sürede yapılır.
+
+    Args:
+        path: WAV dosyası
+        payload: Gömülecek veri (ör. ENF JSON baytları)
+        chunk_id: Dört karakterlik chunk kimliği
+        reserve: Chunk arkasındaki JUNK alanı (varsayılan: max(4 KB, veri / 4))
+
+    Returns:
+        str: Kullanılan yöntem ('inplace', 'end' veya 'appended')
+    """
+    if reserve is None:
+        reserve = max(MIN_RESERVE, len(payload) // 4)
+    reserve += reserve & 1
+    new_chunk = _chunk_bytes(chunk_id, payload)
+
+    with open(path, "r+b") as f:
+        _, chunks, riff_end = read_chunks(f)
+
+        index = next((i for i, chunk in enumerate(chunks) if chunk.id == chunk_id), None)
+        span_start = span_end = None
+        if index is not None:
+            span_start = chunks[index].offset
+            span_end = chunks[index].end
+            following = index + 1
+            while following < len(chunks) and chunks[following].id in JUNK_CHUNK_IDS:
+                span_end = chunks[following].end
+                following += 1
+
+        spare = span_end - span_start - len(new_chunk) if index is not None else -1
+        if spare == 0 or spare >= 8:
+            method = "inplace"
+            f.seek(span_start)
+            f.write(new_chunk)
+            if spare:
+                f.write(_junk_header(spare))
+        elif index is not None and span_end == riff_end:
+            method = "end"
+            f.seek(span_start)
+            f.write(new_chunk + _junk_header(reserve + 8) + bytes(reserve))
+            f.truncate()
+        else:
+            method = "appended"
+            if riff_end != os.fstat(f.fileno()).st_size:
+                raise ValueError("RIFF boyutu dosya boyutuyla uyuşmuyor; chunk eklenemez")
+            if riff_end + len(new_chunk) + reserve + 8 > 0xFFFFFFFF + 8:
+                raise ValueError("RIFF 4 GB sınırı aşılıyor; chunk eklenemez")
+            f.seek(riff_end)
+            if chunks and chunks[-1].end > riff_end:
+                # Dolgu baytı yazılmamış tek boyutlu son chunk hizalanır
+                f.write(b"\x00")
+            f.write(new_chunk + _junk_header(reserve + 8) + bytes(reserve))
+            f.flush()
+            os.fsync(f.fileno())
+            if index is not None:
+                f.seek(span_start)
+                f.write(_junk_header(span_end - span_start))
+
+        # RIFF boyutu en son güncellenir (eklenen veri ancak bundan sonra geçerli sayılır)
+        file_size = f.seek(0, os.SEEK_END)
+        f.seek(4)
+        f.write(struct.pack("<I", file_size - 8))
+        f.flush()
+        os.fsync(f.fileno())
+    return method
+
+
+def read_riff_chunk(path: str, chunk_id: bytes = ENF_CHUNK_ID) -> Optional[bytes]:
+    """
+    ENF chunk'ının içeriğini oku (yalnızca chunk başlıkları gezilir)
+
+    Returns:
+        bytes: Chunk içeriği veya None
+    """
+    with open(path, "rb") as f:
+        _, chunks, _ = read_chunks(f)
+        for chunk in chunks:
+            if chunk.id == chunk_id:
+                f.seek(chunk.offset + 8)
+                return f.read(chunk.size)
+    return None
@@ -0,0 +1,298 @@
+"""
+ENF Spektral Yardımcıları - Ortak ön işleme ve spektral analiz fonksiyonları
+"""
+
+from typing import Optional, Tuple
+
+import numpy as np
+
+
+def decimation_factor(sample_rate: float, target_rate: Optional[float],
+                      min_rate: float = 0.0) -> int:
+    """
+    Hedef örnekleme oranına inmek için tam sayı seyreltme (decimation) katsayısı
+
+    Args:
+        sample_rate: Orijinal örnekleme frekansı (Hz)
+        target_rate: Yaklaşık hedef örnekleme frekansı (Hz), None ise seyreltme yok
+        min_rate: İzin verilen en düşük örnekleme frekansı (ör. 2 x üst kesim)
+
+    Returns:
+        int: Seyreltme katsayısı (1 = seyreltme yok)
+    """
+    if not target_rate or target_rate >= sample_rate:
+        return 1
+
+    q = max(1, int(sample_rate // target_rate))
+    while q > 1 and sample_rate / q <= min_rate:
+        q -= 1
+    return q
+
+
+def design_decimation_filter(q: int) -> np.ndarray:
+    """
+    Çok fazlı (polyphase) seyreltme için alias önleyici FIR filtre
+
+    scipy.signal.resample_poly'nin varsayılan tasarımıyla aynıdır
+    (Kaiser penceresi, beta=5.0, yarı uzunluk 10 * q).
+    """
+    from scipy import signal
+
+    half_len = 10 * q
+    return signal.firwin(2 * half_len + 1, 1.0 / q, window=('kaiser', 5.0))
+
+
+def decimate(audio_data: np.ndarray, q: int) -> np.ndarray:
+    """
+    Sinyali alias önleyici çok fazlı FIR ile q kat seyrelt
+
+    Args:
+        audio_data: Giriş sinyali
+        q: Seyreltme katsayısı
+
+    Returns:
+        np.ndarray: Seyreltilmiş sinyal (ceil(len / q) örnek)
+    """
+    if q <= 1:
+        return audio_data
+
+    from scipy import signal
+
+    h = design_decimation_filter(q)
+    return signal.resample_poly(audio_data, 1, q, window=h).astype(audio_data.dtype, copy=False)
+
+
+class StreamingDecimator:
+    """
+    Blok blok çalışan, decimate() ile birebir aynı çıktıyı veren seyreltici
+
+    Son len(h) - 1 giriş örneği bloklar arasında taşınır ve yalnızca gereken
+    çıktılar çok fazlı (upfirdn) olarak hesaplanır; resample_poly'nin sıfır
+    fazlı hizalaması için ilk half_len çıktı atlanır ve flush() ile sona
+    half_len sıfır eklenir.
+    """
+
+    def __init__(self, q: int):
+        self.q = q
+        self.h = design_decimation_filter(q) if q > 1 else np.ones(1)
+        self.half_len = (len(self.h) - 1) // 2
+        self._history = np.zeros(len(self.h) - 1, dtype=np.float32)
+        # Bir sonraki çıktının nedensel (causal) filtre çıkışındaki konumu
+        self._next_index = self.half_len
+        self._consumed = 0
+
+    def process(self, block: np.ndarray) -> np.ndarray:
+        """Bir bloğu filtrele ve seyreltilmiş örnekleri döndür"""
+        if self.q <= 1:
+            return block
+
+        buf = np.concatenate([self._history, block.astype(np.float32, copy=False)])
+        end = self._consumed + len(block)
+        n_out = max(0, -(-(end - self._next_index) // self.q))
+
+        out = np.zeros(0, dtype=np.float32)
+        if n_out > 0:
+            # buf[0] global olarak (consumed - len(h) + 1) konumunda; başa sıfır
+            # eklemek yalnızca kaydırma yapar, böylece istenen konumlar q'ya bölünür
+            pos0 = self._next_index - self._consumed + len(self._history)
+            from scipy.signal import upfirdn
+
+            pad = (-pos0) % self.q
+            y = upfirdn(self.h, np.concatenate([np.zeros(pad, dtype=np.float32), buf]), 1, self.q)
+            k0 = (pos0 + pad) // self.q
+            out = y[k0:k0 + n_out].astype(np.float32)
+
+        self._history = buf[len(buf) - len(self._history):]
+        self._next_index += n_out * self.q
+        self._consumed = end
+        return out
+
+    def flush(self) -> np.ndarray:
+        """Kalan örnekleri üret (giriş sonuna half_len sıfır ekleyerek)"""
+        if self.q <= 1:
+            return np.zeros(0, dtype=np.float32)
+
+        n_out_total = -(-self._consumed // self.q)
+        n_emitted = (self._next_index - self.half_len) // self.q
+
+        tail = self.process(np.zeros(self.half_len, dtype=np.float32))
+        return tail[:max(0, n_out_total - n_emitted)]
+
+
+def track_peaks(power: np.ndarray, freqs: np.ndarray, default_freq: float,
+                interpolation: Optional[str] = None,
+                zero_power_default: bool = True) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Spektrogramın tüm zaman dilimleri için tepe frekansını tek geçişte bul
+
+    Args:
+        power: Güç spektrumu (frekans x zaman)
+        freqs: Satırlara karşılık gelen frekanslar (eşit aralıklı)
+        default_freq: Boş spektrumda (veya sıfır güçte) kullanılacak frekans
+        interpolation: Alt-bin kestirimi: None, 'parabolic' veya 'gaussian'
+        zero_power_default: True ise toplam gücü sıfır olan dilimlere
+            default_freq atanır, False ise argmax bin'i korunur
+
+    Returns:
+        frequencies: Tepe frekansları
+        confidence: Güven skorları (tepe gücü / toplam güç)
+    """
+    n_bins, n_frames = power.shape
+    if n_bins == 0:
+        return np.full(n_frames, default_freq, dtype=float), np.zeros(n_frames)
+
+    peak_idx = np.argmax(power, axis=0)
+    columns = np.arange(n_frames)
+    peak_power = power[peak_idx, columns]
+    total_power = np.sum(power, axis=0)
+
+    valid = total_power > 0
+    confidence = np.zeros(n_frames)
+    np.divide(peak_power, total_power, out=confidence, where=valid)
+
+    frequencies = np.asarray(freqs, dtype=float)[peak_idx]
+    if interpolation is not None and n_bins >= 3:
+        frequencies = frequencies + _subbin_offset(power, peak_idx, interpolation) * (freqs[1] - freqs[0])
+
+    if zero_power_default:
+        frequencies = np.where(valid, frequencies, default_freq)
+
+    return frequencies, confidence
+
+
+def _subbin_offset(power: np.ndarray, peak_idx: np.ndarray, interpolation: str) -> np.ndarray:
+    """Tepe bin'i ve komşularından parabolik / Gauss alt-bin kaydırması (bin cinsinden)"""
+    n_bins, n_frames = power.shape
+    columns = np.arange(n_frames)
+
+    # Kenar bin'lerde komşu olmadığından kaydırma 0
+    inner = (peak_idx > 0) & (peak_idx < n_bins - 1)
+    k = np.clip(peak_idx, 1, n_bins - 2)
+    alpha = power[k - 1, columns]
+    beta = power[k, columns]
+    gamma = power[k + 1, columns]
+
+    if interpolation == 'gaussian':
+        tiny = np.finfo(float).tiny
+        alpha, beta, gamma = (np.log(np.maximum(v, tiny)) for v in (alpha, beta, gamma))
+    elif interpolation != 'parabolic':
+        raise ValueError(f"Desteklenmeyen interpolasyon: {interpolation}")
+
+    denom = alpha - 2 * beta + gamma
+    offset = np.zeros(n_frames)
+    np.divide(0.5 * (alpha - gamma), denom, out=offset, where=inner & (denom != 0))
+    return np.clip(offset, -0.5, 0.5)
+
+
+def frame_signal(audio_data: np.ndarray, n_fft: int, hop_length: int) -> np.ndarray:
+    """
+    Sinyali librosa.stft(center=True, pad_mode='constant') hizalamasıyla çerçevele
+
+    Returns:
+        np.ndarray: (çerçeve x n_fft) boyutlu kopyasız görünüm
+    """
+    padded = np.pad(audio_data, n_fft // 2, mode='constant')
+    return np.lib.stride_tricks.sliding_window_view(padded, n_fft)[::hop_length]
+
+
+def make_zoom_transform(n_fft: int, band: Tuple[float, float], resolution: float,
+                        sample_rate: float) -> Tuple["signal.ZoomFFT", np.ndarray]:
+    """
+    Yalnızca ilgi bandını değerlendiren chirp-z (zoom FFT) dönüşümü hazırla
+
+    Args:
+        n_fft: Çerçeve uzunluğu (örnek)
+        band: Değerlendirilecek frekans bandı (Hz), uçlar dahil
+        resolution: Frekans adımı (Hz), ör. 0.001
+        sample_rate: Örnekleme frekansı (Hz)
+
+    Returns:
+        transform: Çerçevelere (son eksen) uygulanacak ZoomFFT nesnesi
+        freqs: Çıktı bin frekansları
+    """
+    from scipy import signal
+
+    f_lo, f_hi = band
+    m = int(round((f_hi - f_lo) / resolution)) + 1
+    transform = signal.ZoomFFT(n_fft, [f_lo, f_hi], m, fs=sample_rate, endpoint=True)
+    return transform, np.linspace(f_lo, f_hi, m)
+
+
+def _iter_zoom_power(audio_data: np.ndarray, sample_rate: float, n_fft: int, hop_length: int,
+                     band: Tuple[float, float], resolution: float, batch_frames: int):
+    """Zoom FFT güç spektrumunu batch_frames'lik çerçeve grupları halinde üret"""
+    from scipy.signal import get_window
+
+    transform, freqs = make_zoom_transform(n_fft, band, resolution, sample_rate)
+    window = get_window('hann', n_fft, fftbins=True).astype(np.float32)
+    frames = frame_signal(audio_data, n_fft, hop_length)
+
+    def batches():
+        for start in range(0, len(frames), batch_frames):
+            batch = frames[start:start + batch_frames] * window
+            # float64: ince ızgarada komşu bin güçleri float32'de eşitlenip tepe seçimini bozar
+            yield start, (np.abs(transform(batch, axis=-1)).astype(np.float64) ** 2).T
+
+    times = np.arange(len(frames)) * hop_length / sample_rate
+    return freqs, times, batches()
+
+
+def zoom_spectrogram(audio_data: np.ndarray, sample_rate: float, n_fft: int, hop_length: int,
+                     band: Tuple[float, float], resolution: float,
+                     batch_frames: int = 2048) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Bant sınırlı güç spektrogramı (librosa.stft yerine zoom FFT)
+
+    Çerçeveler batch_frames'lik gruplar halinde dönüştürülür; dönen güç
+    matrisi ise (bin x çerçeve) boyutundadır ve kayıt uzunluğuyla büyür.
+    Yalnızca tepe izi gerekiyorsa zoom_peak_track kullanılmalıdır.
+
+    Returns:
+        power: Güç spektrumu (band bin'i x zaman)
+        freqs: Frekans ekseni
+        times: Zaman ekseni (çerçeve merkezleri)
+    """
+    freqs, times, batches = _iter_zoom_power(audio_data, sample_rate, n_fft, hop_length,
+                                             band, resolution, batch_frames)
+    power = np.empty((len(freqs), len(times)))
+    for start, batch_power in batches:
+        power[:, start:start + batch_power.shape[1]] = batch_power
+    return power, freqs, times
+
+
+def zoom_peak_track(audio_data: np.ndarray, sample_rate: float, n_fft: int, hop_length: int,
+                    band: Tuple[float, float], resolution: float, default_freq: float,
+                    interpolation: Optional[str] = None, zero_power_default: bool = True,
+                    track_range: Optional[Tuple[float, float]] = None,
+                    batch_frames: int = 2048) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Zoom FFT ile tepe izi (güç matrisi oluşturulmadan)
+
+    Her çerçeve grubunda track_peaks çalıştırılır ve yalnızca çerçeve başına
+    tepe frekansı ile güven skoru tutulur; ara bellek batch_frames x bin
+    sayısıyla sınırlıdır. Sonuç zoom_spectrogram + track_peaks ile aynıdır.
+
+    Args:
+        default_freq, interpolation, zero_power_default: track_peaks'e aktarılır
+        track_range: Tepe aranacak aralık (Hz); bantta bin yoksa tüm bant kullanılır
+
+    Returns:
+        frequencies: Tepe frekansları
+        confidence: Güven skorları
+        times: Zaman ekseni (çerçeve merkezleri)
+    """
+    freqs, times, batches = _iter_zoom_power(audio_data, sample_rate, n_fft, hop_length,
+                                             band, resolution, batch_frames)
+    rows = slice(None)
+    if track_range is not None:
+        mask = (freqs >= track_range[0]) & (freqs <= track_range[1])
+        if np.any(mask):
+            rows = mask
+
+    frequencies = np.empty(len(times))
+    confidence = np.empty(len(times))
+    for start, batch_power in batches:
+        stop = start + batch_power.shape[1]
+        frequencies[start:stop], confidence[start:stop] = track_peaks(
+            batch_power[rows], freqs[rows], default_freq, interpolation, zero_power_default)
+    return frequencies, confidence, times
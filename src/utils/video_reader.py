@@ -0,0 +1,208 @@
+"""
+Video Kare Okuyucu - Arka plan iş parçacığında önden okumalı (prefetch) kod çözme
+"""
+
+import queue
+import subprocess
+import threading
+from typing import Iterator, Optional, Tuple
+
+import numpy as np
+
+_END = object()
+
+
+class VideoFrameReader:
+    """
+    Video karelerini arka plan iş parçacığında çözüp sınırlı kuyrukta sunar
+
+    Kod çözme, ROI kırpma ve gri dönüşüm okuyucu iş parçacığında yapılır
+    (OpenCV ve ffmpeg GIL'i serbest bırakır), böylece analiz ana iş
+    parçacığında kod çözmeyle eşzamanlı ilerler. Kuyruk dolduğunda okuyucu
+    bekler; bellek kullanımı queue_size kare ile sınırlıdır.
+
+    backend='ffmpeg' ise kareler `ffmpeg -f rawvideo` borusundan doğrudan
+    gri (parlaklık düzlemi) veya küçültülmüş olarak okunur; renkli kare hiç
+    oluşturulmaz ve boru üzerinden aktarılan veri 3 kat (ölçekleme ile daha
+    da) azalır.
+    """
+
+    def __init__(self, video_file: str, roi: Optional[Tuple[int, int, int, int]] = None,
+                 gray: bool = True, scale: Optional[Tuple[int, int]] = None,
+                 backend: str = 'opencv', queue_size: int = 32, ffmpeg_binary: str = 'ffmpeg'):
+        """
+        Args:
+            video_file: Video dosyası yolu
+            roi: İlgi alanı (x, y, width, height), dönüşümlerden önce uygulanır
+            gray: True ise tek kanallı (H x W) gri kare, False ise BGR (H x W x 3)
+            scale: ROI sonrası hedef boyut (width, height)
+            backend: 'opencv' (cv2.VideoCapture) veya 'ffmpeg' (rawvideo borusu)
+            queue_size: Önden okunan en fazla kare sayısı
+            ffmpeg_binary: ffmpeg çalıştırılabilir dosyası
+        """
+        import cv2
+
+        if backend not in ('opencv', 'ffmpeg'):
+            raise ValueError(f"Bilinmeyen video arka ucu: {backend}")
+
+        # Kare hızı ve boyutu OpenCV ile okunur (ffprobe gerektirmez)
+        probe = cv2.VideoCapture(video_file)
+        self.fps = probe.get(cv2.CAP_PROP_FPS)
+        width = int(probe.get(cv2.CAP_PROP_FRAME_WIDTH))
+        height = int(probe.get(cv2.CAP_PROP_FRAME_HEIGHT))
+        self.frame_count = int(probe.get(cv2.CAP_PROP_FRAME_COUNT))
+        opened = probe.isOpened()
+        probe.release()
+        if not opened or not self.fps:
+            raise ValueError(f"Video açılamadı veya kare hızı okunamadı: {video_file}")
+
+        if roi:
+            x, y, w, h = roi
+            width, height = min(w, width - x), min(h, height - y)
+        self._crop_size = (width, height)
+        if scale:
+            width, height = scale
+
+        self.video_file = video_file
+        self.roi = roi
+        self.gray = gray
+        self.scale = scale
+        self.backend = backend
+        self.ffmpeg_binary = ffmpeg_binary
+        self.frame_size = (width, height)
+
+        self._queue = queue.Queue(maxsize=queue_size)
+        self._stop = threading.Event()
+        self._thread = None
+        self._process = None
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def __iter__(self) -> Iterator[np.ndarray]:
+        if self._thread is None:
+            self.start()
+
+        while True:
+            item = self._queue.get()
+            if item is _END:
+                return
+            if isinstance(item, BaseException):
+                raise item
+            yield item
+
+    def start(self):
+        """Okuyucu iş parçacığını başlat"""
+        target = self._read_ffmpeg if self.backend == 'ffmpeg' else self._read_opencv
+        self._thread = threading.Thread(target=self._run, args=(target,), daemon=True)
+        self._thread.start()
+
+    def close(self):
+        """Okumayı durdur, kuyruğu boşalt ve kaynakları serbest bırak"""
+        self._stop.set()
+        if self._process is not None:
+            self._process.kill()
+        if self._thread is not None:
+            while self._thread.is_alive():
+                try:
+                    self._queue.get(timeout=0.1)
+                except queue.Empty:
+                    pass
+            self._thread.join()
+            self._thread = None
+        if self._process is not None:
+            self._process.wait()
+            self._process.stdout.close()
+            self._process = None
+
+    def _put(self, item) -> bool:
+        """Kuyruğa ekle; durdurulduysa False döndür"""
+        while not self._stop.is_set():
+            try:
+                self._queue.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def _run(self, target):
+        try:
+            target()
+        except BaseException as e:
+            self._put(e)
+        else:
+            self._put(_END)
+
+    def _read_opencv(self):
+        import cv2
+
+        cap = cv2.VideoCapture(self.video_file)
+        try:
+            while not self._stop.is_set():
+                ret, frame = cap.read()
+                if not ret:
+                    break
+
+                if self.roi:
+                    x, y, w, h = self.roi
+                    frame = frame[y:y+h, x:x+w]
+                if self.scale:
+                    frame = cv2.resize(frame, self.scale, interpolation=cv2.INTER_AREA)
+                if self.gray:
+                    frame = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+
+                if not self._put(frame):
+                    break
+        finally:
+            cap.release()
+
+    def _read_ffmpeg(self):
+        width, height = self.frame_size
+        channels = 1 if self.gray else 3
+
+        filters = []
+        if self.roi:
+            x, y, _, _ = self.roi
+            filters.append(f"crop={self._crop_size[0]}:{self._crop_size[1]}:{x}:{y}")
+        if self.gray:
+            # Y düzlemi doğrudan kopyalanır (swscale renk dönüşümü yok);
+            # YUV 4:2:0 girişte format filtresi işlem yapmaz
+            filters.append("format=yuv420p,extractplanes=y")
+        if self.scale:
+            filters.append(f"scale={width}:{height}:flags=area")
+
+        cmd = [self.ffmpeg_binary, '-v', 'error', '-nostdin', '-i', self.video_file]
+        if filters:
+            cmd += ['-vf', ','.join(filters)]
+        cmd += ['-f', 'rawvideo', '-pix_fmt', 'gray' if self.gray else 'bgr24', '-']
+
+        self._process = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL,
+                                         bufsize=width * height * channels * 4)
+        frame_bytes = width * height * channels
+        shape = (height, width) if self.gray else (height, width, 3)
+
+        try:
+            while not self._stop.is_set():
+                buffer = bytearray(frame_bytes)
+                view = memoryview(buffer)
+                filled = 0
+                while filled < frame_bytes:
+                    n = self._process.stdout.readinto(view[filled:])
+                    if not n:
+                        break
+                    filled += n
+                if filled < frame_bytes:
+                    break
+
+                if not self._put(np.frombuffer(buffer, dtype=np.uint8).reshape(shape)):
+                    break
+        finally:
+            if self._stop.is_set():
+                self._process.kill()
+
+        if self._process.wait() != 0 and not self._stop.is_set():
+            raise RuntimeError(f"ffmpeg kod çözme hatası (çıkış kodu {self._process.returncode})")
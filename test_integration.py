@@ -14,6 +14,17 @@ sys.path.append('src')
 from utils.enf_extractor import ENFExtractor
 from utils.metadata_embedder import MetadataEmbedder
 
+# Kısa ömürlü komutlar (checksum doğrulama, metadata okuma) için import süresi bütçeleri (s)
+IMPORT_TIME_BUDGETS = {
+    "data_collector": 0.5,
+    "utils.metadata_embedder": 0.5,
+    "enf_extract_audio": 1.0,
+    "utils.enf_extractor": 1.0,
+    "batch_extract": 0.5,
+    "ingest_daemon": 0.5
+}
+HEAVY_MODULES = ["librosa", "cv2", "matplotlib", "scipy", "mutagen", "PIL", "piexif", "pydub"]
+
 def create_test_audio():
     """Test için ses dosyası oluştur"""
     print("🎵 Test ses dosyası oluşturuluyor...")
@@ -61,6 +72,22 @@ def create_test_image():
     print(f"✅ Test görüntü dosyası oluşturuldu: {test_file}")
     return test_file
 
+def create_enf_wav(file_path, duration, fs=44100):
+    """Yavaş değişen 50 Hz ENF tonu içeren 16-bit mono WAV yaz"""
+    import wave
+    
+    t = np.arange(int(fs * duration)) / fs
+    enf_freq = 50 + 0.05 * np.sin(2 * np.pi * t / 20)
+    audio_signal = 0.3 * np.sin(2 * np.pi * np.cumsum(enf_freq) / fs)
+    audio_signal += 0.01 * np.random.default_rng(0).standard_normal(len(t))
+    
+    with wave.open(str(file_path), 'wb') as wav_file:
+        wav_file.setnchannels(1)
+        wav_file.setsampwidth(2)
+        wav_file.setframerate(fs)
+        wav_file.writeframes((audio_signal * 32767).astype(np.int16).tobytes())
+    return file_path
+
 def test_enf_extraction():
     """ENF çıkarma testi"""
     print("\n🔍 ENF Çıkarma Testi")
@@ -172,6 +199,1206 @@ def test_metadata_extraction():
         else:
             print("❌ Görüntü dosyasından veri çıkarma başarısız")
 
+def test_streaming_matches_in_memory(tmp_path):
+    """Akış modu ile bellek içi yol aynı filtreyi ve aynı tepe izini üretmeli"""
+    print("\n🌊 Akış / Bellek İçi Eşdeğerlik Testi")
+    print("=" * 40)
+    
+    from enf_extract_audio import ENFAudioExtractor
+    
+    wav_file = create_enf_wav(tmp_path / "akis.wav", 40)
+    
+    for decimate_to in (None, 1000):
+        extractor = ENFAudioExtractor(decimate_to=decimate_to)
+        extractor.peak_interpolation = 'parabolic'
+        in_memory = extractor.compute_peak_track(wav_file)
+        
+        # Çerçeve hızındaki izler (tek sayılı blok boyutu ile)
+        chunks = list(extractor.iter_enf_frames(wav_file, block_size=50001))
+        frame_freqs = np.concatenate([chunk[0] for chunk in chunks])
+        frame_times = np.concatenate([chunk[2] for chunk in chunks])
+        assert len(frame_freqs) == len(in_memory["peak_freqs"])
+        assert np.allclose(frame_times, in_memory["peak_times"])
+        assert np.allclose(frame_freqs, in_memory["peak_freqs"], atol=1e-6)
+        
+        # Akış modu doğrudan 1 Hz eğri döndürür (çerçeve dizileri biriktirilmez)
+        streaming = extractor.compute_peak_track(wav_file, streaming=True, block_size=50001)
+        resampled, resampled_times = extractor.resample_to_1hz(in_memory["peak_freqs"], in_memory["peak_times"])
+        assert streaming["resampled"] and len(streaming["peak_freqs"]) == 40
+        assert np.array_equal(streaming["peak_times"], resampled_times)
+        assert np.allclose(streaming["peak_freqs"], resampled, atol=1e-6)
+    
+    # Kaydedilen güven skorları her iki modda da time_stamps ile aynı 1 Hz ızgarasında
+    import json
+    extractor.save_plot = False
+    saved = {}
+    for mode in (False, True):
+        result = extractor.extract_enf_from_audio(wav_file, str(tmp_path / f"cikti_{mode}"), streaming=mode,
+                                                  block_size=50001)
+        with open(result["output_files"]["results"], encoding="utf-8") as f:
+            saved[mode] = json.load(f)["enf_data"]
+        assert len(saved[mode]["confidence_scores"]) == len(saved[mode]["time_stamps"]) == 40
+    assert np.allclose(saved[False]["confidence_scores"], saved[True]["confidence_scores"], atol=1e-6)
+    
+    print("✅ Akış modu bellek içi yolla aynı sonucu verdi")
+
+def test_streaming_decimator():
+    """Blok blok seyreltme tek seferlik decimate() ile aynı; katsayı tam sayıya yuvarlanır"""
+    print("\n📉 Akış Seyreltici Testi")
+    print("=" * 40)
+    
+    from utils.spectral import StreamingDecimator, decimate, decimation_factor
+    
+    # Tam bölünmeyen oranlar aşağı yuvarlanır, min_rate altına inilmez
+    assert decimation_factor(44100, 1000) == 44
+    assert decimation_factor(48000, 1000) == 48
+    assert decimation_factor(44100, 1000.5) == 44
+    assert decimation_factor(44100, 100, min_rate=110) == 400 and 44100 / 400 > 110
+    assert decimation_factor(44100, None) == 1 and decimation_factor(8000, 16000) == 1
+    
+    audio = np.random.default_rng(1).standard_normal(100_003).astype(np.float32)
+    for q in (3, 44):
+        expected = decimate(audio, q)
+        for block_sizes in ((997,), (1, 2, 4099), (44101,)):
+            decimator = StreamingDecimator(q)
+            parts, position, index = [], 0, 0
+            while position < len(audio):
+                size = block_sizes[index % len(block_sizes)]
+                parts.append(decimator.process(audio[position:position + size]))
+                position += size
+                index += 1
+            parts.append(decimator.flush())
+            streamed = np.concatenate(parts)
+            assert len(streamed) == len(expected) == -(-len(audio) // q)
+            assert np.allclose(streamed, expected, atol=1e-5)
+    
+    print("✅ Akış seyreltici decimate() ile aynı")
+
+def test_vectorized_peak_tracker():
+    """Vektörel tepe takibi testi"""
+    print("\n📈 Vektörel Tepe Takibi Testi")
+    print("=" * 40)
+    
+    from utils.spectral import track_peaks
+    
+    freqs = np.linspace(49.0, 51.0, 5)
+    power = np.array([
+        [0.0, 1.0, 0.0],
+        [0.0, 2.0, 1.0],
+        [0.0, 4.0, 3.0],
+        [0.0, 2.0, 1.0],
+        [0.0, 1.0, 5.0]
+    ])
+    
+    # Sıfır güçlü dilime varsayılan frekans atanmalı
+    frequencies, confidence = track_peaks(power, freqs, 50.0)
+    assert np.allclose(frequencies, [50.0, 50.0, 51.0])
+    assert np.allclose(confidence, [0.0, 0.4, 0.5])
+    
+    # Simetrik tepe için parabolik kaydırma 0, boş spektrum varsayılana döner
+    frequencies, _ = track_peaks(power, freqs, 50.0, interpolation='parabolic')
+    assert frequencies[1] == 50.0
+    frequencies, confidence = track_peaks(np.zeros((0, 4)), freqs[:0], 50.0)
+    assert np.all(frequencies == 50.0) and np.all(confidence == 0.0)
+    
+    print("✅ Vektörel tepe takibi doğrulandı")
+
+def test_zoom_fft_engine(tmp_path):
+    """Zoom FFT: doğrudan DFT ile aynı, STFT tepesiyle tutarlı, akış modunda aynı"""
+    print("\n🔍 Zoom FFT Testi")
+    print("=" * 40)
+    
+    from enf_extract_audio import ENFAudioExtractor
+    import tracemalloc
+    from utils.spectral import make_zoom_transform, track_peaks, zoom_peak_track, zoom_spectrogram
+    
+    fs, n_fft, tone = 1000.0, 4096, 50.123
+    audio = np.sin(2 * np.pi * tone * np.arange(int(20 * fs)) / fs)
+    
+    # Dönüşüm, bant içindeki frekanslarda doğrudan DFT toplamına eşit
+    transform, freqs = make_zoom_transform(n_fft, (49.0, 51.0), 0.01, fs)
+    frame = audio[:n_fft]
+    direct = np.exp(-2j * np.pi * np.outer(freqs, np.arange(n_fft)) / fs) @ frame
+    assert np.allclose(transform(frame, axis=-1), direct, atol=1e-6 * np.abs(direct).max())
+    
+    # Zoom tepesi tona 1 mHz içinde yakın, STFT tepesi (0.24 Hz bin) ile tutarlı
+    power, freqs, times = zoom_spectrogram(audio, fs, n_fft, 1024, (45.0, 55.0), 0.001)
+    zoom_peaks, _ = track_peaks(power, freqs, 50.0)
+    stft_power = np.abs(np.fft.rfft(frame * np.hanning(n_fft + 1)[:-1])) ** 2
+    stft_freqs = np.fft.rfftfreq(n_fft, 1.0 / fs)
+    stft_peak, _ = track_peaks(stft_power[:, None], stft_freqs, 50.0, interpolation='parabolic')
+    inner = zoom_peaks[2:-2]  # kenar çerçeveleri sıfır dolgulu
+    assert np.all(np.abs(inner - tone) <= 0.001)
+    assert abs(stft_peak[0] - tone) < fs / n_fft / 2
+    assert np.all(np.abs(inner - stft_peak[0]) < fs / n_fft / 2)
+    
+    # Grup grup tepe takibi tam matrisle aynı sonucu verir, bellek matris boyutuna ulaşmaz
+    reference = track_peaks(power, freqs, 50.0, interpolation='parabolic')
+    tracked = zoom_peak_track(audio, fs, n_fft, 1024, (45.0, 55.0), 0.001, 50.0,
+                              interpolation='parabolic', batch_frames=3)
+    assert np.array_equal(tracked[0], reference[0]) and np.allclose(tracked[1], reference[1], rtol=1e-12)
+    assert np.array_equal(tracked[2], times)
+    tracemalloc.start()
+    _, _, dense_times = zoom_peak_track(audio, fs, n_fft, 32, (45.0, 55.0), 0.001, 50.0, batch_frames=16)
+    peak_bytes = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    assert peak_bytes < len(freqs) * len(dense_times) * 8 / 4
+    
+    # Akış modunda zoom, bellek içi zoom ile aynı tepe izini verir
+    wav_file = create_enf_wav(tmp_path / "zoom.wav", 20)
+    extractor = ENFAudioExtractor()
+    extractor.spectral_engine = 'zoom'
+    in_memory = extractor.compute_peak_track(wav_file)
+    chunks = list(extractor.iter_enf_frames(wav_file, block_size=50001))
+    assert np.allclose(np.concatenate([chunk[0] for chunk in chunks]), in_memory["peak_freqs"], atol=1e-6)
+    
+    print("✅ Zoom FFT motoru doğrulandı")
+
+def test_batch_extract_fault_isolation(tmp_path, monkeypatch):
+    """Toplu çıkarım: takılan dosya zaman aşımına, çöken dosya yalıtılmış yeniden denemeye düşer"""
+    print("\n🧯 Toplu Çıkarım Hata Yalıtımı Testi")
+    print("=" * 40)
+    
+    import signal
+    import time
+    import enf_extract_audio
+    from batch_extract import BatchExtractor
+    
+    # Süreç havuzu fork ile başladığı için işçiler yamalı sınıfı görür
+    def fake_extract(self, file_path, output_dir, streaming=False, file_hash=None):
+        name = os.path.basename(file_path)
+        if name.startswith("takilan"):
+            time.sleep(60)
+        if name.startswith("coken"):
+            os.kill(os.getpid(), signal.SIGKILL)
+        return {"status": "success", "output_files": {"results": None}, "performance": None}
+    
+    monkeypatch.setattr(enf_extract_audio.ENFAudioExtractor, "extract_enf_from_audio", fake_extract)
+    
+    names = ["iyi_1.wav", "takilan.wav", "iyi_2.wav", "coken.wav", "iyi_3.wav"]
+    files = [create_enf_wav(tmp_path / name, 1, fs=8000) for name in names]
+    
+    start = time.monotonic()
+    summary = BatchExtractor(base_dir=tmp_path, workers=2, timeout=1.0).run(files)
+    statuses = {os.path.basename(r["file"]): r["status"] for r in summary["results"]}
+    
+    assert statuses == {"iyi_1.wav": "success", "iyi_2.wav": "success", "iyi_3.wav": "success",
+                        "takilan.wav": "timeout", "coken.wav": "crashed"}
+    assert summary["succeeded"] == 3 and summary["failed"] == 2
+    assert time.monotonic() - start < 30
+    
+    print("✅ Yalnızca takılan ve çöken dosyalar başarısız sayıldı")
+
+def test_enf_cache(tmp_path):
+    """Ön uç önbelleği: isabet / ıska, parametre değişimi, LRU çıkarma, bozuk giriş"""
+    print("\n🗄️  ENF Önbellek Testi")
+    print("=" * 40)
+    
+    import hashlib
+    import time
+    from concurrent.futures import ThreadPoolExecutor
+    from utils.enf_cache import ENFCache
+    
+    cache = ENFCache(tmp_path / "onbellek", max_bytes=10 ** 9)
+    source = tmp_path / "kayit.wav"
+    source.write_bytes(b"kayit" * 1000)
+    file_hash = cache.file_hash(source)
+    assert file_hash == hashlib.sha256(source.read_bytes()).hexdigest()
+    
+    # Iska, yazma, isabet; aşama parametresi değişince anahtar değişir
+    params = {"window_size": 1024, "spectral_engine": "stft"}
+    key = cache.make_key(file_hash, params)
+    assert cache.load(key) is None
+    track = {"peak_freqs": np.linspace(49.9, 50.1, 100), "confidence": np.ones(100)}
+    cache.store(key, **track)
+    loaded = cache.load(key)
+    assert all(np.array_equal(loaded[name], track[name]) for name in track)
+    assert cache.make_key(file_hash, dict(params, window_size=2048)) != key
+    assert cache.load(cache.make_key(file_hash, dict(params, spectral_engine="zoom"))) is None
+    
+    # Dosya değişince hash kaydı yenilenir; paralel hash'lemede kayıtlar birbirini ezmez
+    source.write_bytes(b"degisti")
+    assert cache.file_hash(source) == hashlib.sha256(b"degisti").hexdigest()
+    sources = []
+    for n in range(16):
+        sources.append(tmp_path / f"paralel_{n}.wav")
+        sources[-1].write_bytes(bytes([n]) * 100)
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        list(executor.map(cache.file_hash, sources))
+    assert len(list(cache.hash_dir.glob("*.json"))) == 17
+    
+    # Yarım yazılmış giriş hata vermez, silinir ve ıska sayılır
+    entry_file = cache._entry_path(key)
+    entry_file.write_bytes(entry_file.read_bytes()[:200])
+    assert cache.load(key) is None and not entry_file.exists()
+    
+    # LRU: boyut sınırı aşılınca en eski erişilen girişler silinir
+    small = ENFCache(tmp_path / "kucuk", max_bytes=3 * 8500)
+    keys = [small.make_key(f"{n:064x}", params) for n in range(4)]
+    for n, entry_key in enumerate(keys[:3]):
+        small.store(entry_key, data=np.zeros(1000))
+        os.utime(small._entry_path(entry_key), ns=(n * 10 ** 9, n * 10 ** 9))
+    assert small.load(keys[0]) is not None  # erişim keys[0]'ı en yeni yapar
+    small.store(keys[3], data=np.zeros(1000))
+    assert small.load(keys[1]) is None
+    assert all(small.load(entry_key) is not None for entry_key in (keys[0], keys[2], keys[3]))
+    
+    print("✅ ENF önbelleği doğrulandı")
+
+def test_binary_result_format(tmp_path):
+    """İkili ENF sonuç formatı gidiş-dönüş testi"""
+    print("\n💾 İkili Sonuç Formatı Testi")
+    print("=" * 40)
+    
+    from utils.enf_format import save_enf_binary, load_enf_results
+    
+    frequencies = 50.0 + 0.01 * np.random.randn(600)
+    time_stamps = np.arange(600, dtype=np.float64)
+    header = {
+        "extraction_info": {"target_frequency": 50.0},
+        "statistics": {"mean_frequency": float(np.mean(frequencies))}
+    }
+    
+    output_file = save_enf_binary(tmp_path / "sonuc.enfb", header, {
+        "frequencies": frequencies.astype(np.float32),
+        "time_stamps": time_stamps,
+        "confidence_scores": None
+    })
+    loaded = load_enf_results(output_file)
+    
+    assert loaded["extraction_info"] == header["extraction_info"]
+    assert loaded["statistics"] == header["statistics"]
+    assert isinstance(loaded["enf_data"]["frequencies"], np.memmap)
+    assert np.allclose(loaded["enf_data"]["frequencies"], frequencies, atol=1e-5)
+    assert np.array_equal(loaded["enf_data"]["time_stamps"], time_stamps)
+    assert "confidence_scores" not in loaded["enf_data"]
+    
+    print("✅ İkili sonuç formatı doğrulandı")
+
+def test_stage_profiling():
+    """Aşama bazlı süre / bellek ölçümü testi"""
+    print("\n⏱️  Aşama Ölçümü Testi")
+    print("=" * 40)
+
+    from utils.profiling import StageProfiler
+
+    profiler = StageProfiler(trace_memory=True)
+    profiler.start()
+    for _ in range(3):
+        with profiler.stage("ayirma"):
+            block = np.ones(1_000_000)
+    with profiler.stage("bos"):
+        pass
+    summary = profiler.summary()
+    profiler.stop()
+
+    assert summary["stages"]["ayirma"]["calls"] == 3
+    assert summary["stages"]["ayirma"]["peak_alloc_mb"] >= block.nbytes / 1024 ** 2 * 0.99
+    assert summary["stages"]["bos"]["peak_alloc_mb"] < 1.0
+    assert summary["total_wall_seconds"] >= summary["stages"]["ayirma"]["wall_seconds"]
+
+    # RSS aşamaya göre ayrılır: önceki aşamanın tepesi sonrakilere taşınmaz
+    if sys.platform.startswith("linux"):
+        profiler = StageProfiler()
+        profiler.start()
+        with profiler.stage("buyuk"):
+            big = np.ones(10_000_000)
+        with profiler.stage("sonraki"):
+            del big
+        stages = profiler.summary()["stages"]
+        assert stages["buyuk"]["rss_delta_mb"] > 70
+        assert stages["sonraki"]["rss_delta_mb"] < -70
+        assert stages["sonraki"]["rss_peak_growth_mb"] < 5
+
+    print("✅ Aşama ölçümü doğrulandı")
+
+def test_enf_matcher():
+    """FFT tabanlı NCC eşleştirmenin kaba kuvvet korelasyonla tutarlılığı"""
+    print("\n🔍 ENF Eşleştirme Testi")
+    print("=" * 40)
+
+    from utils.enf_matcher import ENFMatcher
+
+    rng = np.random.default_rng(3)
+    reference = 50.0 + np.cumsum(rng.standard_normal(20000)) * 0.001
+    reference[15000:15010] = np.nan
+    true_offset = 7321
+    query = reference[true_offset:true_offset + 600] + rng.standard_normal(600) * 0.0005
+
+    matcher = ENFMatcher(reference, sample_rate=1.0, start_time=1_700_000_000.0)
+    scores = matcher.correlate(query)
+
+    for offset in (0, 5000, true_offset, 19400):
+        expected = np.corrcoef(query, reference[offset:offset + 600])[0, 1]
+        assert abs(scores[offset] - expected) < 1e-9
+    assert np.all(np.isneginf(scores[14401:15010]))
+
+    candidates = matcher.match(query, top_k=3)
+    assert candidates[0]["offset"] == true_offset
+    assert candidates[0]["start_time"] == 1_700_000_000.0 + true_offset
+    assert all(abs(c["offset"] - true_offset) >= 300 for c in candidates[1:])
+
+    print("✅ ENF eşleştirme doğrulandı")
+
+def test_enf_pyramid_index():
+    """Kaba-ince piramit aramanın kaba kuvvet NCC ile aynı sonucu bulması"""
+    print("\n🏔️  Piramit ENF İndeksi Testi")
+    print("=" * 40)
+
+    from utils.enf_index import ENFPyramidIndex
+    from utils.enf_matcher import ENFMatcher
+
+    rng = np.random.default_rng(5)
+    reference = 50.0 + np.cumsum(rng.standard_normal(200_000)) * 0.001
+    reference[50_000:50_200] = np.nan
+    brute = ENFMatcher(reference, start_time=1_700_000_000.0)
+    index = ENFPyramidIndex(reference, start_time=1_700_000_000.0, factors=(32, 4))
+
+    for true_offset in (1234, 99_999, 180_000):
+        query = reference[true_offset:true_offset + 900] + rng.standard_normal(900) * 0.002
+        expected = brute.match(query, top_k=1)[0]
+        found = index.match(query, top_k=3)
+        assert found[0]["offset"] == expected["offset"] == true_offset
+        assert abs(found[0]["score"] - expected["score"]) < 1e-9
+        assert found[0]["start_time"] == expected["start_time"]
+
+    # Kaba seviyeler için çok kısa sorgu tam çözünürlüklü aramaya düşer
+    short_query = reference[7000:7100]
+    assert index.match(short_query, top_k=1)[0]["offset"] == 7000
+
+    print("✅ Piramit ENF indeksi doğrulandı")
+
+def test_reference_store(tmp_path):
+    """Referans ENF deposu: CSV içe aktarma, boşluklar ve kopyasız sorgu"""
+    print("\n🗄️  Referans ENF Deposu Testi")
+    print("=" * 40)
+
+    import threading
+    import pytest
+    from utils.reference_store import ReferenceENFStore
+
+    start = 1_704_067_200
+    csv_file = tmp_path / "sebeke.csv"
+    with open(csv_file, "w") as f:
+        f.write("dtm,f\n")
+        for i in range(600):
+            if 100 <= i < 110:
+                continue
+            f.write(f"{np.datetime64(start + i, 's')},{50 + i * 1e-4:.4f}\n")
+
+    store = ReferenceENFStore(tmp_path / "reference_enf")
+    assert store.ingest_csv("EU50", csv_file, "dtm", "f") == 600
+    # Serinin sonundan önceki örnekler atlanır
+    assert store.append("EU50", np.arange(590, 620) + start, np.full(30, 50.5)) == 20
+
+    info = store.info("EU50")
+    assert info["length"] == 620
+    assert info["gaps"] == [[start + 100.0, start + 110.0]]
+
+    first_time, samples = store.query("EU50", start + 95, start + 115)
+    assert first_time == start + 95
+    assert isinstance(samples, np.memmap) and len(samples) == 20
+    assert np.isnan(samples[5:15]).all()
+    assert np.isclose(samples[0], 50.0095) and samples[-1] == np.float32(50.0114)
+
+    # Yarım kalmış eklemenin artığı: okuyucular dosyayı kesmez, sonraki ekleme üzerine yazar
+    samples_file = tmp_path / "reference_enf" / "EU50" / "samples.f32"
+    with open(samples_file, "ab") as f:
+        f.write(np.full(50, 99.0, dtype="<f4").tobytes())
+    assert len(store.samples("EU50")) == 620 and store.info("EU50")["length"] == 620
+    assert samples_file.stat().st_size == 670 * 4
+    assert store.append("EU50", [start + 620], [50.25]) == 1
+    assert samples_file.stat().st_size == 621 * 4
+    assert store.samples("EU50")[-1] == np.float32(50.25)
+
+    # Hatalı zaman damgası (ms cinsinden epoch) NaN dolgusu yazdırmaz; sınır ayarlanabilir
+    with pytest.raises(ValueError):
+        store.append("EU50", [start + 621, (start + 622) * 1000], [50.0, 50.0])
+    assert samples_file.stat().st_size == 621 * 4 and store.info("EU50")["length"] == 621
+    strict = ReferenceENFStore(tmp_path / "reference_enf", max_gap_seconds=60)
+    with pytest.raises(ValueError):
+        strict.append("EU50", [start + 700], [50.0])
+    assert strict.append("EU50", [start + 650], [50.0]) == 30
+
+    # Oluşturma kilit altında; indeks atomik yazılır, geçici dosya kalmaz
+    with pytest.raises(ValueError):
+        store.create("EU50", start)
+    assert store.create("EU50", start, exist_ok=True)["length"] == 651
+    assert sorted(os.listdir(samples_file.parent)) == ["index.json", "samples.f32"]
+    outcomes = []
+
+    def create_grid():
+        try:
+            outcomes.append(store.create("AU50", start + 1)["start_epoch"])
+        except ValueError:
+            outcomes.append(None)
+
+    threads = [threading.Thread(target=create_grid) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert outcomes.count(None) == 7 and store.info("AU50")["start_epoch"] == start + 1
+
+    print("✅ Referans ENF deposu doğrulandı")
+
+def test_rolling_shutter_video(tmp_path):
+    """Rolling shutter satır örneklemesiyle zamanla değişen LED flicker ENF'si"""
+    print("\n🎞️  Rolling Shutter Video ENF Testi")
+    print("=" * 40)
+
+    import cv2
+    from utils.enf_extractor import ENFExtractor
+
+    # 60 fps, 240 satır: ENF 6. saniyede 50.03 Hz'den 49.97 Hz'e iner
+    fps, width, height, readout_ratio = 60.0, 320, 240, 0.9
+    video_file = str(tmp_path / "led_flicker.avi")
+    writer = cv2.VideoWriter(video_file, cv2.VideoWriter_fourcc(*"MJPG"), fps, (width, height))
+    rng = np.random.default_rng(7)
+    scene = rng.uniform(60, 180, (height, width, 3))
+    row_offsets = np.arange(height) / (height * fps) * readout_ratio
+    for n in range(int(12 * fps)):
+        t = n / fps + row_offsets
+        phase = 2 * np.pi * np.where(t < 6, 50.03 * t, 50.03 * 6 + 49.97 * (t - 6))
+        gain = 1 + 0.05 * np.cos(2 * phase)
+        writer.write(np.clip(scene * gain[:, None, None], 0, 255).astype(np.uint8))
+    writer.release()
+
+    extractor = ENFExtractor()
+    frequencies, timestamps, confidence = extractor.extract_from_video(
+        video_file, mode="rolling_shutter", readout_ratio=readout_ratio)
+
+    assert len(frequencies) == len(timestamps) == len(confidence) > 8
+    assert np.all(np.diff(timestamps) > 0)
+    assert np.all(np.abs(frequencies[(timestamps >= 2) & (timestamps <= 3)] - 50.03) < 0.005)
+    assert np.all(np.abs(frequencies[(timestamps >= 9) & (timestamps <= 10)] - 49.97) < 0.005)
+    assert np.all(confidence > 0)
+
+    print(f"✅ {len(frequencies)} kesim, ENF {frequencies.min():.3f}-{frequencies.max():.3f} Hz")
+
+def test_video_frame_reader(tmp_path):
+    """Önden okumalı video okuyucunun ROI/gri dönüşümü ve erken kapatma davranışı"""
+    print("\n📼 Video Kare Okuyucu Testi")
+    print("=" * 40)
+
+    import cv2
+    from utils.video_reader import VideoFrameReader
+
+    video_file = str(tmp_path / "frames.avi")
+    writer = cv2.VideoWriter(video_file, cv2.VideoWriter_fourcc(*"MJPG"), 30.0, (160, 120))
+    for n in range(40):
+        writer.write(np.full((120, 160, 3), 3 * n, dtype=np.uint8))
+    writer.release()
+
+    with VideoFrameReader(video_file, roi=(10, 20, 64, 48), queue_size=4) as reader:
+        frames = list(reader)
+    assert reader.fps == 30.0 and reader.frame_size == (64, 48)
+    assert len(frames) == 40
+    assert frames[0].shape == (48, 64) and frames[0].dtype == np.uint8
+    assert abs(float(frames[-1].mean()) - 3 * 39) < 3
+
+    # Kuyruk doluyken tüketici erken bırakırsa okuyucu iş parçacığı durdurulur
+    reader = VideoFrameReader(video_file, gray=False, scale=(32, 24), queue_size=2)
+    with reader:
+        first = next(iter(reader))
+    assert first.shape == (24, 32, 3)
+    assert reader._thread is None
+
+    print("✅ Video kare okuyucu doğrulandı")
+
+def test_jpeg_exif_lossless(tmp_path):
+    """JPEG'e EXIF gömmenin sıkıştırılmış görüntü verisini bayt bayt koruması"""
+    print("\n🖼️  Kayıpsız JPEG EXIF Gömme Testi")
+    print("=" * 40)
+
+    from PIL import Image
+    from utils.jpeg_exif import read_jpeg_header
+
+    def image_data(path):
+        with open(path, "rb") as f:
+            _, data_offset = read_jpeg_header(f)
+            f.seek(data_offset)
+            return f.read()
+
+    image_file = str(tmp_path / "photo.jpg")
+    pixels = np.random.default_rng(3).integers(0, 255, (240, 320, 3), dtype=np.uint8)
+    Image.fromarray(pixels).save(image_file, "JPEG", quality=90)
+    original = image_data(image_file)
+
+    embedder = MetadataEmbedder()
+    enf_json_data = {"enf_data": {"frequencies": [50.01, 49.99, 50.0], "source_type": "audio"}}
+
+    # Ayrı çıktıya ve iki kez yerinde gömme (EXIF segmenti değiştirilir, çoğalmaz)
+    output_file = str(tmp_path / "photo_enf.jpg")
+    assert embedder.embed_to_image(image_file, enf_json_data, output_file)
+    assert embedder.embed_to_image(output_file, enf_json_data)
+    assert embedder.embed_to_image(output_file, enf_json_data)
+
+    assert image_data(output_file) == original
+    assert image_data(image_file) == original
+    with open(output_file, "rb") as f:
+        segments, _ = read_jpeg_header(f)
+    assert sum(1 for marker, payload in segments if payload.startswith(b"Exif")) == 1
+    assert embedder.extract_from_file(output_file) == enf_json_data
+    assert sorted(os.listdir(tmp_path)) == ["photo.jpg", "photo_enf.jpg"]
+
+    print("✅ Görüntü verisi değişmeden EXIF gömüldü")
+
+def test_mp4_enf_box(tmp_path, monkeypatch):
+    """MP4'e ENF kutusunun medya verisine dokunmadan yerinde gömülmesi"""
+    print("\n🎬 MP4 ENF Kutusu Testi")
+    print("=" * 40)
+
+    import builtins
+    import shutil
+    import cv2
+    from utils import isobmff
+    from utils.isobmff import embed_enf_box, read_boxes, read_enf_box
+
+    def layout(path):
+        with open(path, "rb") as f:
+            return [(box.type, box.offset, box.size) for box in read_boxes(f)]
+
+    def decoded_frames(path):
+        cap = cv2.VideoCapture(path)
+        frames = []
+        while True:
+            ret, frame = cap.read()
+            if not ret:
+                break
+            frames.append(frame)
+        cap.release()
+        return np.array(frames)
+
+    video_file = str(tmp_path / "clip.mp4")
+    writer = cv2.VideoWriter(video_file, cv2.VideoWriter_fourcc(*"mp4v"), 30.0, (64, 48))
+    for n in range(15):
+        writer.write(np.full((48, 64, 3), 15 * n, dtype=np.uint8))
+    writer.release()
+
+    original_frames = decoded_frames(video_file)
+    original_layout = layout(video_file)
+    with open(video_file, "rb") as f:
+        mdat = next(box for box in read_boxes(f) if box.type == b"mdat")
+        f.seek(mdat.offset)
+        mdat_bytes = f.read(mdat.size)
+
+    embedder = MetadataEmbedder()
+    enf_json_data = {"enf_data": {"frequencies": [50.0, 50.01] * 500, "source_type": "video"}}
+    assert embedder.embed_to_video(video_file, enf_json_data)
+    assert embedder.embed_to_video(video_file, {"enf_data": {"frequencies": [49.98]}})
+
+    # Yalnızca moov değişir; mdat aynı ofsette ve bayt bayt aynı kalır
+    with open(video_file, "rb") as f:
+        f.seek(mdat.offset)
+        assert f.read(mdat.size) == mdat_bytes
+    assert [box for box in layout(video_file) if box[0] == b"mdat"] == \
+        [box for box in original_layout if box[0] == b"mdat"]
+    assert embedder.extract_from_file(video_file) == {"enf_data": {"frequencies": [49.98]}}
+    assert np.array_equal(decoded_frames(video_file), original_frames)
+
+    # Ayrı çıktı: kaynak değişmez, moov arkasında güncelleme için boş alan bırakılır
+    copy_file = str(tmp_path / "clip_enf.mp4")
+    assert embedder.embed_to_video(video_file, enf_json_data, copy_file)
+    assert embedder.extract_from_file(copy_file) == enf_json_data
+    assert np.array_equal(decoded_frames(copy_file), original_frames)
+    assert embed_enf_box(copy_file, b'{"enf_data":{}}') in ("end", "free")
+    assert read_enf_box(copy_file) == b'{"enf_data":{}}'
+
+    # Kesinti güvenliği: n. yazma yarıda kalsa da dosya eski veya yeni moov ile okunur
+    class CrashingFile:
+        def __init__(self, f, budget):
+            self.f, self.budget = f, budget
+
+        def write(self, data):
+            self.budget[0] -= 1
+            if self.budget[0] < 0:
+                self.f.write(data[:len(data) // 2])
+                raise OSError("yazma kesildi")
+            return self.f.write(data)
+
+        def __getattr__(self, name):
+            return getattr(self.f, name)
+
+        def __enter__(self):
+            return self
+
+        def __exit__(self, *exc):
+            self.f.close()
+
+    crash_dir = tmp_path / "kesinti"
+    crash_dir.mkdir()
+    ftyp = isobmff.make_box(b"ftyp", b"isom" + bytes(4))
+    moov_box = isobmff.make_box(b"moov", isobmff.make_box(b"mvhd", bytes(100)))
+    mdat_box = isobmff.make_box(b"mdat", os.urandom(3000))
+    layouts = {"faststart.mp4": ftyp + moov_box + isobmff.make_box(b"free", bytes(4088)) + mdat_box,
+               "sonda.mp4": ftyp + mdat_box + moov_box}
+    for name, data in layouts.items():
+        (crash_dir / f"kaynak_{name}").write_bytes(data)
+    methods = set()
+    for name, payload in (("faststart.mp4", b"x" * 10), ("faststart.mp4", b"y" * 5000),
+                          ("sonda.mp4", b"z" * 5000)):
+        crash_file = str(crash_dir / name)
+        for writes in range(20):
+            shutil.copy(crash_dir / f"kaynak_{name}", crash_file)
+            before = read_enf_box(crash_file)
+            budget = [writes]
+            monkeypatch.setattr(isobmff, "open", lambda *a, **k: CrashingFile(builtins.open(*a, **k), budget),
+                                raising=False)
+            try:
+                methods.add(embed_enf_box(crash_file, payload))
+                completed = True
+            except OSError:
+                completed = False
+            monkeypatch.delattr(isobmff, "open")
+            assert read_enf_box(crash_file) in (before, payload)
+            assert [box[0] for box in layout(crash_file)].count(b"moov") == 1 or not completed
+            if completed:
+                assert read_enf_box(crash_file) == payload
+                assert [box[0] for box in layout(crash_file)].count(b"moov") == 1
+                break
+        assert completed
+    assert methods == {"free", "relocated", "end"}
+
+    # MP4/MOV dışındaki biçimler yeniden kodlanmaz: gömme reddedilir, dosya değişmez
+    avi_file = str(tmp_path / "clip.avi")
+    with open(avi_file, "wb") as f:
+        f.write(b"RIFF\x00\x00\x00\x00AVI ")
+    assert not embedder.embed_to_video(avi_file, enf_json_data)
+    assert sorted(os.listdir(tmp_path)) == ["clip.avi", "clip.mp4", "clip_enf.mp4", "kesinti"]
+    with open(avi_file, "rb") as f:
+        assert f.read() == b"RIFF\x00\x00\x00\x00AVI "
+
+    print("✅ ENF kutusu mdat'a dokunmadan gömüldü")
+
+def test_audio_enf_chunk_inplace(tmp_path):
+    """WAV/FLAC'a tekrar gömmenin ses verisini taşımadan yerinde yapılması"""
+    print("\n🎧 Yerinde Ses Metadata Gömme Testi")
+    print("=" * 40)
+
+    import soundfile as sf
+    from utils.riff import read_chunks
+
+    samples = (np.random.default_rng(9).standard_normal(44100 * 5) * 3000).astype(np.int16)
+    wav_file = str(tmp_path / "kayit.wav")
+    flac_file = str(tmp_path / "kayit.flac")
+    sf.write(wav_file, samples, 44100, subtype="PCM_16")
+    sf.write(flac_file, samples, 44100)
+
+    def wav_data_chunk(path):
+        with open(path, "rb") as f:
+            return next(chunk for chunk in read_chunks(f)[1] if chunk.id == b"data")
+
+    embedder = MetadataEmbedder()
+    data_chunk = wav_data_chunk(wav_file)
+    for n in (100, 400, 50, 3000):
+        enf_json_data = {"enf_data": {"frequencies": [50.012] * n}}
+        assert embedder.embed_to_audio(wav_file, enf_json_data)
+        assert embedder.embed_to_audio(flac_file, enf_json_data)
+        assert embedder.extract_from_file(wav_file) == enf_json_data
+        assert embedder.extract_from_file(flac_file) == enf_json_data
+        assert wav_data_chunk(wav_file) == data_chunk
+
+    # Ayrılan JUNK/PADDING alanına sığan güncelleme dosya boyutunu değiştirmez
+    sizes = (os.path.getsize(wav_file), os.path.getsize(flac_file))
+    assert embedder.embed_to_audio(wav_file, {"enf_data": {"frequencies": [49.99] * 3100}})
+    assert embedder.embed_to_audio(flac_file, {"enf_data": {"frequencies": [49.99] * 3100}})
+    assert (os.path.getsize(wav_file), os.path.getsize(flac_file)) == sizes
+
+    assert np.array_equal(sf.read(wav_file, dtype="int16")[0], samples)
+    assert np.array_equal(sf.read(flac_file, dtype="int16")[0], samples)
+
+    print("✅ WAV chunk ve FLAC PADDING yerinde güncellendi")
+
+def test_compact_enf_payload(tmp_path):
+    """Sıkıştırılmış ENF yükünün kodlanması, özet okuma ve eski JSON uyumluluğu"""
+    print("\n🗜️  Sıkıştırılmış ENF Yükü Testi")
+    print("=" * 40)
+
+    import json
+    from PIL import Image
+    from utils.enf_payload import decode_enf_payload, encode_enf_text, read_enf_summary
+
+    rng = np.random.default_rng(11)
+    n = 86400
+    frequencies = 50.0 + np.cumsum(rng.standard_normal(n)) * 0.0005
+    frequencies[5000:5010] = np.nan
+    confidence = np.clip(0.8 + rng.standard_normal(n) * 0.05, 0, 1)
+    enf_json_data = {
+        "enf_data": {
+            "frequencies": frequencies.tolist(),
+            "timestamps": np.arange(n, dtype=float).tolist(),
+            "confidence": confidence.tolist(),
+            "source_type": "audio",
+            "sampling_rate": 44100,
+        },
+        "metadata": {"software_version": "1.0.0"},
+    }
+
+    text = encode_enf_text(enf_json_data)
+    legacy = json.dumps(enf_json_data, separators=(",", ":"))
+    assert len(text) * 10 < len(legacy)
+
+    decoded = decode_enf_payload(text)
+    decoded_frequencies = np.array(decoded["enf_data"]["frequencies"])
+    assert np.array_equal(np.isnan(decoded_frequencies), np.isnan(frequencies))
+    assert np.nanmax(np.abs(decoded_frequencies - frequencies)) <= 0.0005 + 1e-9
+    assert np.max(np.abs(np.array(decoded["enf_data"]["confidence"]) - confidence)) < 0.003
+    assert decoded["enf_data"]["timestamps"] == enf_json_data["enf_data"]["timestamps"]
+    assert decoded["enf_data"]["sampling_rate"] == 44100
+    assert decoded["metadata"] == enf_json_data["metadata"]
+
+    summary = read_enf_summary(text)
+    assert summary["statistics"]["count"] == n
+    assert summary["statistics"]["valid_count"] == n - 10
+    assert abs(summary["statistics"]["mean_frequency"] - np.nanmean(frequencies)) < 1e-5
+    assert summary["fields"]["source_type"] == "audio"
+
+    # Eski düz JSON ile gömülmüş dosyalar okunmaya devam eder
+    png_file = str(tmp_path / "eski.png")
+    Image.new("RGB", (32, 32), "white").save(png_file)
+    small = {"enf_data": {"frequencies": [50.01, 49.99], "source_type": "image"}}
+    assert MetadataEmbedder(payload_format="json").embed_to_image(png_file, small)
+    assert json.loads(Image.open(png_file).info["ENF_DATA"]) == small
+    assert MetadataEmbedder().extract_from_file(png_file) == small
+
+    # Bir saatlik eğri EXIF (64 KB) sınırına sığar
+    jpeg_file = str(tmp_path / "foto.jpg")
+    Image.new("RGB", (32, 32), "white").save(jpeg_file)
+    hour = {"enf_data": {key: value[:3600] for key, value in enf_json_data["enf_data"].items()
+                         if isinstance(value, list)}}
+    assert MetadataEmbedder().embed_to_image(jpeg_file, hour)
+    assert len(MetadataEmbedder().extract_from_file(jpeg_file)["enf_data"]["frequencies"]) == 3600
+
+    # Uzunluğu uyuşmayan alanlar reddedilmez, olduğu gibi saklanır (varsayılan compact gömme başarılı)
+    mismatched = {"enf_data": {"frequencies": [50.01, 49.99, 50.0],
+                               "confidence": [0.9, 0.8], "timestamps": [0.0, 1.0, 2.0, 3.0]}}
+    mismatched_png = str(tmp_path / "uyumsuz.png")
+    Image.new("RGB", (32, 32), "white").save(mismatched_png)
+    assert MetadataEmbedder().embed_to_image(mismatched_png, mismatched)
+    restored = MetadataEmbedder().extract_from_file(mismatched_png)["enf_data"]
+    assert restored["confidence"] == [0.9, 0.8]
+    assert restored["timestamps"] == [0.0, 1.0, 2.0, 3.0]
+    assert np.allclose(restored["frequencies"], [50.01, 49.99, 50.0])
+
+    print(f"✅ {len(legacy) / 1e6:.1f} MB JSON -> {len(text) / 1e3:.0f} KB yük")
+
+def test_header_metadata_scan(tmp_path, monkeypatch):
+    """ENF metadata'sının alt süreç ve görüntü/ses çözmeden başlıktan okunması"""
+    print("\n🔎 Başlık Tabanlı Metadata Tarama Testi")
+    print("=" * 40)
+
+    import subprocess
+    import cv2
+    import piexif
+    import piexif.helper
+    import soundfile as sf
+    from PIL import Image
+    from utils.metadata_scanner import read_enf_metadata, scan_directory
+
+    media_dir = tmp_path / "arsiv"
+    (media_dir / "alt").mkdir(parents=True)
+    samples = np.zeros(8000, dtype=np.int16)
+    sf.write(str(media_dir / "kayit.wav"), samples, 8000, subtype="PCM_16")
+    sf.write(str(media_dir / "alt" / "kayit.flac"), samples, 8000)
+    Image.new("RGB", (32, 32), "white").save(str(media_dir / "foto.png"))
+    Image.new("RGB", (32, 32), "white").save(str(media_dir / "alt" / "foto.jpg"))
+    writer = cv2.VideoWriter(str(media_dir / "klip.mp4"), cv2.VideoWriter_fourcc(*"mp4v"), 30.0, (64, 48))
+    for n in range(5):
+        writer.write(np.full((48, 64, 3), 40 * n, dtype=np.uint8))
+    writer.release()
+
+    # ENF olmayan bir kamera yorumu ENF verisi sayılmaz
+    comment = {"Exif": {piexif.ExifIFD.UserComment: piexif.helper.UserComment.dump("tatil")}}
+    Image.new("RGB", (32, 32), "white").save(str(media_dir / "yorum.jpg"), exif=piexif.dump(comment))
+    (media_dir / "notlar.txt").write_text("ENF_DATA")
+
+    embedder = MetadataEmbedder()
+    enf_json_data = {"enf_data": {"frequencies": [50.0, 50.02, 49.99], "source_type": "test"}}
+    for path in ("kayit.wav", "alt/kayit.flac", "foto.png", "alt/foto.jpg", "klip.mp4"):
+        file_path = str(media_dir / path)
+        embed = {".wav": embedder.embed_to_audio, ".flac": embedder.embed_to_audio,
+                 ".mp4": embedder.embed_to_video}.get(os.path.splitext(path)[1], embedder.embed_to_image)
+        assert embed(file_path, enf_json_data)
+
+    def no_subprocess(*args, **kwargs):
+        raise AssertionError("başlık okuyucu alt süreç başlatmamalı")
+    monkeypatch.setattr(subprocess, "run", no_subprocess)
+    monkeypatch.setattr(Image, "open", no_subprocess)
+
+    results = {os.path.relpath(result.path, media_dir): result for result in scan_directory(str(media_dir), workers=2)}
+    assert sorted(results) == sorted(["kayit.wav", os.path.join("alt", "kayit.flac"), "foto.png",
+                                      os.path.join("alt", "foto.jpg"), "klip.mp4", "yorum.jpg"])
+    assert all(result.error is None for result in results.values())
+    assert results["yorum.jpg"].payload is None
+    for path, result in results.items():
+        if path != "yorum.jpg":
+            assert embedder.extract_from_file(str(media_dir / path)) == enf_json_data, path
+    assert read_enf_metadata(str(media_dir / "notlar.txt")) is None
+
+    print(f"✅ {len(results) - 1} dosyada ENF verisi başlıktan okundu")
+
+def test_parallel_file_hasher(tmp_path):
+    """Paralel, tek geçişte çoklu özet hesaplayan hash motoru"""
+    print("\n#️⃣  Paralel Hash Motoru Testi")
+    print("=" * 40)
+
+    import hashlib
+    from utils.file_hasher import FileHasher
+
+    rng = np.random.default_rng(21)
+    paths = []
+    for n, size in enumerate([0, 1, 4095, 3 * 1024 * 1024 + 17, 250000]):
+        path = tmp_path / f"dosya_{n}.bin"
+        path.write_bytes(rng.integers(0, 256, size, dtype=np.uint8).tobytes())
+        paths.append(path)
+    paths.insert(2, tmp_path / "yok.bin")
+
+    hasher = FileHasher(("sha256", "blake2b"), workers=4, buffer_size=1024 * 1024)
+    results = list(hasher.hash_files(paths))
+    assert [result.path for result in results] == [str(path) for path in paths]
+    for path, result in zip(paths, results):
+        if not path.exists():
+            assert result.digests is None and result.error
+            continue
+        data = path.read_bytes()
+        assert result.error is None and result.size == len(data)
+        assert result.digests == {"sha256": hashlib.sha256(data).hexdigest(),
+                                  "blake2b": hashlib.blake2b(data).hexdigest()}
+
+    print(f"✅ {len(paths) - 1} dosya tek geçişte SHA-256 + BLAKE2b ile hash'lendi")
+
+def test_incremental_verification(tmp_path):
+    """Stat önbelleği ile artımlı doğrulama ve katalog Merkle kökü"""
+    print("\n🌳 Artımlı Bütünlük Doğrulama Testi")
+    print("=" * 40)
+
+    from data_collector import DataCollector
+    from utils.integrity import MerkleTree, leaf_hash
+
+    # Merkle ağacı: değişen yaprak O(log n) inişle bulunur, kanıt yolu köke ulaşır
+    hashes = {f"dosya_{n:03d}.wav": f"{n:064x}" for n in range(37)}
+    tree = MerkleTree.from_hashes(hashes)
+    changed = dict(hashes, **{"dosya_005.wav": "f" * 64, "dosya_036.wav": None})
+    assert tree.diff(MerkleTree.from_hashes(changed)) == [5, 36]
+    assert MerkleTree.from_hashes(dict(hashes)).root == tree.root
+    for index in (0, 17, 36):
+        leaf = leaf_hash(tree.paths[index], hashes[tree.paths[index]])
+        assert MerkleTree.verify_proof(leaf, tree.proof(index), tree.root)
+        assert not MerkleTree.verify_proof(leaf_hash(tree.paths[index], "e" * 64), tree.proof(index), tree.root)
+
+    collector = DataCollector(str(tmp_path / "data"), hash_workers=2)
+    old_time = 1_700_000_000
+    records = []
+    for n in range(6):
+        file_path = collector.raw_dir / "audio" / "ofis" / f"kayit_{n}.wav"
+        file_path.write_bytes(os.urandom(20000 + n))
+        os.utime(file_path, (old_time, old_time))
+        records.append((file_path, {"file_type": "audio"}))
+    collector.record_files_metadata(records)
+
+    first = collector.verify_data_integrity(incremental=True)
+    assert first["rehashed_files"] == 6 and first["failed_files"] == 0
+
+    second = collector.verify_data_integrity(incremental=True)
+    assert second["cached_files"] == 6 and second["rehashed_files"] == 0
+    assert second["merkle_root"] == first["merkle_root"]
+
+    # Aynı boyutta değişiklik: mtime değiştiği için yeniden okunur ve Merkle farkında görünür
+    tampered = records[2][0]
+    data = bytearray(tampered.read_bytes())
+    data[100] ^= 0xFF
+    tampered.write_bytes(bytes(data))
+    third = collector.verify_data_integrity(incremental=True, sample_fraction=0.2)
+    assert third["failed_files"] == 1 and third["rehashed_files"] == 1 + 1
+    assert third["changed_since_last_run"] == ["raw/audio/ofis/kayit_2.wav"]
+    assert third["merkle_root"] != first["merkle_root"]
+
+    full = collector.verify_data_integrity(incremental=True, full=True)
+    assert full["rehashed_files"] == 6 and full["failed_files"] == 1
+
+    # CLI doğrulama sonucu çıkış koduna yansır (cron / CI için)
+    import subprocess
+    command = [sys.executable, "src/data_collector.py", "--base-dir", str(tmp_path / "data"), "--verify"]
+    assert subprocess.run(command, capture_output=True).returncode == 1
+    tampered.write_bytes(bytes(data[:100]) + bytes([data[100] ^ 0xFF]) + bytes(data[101:]))
+    assert subprocess.run(command, capture_output=True).returncode == 0
+
+    # Silinen dosya yalnızca ilk çalıştırmada değişmiş görünür; eksik kaldıkça
+    # sonraki farklarda yalnızca gerçekten değişen dosyalar raporlanır
+    records[4][0].unlink()
+    deleted = collector.verify_data_integrity(incremental=True)
+    assert deleted["changed_since_last_run"] == ["raw/audio/ofis/kayit_4.wav"]
+    again = collector.verify_data_integrity(incremental=True)
+    assert again["failed_files"] == 1 and again["previous_merkle_root"] == again["merkle_root"]
+    assert "changed_since_last_run" not in again
+    records[1][0].write_bytes(os.urandom(20001))
+    after_edit = collector.verify_data_integrity(incremental=True)
+    assert after_edit["changed_since_last_run"] == ["raw/audio/ofis/kayit_1.wav"]
+
+    print(f"✅ Artımlı doğrulama: {second['cached_files']} dosya önbellekten, kök {first['merkle_root'][:16]}…")
+
+def test_sqlite_catalog(tmp_path):
+    """İndeksli SQLite katalog: upsert, sorgu ve JSON dışa aktarma görünümü"""
+    print("\n🗄️  SQLite Katalog Testi")
+    print("=" * 40)
+
+    import json
+    import time
+    from utils.catalog_db import CatalogDB
+
+    def file_info(n, environment, device, date):
+        return {
+            "filename": f"kayit_{n}.wav",
+            "file_size_bytes": 1000 + n,
+            "hash_sha256": f"{n:064x}",
+            "collection_metadata": {"file_type": "audio", "environment": environment,
+                                    "source_device": device, "collection_date": date},
+        }
+
+    environments = ["sessiz", "ofis", "dis_mekan"]
+    devices = ["iphone", "samsung"]
+    records = [(f"raw/audio/{n:06d}.wav",
+                file_info(n, environments[n % 3], devices[n % 2], f"2024-{n % 12 + 1:02d}-{n % 28 + 1:02d}"))
+               for n in range(20000)]
+
+    db_file = tmp_path / "catalog.sqlite3"
+    catalog = CatalogDB(db_file)
+    catalog.update(records)
+    assert len(catalog) == 20000
+
+    start = time.perf_counter()
+    result = catalog.query(environment="ofis", source_device="samsung",
+                           date_from="2024-01-01", date_to="2024-01-31")
+    query_ms = (time.perf_counter() - start) * 1000
+    expected = [path for path, info in records
+                if info["collection_metadata"]["environment"] == "ofis"
+                and info["collection_metadata"]["source_device"] == "samsung"
+                and info["collection_metadata"]["collection_date"].startswith("2024-01")]
+    assert [path for path, _ in result] == sorted(expected)
+    assert query_ms < 100
+
+    # Tek dosya güncellemesi ve ikinci bağlantıdan (başka bir işçi) okuma
+    updated = file_info(5, "ofis", "iphone", "2024-06-06")
+    catalog["raw/audio/000005.wav"] = updated
+    with CatalogDB(db_file) as reader:
+        assert reader["raw/audio/000005.wav"] == updated
+        assert reader.query(hash_sha256=f"{5:064x}")[0][0] == "raw/audio/000005.wav"
+
+    # Dışa aktarılan JSON eski metadata_catalog.json ile aynı biçimde
+    small = CatalogDB(tmp_path / "small.sqlite3")
+    small.update(records[:3])
+    small.export_json(tmp_path / "metadata_catalog.json")
+    exported = (tmp_path / "metadata_catalog.json").read_text(encoding="utf-8")
+    assert exported == json.dumps(dict(records[:3]), indent=2, ensure_ascii=False)
+    small.close()
+    catalog.close()
+
+    print(f"✅ 20000 kayıtlık katalogda sorgu {query_ms:.1f} ms")
+
+def test_custody_log_chain(tmp_path):
+    """Hash zincirli custody logu: eşzamanlı ekleme, yarım satır kurtarma, değişiklik tespiti"""
+    print("\n⛓️  Chain-of-Custody Log Testi")
+    print("=" * 40)
+
+    import json
+    import threading
+    from utils.custody_log import CustodyLog, verify_custody_log
+
+    log_file = tmp_path / "chain_of_custody.jsonl"
+
+    # Ayrı log nesneleri (ayrı dosya tanımlayıcıları) kilit altında aynı zincire yazar
+    def writer(worker):
+        with CustodyLog(log_file, fsync_every=16) as log:
+            for n in range(200):
+                log.append("file_recorded", {"file": f"isci_{worker}/{n}.wav", "not": 'tırnak " ve \n'})
+
+    threads = [threading.Thread(target=writer, args=(worker,)) for worker in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    result = verify_custody_log(log_file)
+    assert result["valid"] and result["entries"] == 800
+
+    # Çökmede yarım kalan satır bir sonraki eklemede kesilir, zincir devam eder
+    with open(log_file, "ab") as f:
+        f.write(b'{"action":"yarim')
+    assert not verify_custody_log(log_file)["valid"]
+    with CustodyLog(log_file) as log:
+        head = log.append("integrity_verified", {"merkle_root": "ab" * 32})
+    result = verify_custody_log(log_file)
+    assert result["valid"] and result["entries"] == 801 and result["head_hash"] == head
+
+    # Bir kaydın içeriğini değiştirmek veya bir kaydı silmek tespit edilir
+    lines = log_file.read_bytes().splitlines(keepends=True)
+    tampered = tmp_path / "degistirilmis.jsonl"
+    tampered.write_bytes(b"".join(lines[:100] + [lines[100].replace(b".wav", b".mp3")] + lines[101:]))
+    assert verify_custody_log(tampered) == dict(verify_custody_log(tampered), valid=False, line=101)
+    tampered.write_bytes(b"".join(lines[:100] + lines[101:]))
+    assert verify_custody_log(tampered)["line"] == 101
+    assert json.loads(lines[-1])["seq"] == 800
+
+    # CLI: bozuk zincir sıfır dışı çıkış kodu ve hatalı satırla raporlanır
+    import subprocess
+    base_dir = tmp_path / "cli"
+    base_dir.mkdir()
+    command = [sys.executable, "src/data_collector.py", "--base-dir", str(base_dir), "--verify-custody"]
+    (base_dir / "chain_of_custody.jsonl").write_bytes(log_file.read_bytes())
+    assert subprocess.run(command, capture_output=True).returncode == 0
+    (base_dir / "chain_of_custody.jsonl").write_bytes(tampered.read_bytes())
+    completed = subprocess.run(command, capture_output=True, text=True)
+    assert completed.returncode == 1 and "satır 101" in completed.stdout
+
+    # Başlangıç olayları yalnızca boş loga bir kez yazılır; eski JSON belgesi o anda aktarılır
+    from data_collector import DataCollector
+    legacy_dir = tmp_path / "eski"
+    legacy_dir.mkdir()
+    legacy = {"project_info": {"project_name": "ENF"}, "collection_protocol": {"audio_recording": {}},
+              "data_integrity": {"hash_algorithm": "SHA-256"},
+              "collection_log": [{"timestamp": "2024-01-15T09:00:00Z", "action": "Collection started"},
+                                 {"timestamp": "2024-01-15T17:00:00Z", "action": "Data archiving"}]}
+    (legacy_dir / "chain_of_custody.json").write_text(json.dumps(legacy), encoding="utf-8")
+    collector = DataCollector(str(legacy_dir), catalog_backend="memory")
+    sample = collector.raw_dir / "audio" / "ofis" / "kayit.wav"
+    sample.write_bytes(os.urandom(1000))
+    # Uzun süren örnek dosya üretimi yerine küçük bir kayıt (dosya olayı başlangıçtan sonra gelir)
+    collector.create_sample_data_files = lambda: collector.record_files_metadata([(sample, {"file_type": "audio"})])
+    for _ in range(2):
+        assert collector.run_data_collection()["status"] == "success"
+    entries = [json.loads(line) for line in open(legacy_dir / "chain_of_custody.jsonl")]
+    actions = [entry["action"] for entry in entries]
+    assert actions[:5] == ["legacy_log_imported", "collection_protocol", "data_integrity",
+                           "Collection started", "Data archiving"]
+    assert entries[3]["details"]["timestamp"] == "2024-01-15T09:00:00Z"
+    assert all(actions.count(action) == 1 for action in actions[:5])
+    assert actions.count("integrity_verified") == 2 and actions[5] == "file_recorded"
+    assert verify_custody_log(legacy_dir / "chain_of_custody.jsonl")["valid"]
+
+    print(f"✅ {result['entries']} olaylı zincir doğrulandı")
+
+def test_ingest_daemon(tmp_path):
+    """Alım servisi: yazımı süren dosya beklenir, yeni dosya saniyeler içinde kataloglanır"""
+    print("\n📥 Alım Servisi Testi")
+    print("=" * 40)
+
+    import json
+    import time
+    import wave
+    from ingest_daemon import IngestDaemon
+    from utils.custody_log import verify_custody_log
+    from utils.enf_payload import decode_enf_payload
+    from utils.folder_watch import DirectoryPoller
+    from utils.metadata_scanner import read_enf_metadata
+
+    raw_dir = tmp_path / "raw" / "audio" / "ofis"
+    raw_dir.mkdir(parents=True)
+    wav_file = raw_dir / "2024-02-01_10-00-00_ofis_samsung_wav_1min.wav"
+    t = np.arange(8000 * 20) / 8000
+    with wave.open(str(wav_file), "wb") as f:
+        f.setnchannels(1)
+        f.setsampwidth(2)
+        f.setframerate(8000)
+        f.writeframes((0.3 * np.sin(2 * np.pi * 50 * t) * 32767).astype(np.int16).tobytes())
+
+    for use_inotify in (False, None):
+        with IngestDaemon(tmp_path, poll_interval=0.05, stable_seconds=0.3, extract=use_inotify is None,
+                          extract_workers=1, use_inotify=use_inotify) as daemon:
+            # Yazımı süren dosya boyutu değiştikçe kataloğa alınmaz
+            growing = tmp_path / "raw" / "video" / "led_statik" / f"kayit_{use_inotify}_iphone.mp4"
+            with open(growing, "wb") as f:
+                for _ in range(5):
+                    f.write(b"\0" * 1000)
+                    f.flush()
+                    daemon.run_once()
+                    time.sleep(0.1)
+                relative = growing.relative_to(tmp_path).as_posix()
+                assert relative not in daemon.catalog
+
+            start = time.monotonic()
+            stats = daemon.run(until_idle=True, max_seconds=120)
+            assert daemon.catalog[relative]["file_size_bytes"] == 5000
+            assert stats["max_latency_seconds"] < 5 and time.monotonic() - start < 120
+
+    # İlk çalıştırma yalnızca katalogladı; ikincisi ses kaydını atladı ve yarım kalan ENF işini tamamladı
+    assert stats["skipped"] == 2 and stats["cataloged"] == 1 and stats["extracted"] == 1
+    wav_info = daemon.catalog[wav_file.relative_to(tmp_path).as_posix()]
+    assert wav_info["collection_metadata"]["source_device"] == "samsung"
+    assert wav_info["enf_processing"]["status"] == "success"
+
+    embedded = tmp_path / "processed" / "metadata_embedded" / "audio" / "ofis" / wav_file.name
+    assert decode_enf_payload(read_enf_metadata(str(embedded)))["enf_data"]["frequencies"]
+
+    custody = verify_custody_log(tmp_path / "chain_of_custody.jsonl")
+    actions = [json.loads(line)["action"] for line in open(tmp_path / "chain_of_custody.jsonl")]
+    assert custody["valid"] and actions.count("file_recorded") == 3
+    assert "enf_extracted" in actions and "metadata_embedded" in actions
+
+    # Yoklayıcı yalnızca mtime'ı değişen dizinleri yeniden listeler
+    for directory, _, _ in os.walk(tmp_path / "raw"):
+        os.utime(directory, (time.time() - 10, time.time() - 10))
+    poller = DirectoryPoller(tmp_path / "raw")
+    assert len(poller.poll()) == 3
+    listed = poller.directories_listed
+    assert poller.poll() == [] and poller.directories_listed == listed
+    (raw_dir / "yeni.wav").write_bytes(b"RIFF")
+    assert poller.poll() == [str(raw_dir / "yeni.wav")] and poller.directories_listed == listed + 1
+
+    # Geri basınç: ilk taramadaki dosyalar ve yarım kalan ENF işleri sınır altında alınır
+    backlog_dir = tmp_path / "geri_basinc"
+    (backlog_dir / "raw" / "audio" / "ofis").mkdir(parents=True)
+    for n in range(12):
+        (backlog_dir / "raw" / "audio" / "ofis" / f"kayit_{n:02d}.wav").write_bytes(b"RIFF" * (n + 1))
+    with IngestDaemon(backlog_dir, stable_seconds=0.0, extract=False, use_inotify=False,
+                      max_tracked=4) as daemon:
+        daemon.run_once()
+        while not daemon.idle():
+            assert len(daemon._tracked) + len(daemon._ready) <= 4
+            daemon._sleep()
+            daemon.run_once()
+        assert daemon.stats["cataloged"] == 12
+    with IngestDaemon(backlog_dir, stable_seconds=0.0, use_inotify=False, max_tracked=4,
+                      max_extract_backlog=3, extract_workers=1) as daemon:
+        daemon._submit_extractions = lambda: None  # kuyruk boşaltılmaz
+        for _ in range(10):
+            daemon.run_once()
+            assert len(daemon._tracked) + len(daemon._ready) <= 4
+        assert 3 <= len(daemon._extract_queue) < 3 + 4 and daemon._pending
+        assert all(task["audio_seconds"] is None for task in daemon._extract_queue)
+        daemon._extract_queue.clear()
+
+    print(f"✅ {stats['cataloged']} dosya kataloglandı, ENF işlendi ve custody zinciri doğrulandı")
+
+def test_import_time_budget():
+    """Modül import süresi bütçe testi (python -X importtime)"""
+    print("\n⏱️ Import Süresi Testi")
+    print("=" * 40)
+    
+    import subprocess
+    
+    src_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), "src")
+    
+    for module, budget in IMPORT_TIME_BUDGETS.items():
+        code = f"import sys, {module}; print(','.join(m for m in {HEAVY_MODULES!r} if m in sys.modules))"
+        result = subprocess.run([sys.executable, "-X", "importtime", "-c", code],
+                                cwd=src_dir, capture_output=True, text=True)
+        assert result.returncode == 0, result.stderr
+        
+        # "import time: self [us] | cumulative | imported package"
+        cumulative_us = 0
+        for line in result.stderr.splitlines():
+            parts = line.split("|")
+            if line.startswith("import time:") and len(parts) == 3 and parts[2].strip() == module:
+                cumulative_us = max(cumulative_us, int(parts[1]))
+        
+        heavy_loaded = result.stdout.strip()
+        print(f"   {module}: {cumulative_us / 1e6:.3f} s (bütçe {budget} s)")
+        assert not heavy_loaded, f"{module} import sırasında ağır modül yükledi: {heavy_loaded}"
+        assert cumulative_us / 1e6 < budget, f"{module} import bütçesini aştı"
+    
+    print("✅ Import süreleri bütçe içinde")
+
 def cleanup_test_files():
     """Test dosyalarını temizle"""
     print("\n🧹 Test Dosyaları Temizleniyor...")